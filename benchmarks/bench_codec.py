@@ -0,0 +1,155 @@
+"""
+JSON Codec Benchmark
+--------------------
+Encodes and decodes each stage's payload over the synthetic corpus with
+every installed github_pipeline.codec backend, against the previous
+behaviour (stdlib json, indent=2), and reports per stage:
+
+- encode / decode time and MB/s, output size
+- speedup of encode + decode vs. the previous behaviour
+
+Stages and payloads:
+    raw         raw blob: list of repo dicts (raw_extract_github -> map)
+    mapped      mapped blob: {"metadata", "models": [MappedRecord]} (map -> prepare)
+    ready       ready blob: [ReadyRecord] (prepare -> merge job)
+    partitions  NDJSON part files of the ready records
+    search      one small document per hit (search index docs)
+
+Usage:
+    python benchmarks/bench_codec.py --sizes 10k,100k
+    python benchmarks/bench_codec.py --sizes 100k --repeat 5 --save /tmp/codec.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+SEARCH_DOCS = 20000     # single-document round trips in the "search" stage
+
+
+def stage_payloads(n, seed):
+    from github_pipeline.records import ReadyRecord, records_from_dicts
+    from github_pipeline.taxonomy_mapper import map_models
+
+    raw = list(generate_raw_records(n, seed))
+    with contextlib.redirect_stdout(io.StringIO()):
+        mapped = map_models(records_from_dicts(raw))
+    ready = [ReadyRecord.from_mapped(m) for m in mapped]
+    return {
+        "raw": raw,
+        "mapped": {"metadata": {"source": "bench", "count": len(mapped)}, "models": mapped},
+        "ready": ready,
+        "partitions": ready,
+        "search": [r.to_dict() for r in ready[:SEARCH_DOCS]],
+    }
+
+
+def legacy(stage):
+    """The pre-codec calls: stdlib json, indent=2 for blobs, compact for NDJSON / index docs."""
+    from github_pipeline.records import json_default
+
+    def dumps(obj):
+        if stage == "partitions":
+            return json.dumps(obj, ensure_ascii=False, default=json_default).encode("utf-8")
+        if stage == "search":
+            return json.dumps(obj, ensure_ascii=False, default=json_default,
+                              separators=(",", ":")).encode("utf-8")
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=json_default).encode("utf-8")
+
+    def loads_lines(data):
+        return [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+
+    return dumps, json.loads, loads_lines
+
+
+def codec_for(name):
+    from github_pipeline import codec
+
+    codec.use(name)
+    return codec.dumps, codec.loads, codec.loads_lines
+
+
+def round_trip(stage, payload, codec_fns, repeat):
+    dumps, loads, loads_lines = codec_fns
+    best_enc = best_dec = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        if stage == "partitions":
+            data = b"".join(dumps(r) + b"\n" for r in payload)
+        elif stage == "search":
+            data = [dumps(d) for d in payload]
+        else:
+            data = dumps(payload)
+        t1 = time.perf_counter()
+        if stage == "partitions":
+            loads_lines(data)
+        elif stage == "search":
+            [loads(d) for d in data]
+        else:
+            loads(data)
+        t2 = time.perf_counter()
+        best_enc, best_dec = min(best_enc, t1 - t0), min(best_dec, t2 - t1)
+    size = sum(map(len, data)) if stage == "search" else len(data)
+    return {"encode_s": best_enc, "decode_s": best_dec, "bytes": size}
+
+
+def main(argv=None):
+    from github_pipeline.codec import BACKENDS
+
+    parser = argparse.ArgumentParser(description="JSON codec benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N per measurement")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    args = parser.parse_args(argv)
+
+    backends = {"legacy": legacy}
+    for name in BACKENDS:
+        try:
+            codec_for(name)
+        except ImportError:
+            print(f"⚠️ {name} not installed, skipped")
+            continue
+        backends[name] = lambda stage, name=name: codec_for(name)
+
+    print("=" * 78)
+    print(f"🧪 JSON codec benchmark (best of {args.repeat}, seed {args.seed})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        n = parse_size(size)
+        payloads = stage_payloads(n, args.seed)
+        print(f"\n📦 {format_size(n)} repos")
+        for stage, payload in payloads.items():
+            print(f"  {stage}")
+            base = None
+            for label, factory in backends.items():
+                r = round_trip(stage, payload, factory(stage), args.repeat)
+                total = r["encode_s"] + r["decode_s"]
+                base = base or total
+                mb = r["bytes"] / 1e6
+                print(f"    {label:<18} enc {r['encode_s'] * 1e3:8.1f} ms ({mb / r['encode_s']:6.0f} MB/s)  "
+                      f"dec {r['decode_s'] * 1e3:8.1f} ms ({mb / r['decode_s']:6.0f} MB/s)  "
+                      f"{mb:7.1f} MB  x{base / total:.1f}")
+                reports.append({"size": format_size(n), "stage": stage, "backend": label,
+                                **{k: round(v, 4) for k, v in r.items()}, "speedup": round(base / total, 2)})
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
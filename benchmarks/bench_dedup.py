@@ -0,0 +1,117 @@
+"""
+Near-duplicate Detection Benchmark
+----------------------------------
+Runs the MinHash-LSH dedup stage (github_pipeline/dedup.py) over the
+synthetic corpus plus injected forks, and reports per corpus size:
+
+- wall time and throughput (repos/s)
+- candidate comparisons per repo (stays flat if the stage is sub-quadratic)
+- fork recall: injected forks found as duplicates of their source
+- other duplicates: non-fork repos clustered (the synthetic generator
+  repeats description templates, so many of these really are identical)
+
+Each fork copies a source repo under a new owner with zero stars, and half
+of them get one extra word in the description.
+
+Usage:
+    python benchmarks/bench_dedup.py --sizes 10k,100k
+    python benchmarks/bench_dedup.py --sizes 1M --forks 0.02 --save /tmp/dedup.json
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+
+def with_forks(n, seed, fraction):
+    records = list(generate_raw_records(n, seed))
+    rng = random.Random(seed)
+    forks = set()
+    for i in rng.sample(range(n), int(n * fraction)):
+        fork = dict(records[i])
+        fork["modelId"] = f"fork{i:07d}/{fork['modelId'].rpartition('/')[2]}"
+        fork["author"] = f"fork{i:07d}"
+        fork["stars"] = 0
+        if rng.random() < 0.5:
+            fork["description"] += " fork"
+        records.append(fork)
+        forks.add(fork["modelId"])
+    return records, forks
+
+
+def run_size(n, seed, fraction):
+    from github_pipeline.dedup import dedup
+    from github_pipeline.metrics import metrics
+
+    records, forks = with_forks(n, seed, fraction)
+    metrics.reset()
+    t0 = time.perf_counter()
+    kept, report = dedup(records, "collapse")
+    elapsed = time.perf_counter() - t0
+
+    duplicates = {d for cluster in report["clusters"] for d in cluster["duplicates"]}
+    comparisons = metrics.snapshot()["counters"].get("dedup.comparisons", 0)
+    return {
+        "size": format_size(n),
+        "records": len(records),
+        "seconds": round(elapsed, 2),
+        "repos_per_sec": round(len(records) / elapsed),
+        "comparisons_per_repo": round(comparisons / len(records), 2),
+        "clusters": len(report["clusters"]),
+        "kept": len(kept),
+        "fork_recall": round(len(forks & duplicates) / max(1, len(forks)), 4),
+        "other_duplicates": len(duplicates - forks),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MinHash-LSH dedup benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--forks", type=float, default=0.05, help="fraction of repos forked")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.seed, args.forks)))
+        return 0
+
+    print("=" * 78)
+    print(f"🧬 Dedup benchmark ({args.forks:.0%} forks, seed {args.seed})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(parse_size(size)),
+             "--seed", str(args.seed), "--forks", str(args.forks)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{size} failed:\n{proc.stderr}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        reports.append(r)
+        print(f"\n📦 {r['size']} repos (+forks = {r['records']}): {r['seconds']:.1f}s, "
+              f"{r['repos_per_sec']:,} repos/s, {r['comparisons_per_repo']} comparisons/repo")
+        print(f"  clusters {r['clusters']:,}, kept {r['kept']:,}, "
+              f"fork recall {r['fork_recall']:.1%}, other duplicates {r['other_duplicates']:,}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
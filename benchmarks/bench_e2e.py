@@ -0,0 +1,293 @@
+"""
+End-to-end Pipeline Benchmark
+-----------------------------
+Runs raw_extract_github → map_github_taxonomy → prepare_github_for_merge the
+way production does: each HTTP entrypoint is invoked through a Flask test
+client, in its own fresh process, against
+
+- a fake GitHub API (benchmarks/fake_github.py) serving a synthetic corpus
+- a storage location: a local directory (default), or a fake-GCS server
+  (e.g. fsouza/fake-gcs-server) via --bucket gs://<name> --gcs-emulator URL
+
+Per stage it reports cold latency (import + first request), warm latency
+(second request in the same process), bytes read/written and GitHub
+requests; plus total wall time per corpus size.
+
+--variant fused replaces the map + prepare functions with one in-process
+step (raw → mapped records → ready) to compare against the current stage
+boundaries. --variant pipelined runs fetch → map → normalize → write as one
+step with the stages overlapped (github_pipeline.pipelined); its response
+carries each stage's busy time, to compare the wall time against the
+slowest stage.
+
+Requires flask (test client) and, unless --mock-github, PyGithub.
+The loaders make one GitHub request per repo (benchmarks/bench_fetch.py
+checks this); use --mock-github to leave the API out for large sizes.
+
+Usage:
+    python benchmarks/bench_e2e.py --sizes 10,100
+    python benchmarks/bench_e2e.py --sizes 10k --mock-github --variant fused
+    python benchmarks/bench_e2e.py --sizes 1k --variant pipelined --github-latency-ms 20
+    python benchmarks/bench_e2e.py --sizes 1k --bucket gs://bench --gcs-emulator http://localhost:4443
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+FUNCTIONS_DIR = PROJECT_ROOT / "cloud_functions"
+
+RAW_BLOB = "github/raw/github_raw_data.json"
+MAPPED_BLOB = "github/mapped/github_mapped_data.json"
+READY_BLOB = "github/ready_for_merge/github_ready_data.json"
+
+# stage -> (function dir, blobs read, blobs written)
+STAGES = {
+    "raw_extract_github": ("raw_extract_github", [], [RAW_BLOB]),
+    "map_github_taxonomy": ("map_github_taxonomy", [RAW_BLOB], [MAPPED_BLOB]),
+    "prepare_github_for_merge": ("prepare_github_for_merge", [MAPPED_BLOB], [READY_BLOB]),
+    "fused_map_prepare": (None, [RAW_BLOB], [READY_BLOB]),
+    "pipelined": (None, [], [READY_BLOB]),
+}
+VARIANTS = {
+    "staged": ["raw_extract_github", "map_github_taxonomy", "prepare_github_for_merge"],
+    "fused": ["raw_extract_github", "fused_map_prepare"],
+    "pipelined": ["pipelined"],
+}
+
+
+def _stage_env(bucket):
+    env = dict(os.environ)
+    env.update({
+        "BUCKET_NAME": bucket,
+        "RAW_BLOB": RAW_BLOB,
+        "MAPPED_BLOB": MAPPED_BLOB,
+        "READY_BLOB": READY_BLOB,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+# ===== Worker side (runs inside a fresh interpreter) =====
+
+def _flask_invoker(main):
+    """POST through a Flask test client, like functions-framework does."""
+    import flask
+
+    app = flask.Flask("bench")
+    app.add_url_rule("/", "main", lambda: main(flask.request), methods=["POST"])
+    client = app.test_client()
+
+    def invoke(body):
+        resp = client.post("/", json=body)
+        return resp.status_code, resp.get_json(silent=True)
+
+    return invoke
+
+
+def _fused_main(bucket):
+    """Map + normalize in one step, without the intermediate mapped blob."""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from github_pipeline.prepare_github_for_mapper import normalize_github_model
+    from github_pipeline.records import records_from_dicts
+    from github_pipeline.storage import get_backend
+    from github_pipeline.taxonomy_mapper import map_models
+
+    def main(request):
+        store = get_backend(bucket)
+        mapped = map_models(records_from_dicts(store.read_json(RAW_BLOB)))
+        ready = [normalize_github_model(m) for m in mapped]
+        store.write_json(READY_BLOB, ready)
+        return {"status": "success", "count": len(ready)}
+
+    return main
+
+
+def _pipelined_main(bucket, repos, mock_github):
+    """Fetch → map → normalize → write, overlapped (github_pipeline.pipelined)."""
+    sys.path.insert(0, str(PROJECT_ROOT))
+    import config
+    config.GITHUB_REPOS = repos
+    config.MOCK_MODE = mock_github
+    from github_pipeline.pipelined import run_pipelined
+    from github_pipeline.storage import get_backend
+
+    def main(request):
+        report = run_pipelined(config.GITHUB_REPOS, get_backend(bucket), READY_BLOB)
+        return {"status": "success", "count": report["records"], "pipeline": report}
+
+    return main
+
+
+def run_worker(stage, bucket, repos_file, mock_github):
+    func_dir = STAGES[stage][0]
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if stage == "pipelined":
+            with open(repos_file, "r", encoding="utf-8") as f:
+                main = _pipelined_main(bucket, [line.strip() for line in f if line.strip()], mock_github)
+        elif func_dir is None:
+            main = _fused_main(bucket)
+        else:
+            sys.path.insert(0, str(FUNCTIONS_DIR / func_dir))
+            if stage == "raw_extract_github":
+                import config
+                with open(repos_file, "r", encoding="utf-8") as f:
+                    config.GITHUB_REPOS = [line.strip() for line in f if line.strip()]
+                config.MOCK_MODE = mock_github
+                import github_pipeline.github_loader as loader
+                loader.OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="bench_raw_"))
+            import main as entry
+            main = entry.main
+        import_s = time.perf_counter() - t0
+
+        invoke = _flask_invoker(main)
+        status, cold_body = invoke({})
+        cold_s = time.perf_counter() - t0
+
+        t1 = time.perf_counter()
+        status2, warm_body = invoke({"force": True})
+        warm_s = time.perf_counter() - t1
+
+    return {
+        "stage": stage,
+        "import_ms": round(import_s * 1000, 2),
+        "cold_ms": round(cold_s * 1000, 2),
+        "warm_ms": round(warm_s * 1000, 2),
+        "status": [status, status2],
+        "response": cold_body,
+    }
+
+
+# ===== Harness side =====
+
+def _snapshot(store):
+    snap = {}
+    for name in store.list(""):
+        info = store.stat(name)
+        if info is not None:
+            snap[name] = (info.size, info.generation)
+    return snap
+
+
+def _run_stage(stage, bucket, repos_file, mock_github, env):
+    cmd = [sys.executable, __file__, "worker", stage, "--bucket", bucket, "--repos-file", repos_file]
+    if mock_github:
+        cmd.append("--mock-github")
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_size(n, args):
+    sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+    from fake_github import FakeGitHub
+    from github_pipeline.storage import get_backend
+    from synthetic_corpus import generate_raw_records
+
+    records = list(generate_raw_records(n, args.seed))
+    bucket = args.bucket or f"file://{tempfile.mkdtemp(prefix='bench_bucket_')}"
+    store = get_backend(bucket)
+    if args.gcs_emulator and store.scheme == "gs" and not store.bucket.exists():
+        store.bucket.create()
+
+    repos_file = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+    repos_file.write("\n".join(r["modelId"] for r in records))
+    repos_file.close()
+
+    results = []
+    with FakeGitHub(records, latency_ms=args.github_latency_ms) as fake:
+        env = _stage_env(bucket)
+        env["GITHUB_API_URL"] = fake.url
+        env["GITHUB_TOKEN"] = "bench"
+
+        wall0 = time.perf_counter()
+        for stage in VARIANTS[args.variant]:
+            fake.reset_counters()
+            before = _snapshot(store)
+            r = _run_stage(stage, bucket, repos_file.name, args.mock_github, env)
+            after = _snapshot(store)
+
+            _, reads, _ = STAGES[stage]
+            # two invocations (cold + warm) per worker: report per invocation
+            r["bytes_read"] = sum(after.get(b, (0, 0))[0] for b in reads) + fake.bytes_sent // 2
+            r["bytes_written"] = sum(size for name, (size, gen) in after.items()
+                                     if before.get(name) != (size, gen))
+            r["github_requests"] = sum(fake.requests.values()) // 2
+            results.append(r)
+        wall_s = time.perf_counter() - wall0
+
+    os.unlink(repos_file.name)
+    return {"size": n, "variant": args.variant, "bucket": bucket,
+            "wall_s": round(wall_s, 3), "stages": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    sub = parser.add_subparsers(dest="command")
+
+    worker = sub.add_parser("worker", help=argparse.SUPPRESS)
+    worker.add_argument("stage", choices=list(STAGES))
+    worker.add_argument("--bucket", required=True)
+    worker.add_argument("--repos-file", required=True)
+    worker.add_argument("--mock-github", action="store_true")
+
+    parser.add_argument("--sizes", default="10,100", help="comma separated corpus sizes")
+    parser.add_argument("--variant", choices=list(VARIANTS), default="staged")
+    parser.add_argument("--bucket", help="storage location (default: fresh local temp dir per size)")
+    parser.add_argument("--gcs-emulator", help="fake-gcs-server URL; sets STORAGE_EMULATOR_HOST")
+    parser.add_argument("--github-latency-ms", type=float, default=0.0, help="added per fake GitHub request")
+    parser.add_argument("--mock-github", action="store_true", help="use MOCK_MODE instead of the fake API")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        print(json.dumps(run_worker(args.stage, args.bucket, args.repos_file, args.mock_github)))
+        return 0
+
+    if args.gcs_emulator:
+        os.environ["STORAGE_EMULATOR_HOST"] = args.gcs_emulator
+        os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench")
+
+    sys.path.insert(0, str(BENCH_DIR))
+    from synthetic_corpus import parse_size
+
+    print("=" * 78)
+    print(f"🚚 End-to-end benchmark ({args.variant})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        report = run_size(parse_size(size), args)
+        reports.append(report)
+        print(f"\n📦 {size} repos — wall {report['wall_s']:.2f}s  ({report['bucket']})")
+        print(f"  {'stage':<26}{'cold ms':>10}{'warm ms':>10}{'read KB':>10}{'written KB':>12}{'gh req':>8}")
+        for r in report["stages"]:
+            print(f"  {r['stage']:<26}{r['cold_ms']:>10.1f}{r['warm_ms']:>10.1f}"
+                  f"{r['bytes_read'] / 1024:>10.1f}{r['bytes_written'] / 1024:>12.1f}{r['github_requests']:>8}")
+            pipeline = (r.get("response") or {}).get("pipeline")
+            if pipeline:
+                busy = {name: s.get("busy_s_per_worker", s["busy_s"]) for name, s in pipeline["stages"].items()}
+                print(f"    overlapped: wall {pipeline['wall_s']:.2f}s, sum of stages {sum(busy.values()):.2f}s, "
+                      f"slowest {max(busy, key=busy.get)} {max(busy.values()):.2f}s "
+                      f"(fetch per worker, {pipeline['fetch_workers']} workers)")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Tarball Enrichment Benchmark
+----------------------------
+Enriches --repos repos of the synthetic corpus with README text and
+framework library from their tarballs on the fake GitHub API
+(benchmarks/fake_github.py) three ways:
+
+- extract:    download each tarball to a temp file, extractall() it and
+              read the two files from disk (one repo at a time)
+- stream:     github_pipeline.enrichment with one worker: "r|gz" stream,
+              nothing written, stops once README and requirements.txt
+              were seen
+- stream x N: the same with --workers tarballs in flight
+
+and reports response bytes read, bytes written to disk and wall time per
+variant. All variants must produce the same records.
+
+Usage:
+    python benchmarks/bench_enrichment.py --repos 50
+    python benchmarks/bench_enrichment.py --repos 200 --tarball-kb 2048 --latency-ms 50 --save /tmp/enrich.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from fake_github import FakeGitHub  # noqa: E402
+from synthetic_corpus import generate_raw_records  # noqa: E402
+
+from github_pipeline.enrichment import README_MAX_CHARS, enrich_records, frameworks_in_requirements  # noqa: E402
+
+
+def extract_enrich(records, base_url):
+    """Download-and-extract baseline; -> (bytes read, bytes written)."""
+    read = written = 0
+    for record in records:
+        workdir = tempfile.mkdtemp(prefix="bench-enrich-")
+        try:
+            archive = os.path.join(workdir, "repo.tar.gz")
+            with urllib.request.urlopen(f"{base_url}/repos/{record['modelId']}/tarball") as resp, \
+                    open(archive, "wb") as f:
+                shutil.copyfileobj(resp, f)
+            read += os.path.getsize(archive)
+            with tarfile.open(archive) as tar:
+                tar.extractall(workdir, filter="data")
+            top = next(p for p in Path(workdir).iterdir() if p.is_dir())
+            written += os.path.getsize(archive) + sum(p.stat().st_size for p in top.rglob("*") if p.is_file())
+            readme, requirements = top / "README.md", top / "requirements.txt"
+            if readme.exists():
+                record["readme"] = readme.read_text("utf-8", errors="replace")[:README_MAX_CHARS]
+            if requirements.exists():
+                libraries = frameworks_in_requirements(requirements.read_text("utf-8", errors="replace"))
+                if libraries:
+                    record["library"] = libraries[0]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return read, written
+
+
+def stream_enrich(workers):
+    def run(records, base_url):
+        report = enrich_records(records, "bench", base_url, workers=workers)
+        return report["bytes_read"], 0
+
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tarball enrichment benchmark")
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--tarball-kb", type=int, default=512, help="filler per fake tarball")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per fake GitHub request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    args = parser.parse_args(argv)
+
+    corpus = list(generate_raw_records(args.repos, args.seed))
+
+    print("=" * 78)
+    print(f"📦 Tarball enrichment benchmark ({args.repos} repos, ~{args.tarball_kb} KB tarballs, "
+          f"+{args.latency_ms} ms per request)")
+    print("=" * 78)
+    variants = {
+        "extract": extract_enrich,
+        "stream": stream_enrich(1),
+        f"stream x {args.workers}": stream_enrich(args.workers),
+    }
+    outputs, results = {}, {}
+    with FakeGitHub(corpus, latency_ms=args.latency_ms, tarball_kb=args.tarball_kb) as fake:
+        for label, run in variants.items():
+            records = [dict(r) for r in corpus]
+            fake.reset_counters()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                read, written = run(records, fake.url)
+            elapsed = time.perf_counter() - t0
+            outputs[label] = records
+            results[label] = {
+                "kb_read": round(read / 1024, 1),
+                "kb_written": round(written / 1024, 1),
+                "seconds": round(elapsed, 3),
+                "requests": dict(sorted(fake.requests.items())),
+            }
+            r = results[label]
+            print(f"  {label:<12}{r['kb_read']:>12,.1f} KB read {r['kb_written']:>12,.1f} KB to disk "
+                  f"{r['seconds']:>8.2f}s   {r['requests']}")
+
+    same = all(records == outputs["extract"] for records in outputs.values())
+    libraries = sum(1 for r in outputs["extract"] if r.get("library"))
+    print(f"\n  {libraries}/{args.repos} repos got a framework library")
+    print(f"{'✅' if same else '❌'} records identical on every variant")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"repos": args.repos, "tarball_kb": args.tarball_kb, "variants": results,
+                       "same_records": same}, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Repo Fetch Benchmark
+--------------------
+Fetches --repos repos from the fake GitHub API (benchmarks/fake_github.py)
+through
+
+- objects: the previous PyGithub object path (repo.owner.login,
+           repo.get_topics(), repo.license.spdx_id, ...)
+- lean:    github_loader.get_repo_basic_info, which builds the record from
+           the one GET /repos/{owner}/{repo} payload
+
+and reports GitHub requests per repo, by endpoint, and the time per repo.
+Both paths must produce the same records. Exits non-zero unless the lean
+path made exactly one request per repo, so it doubles as the request-count
+check for the loader.
+
+Usage:
+    python benchmarks/bench_fetch.py --repos 50
+    python benchmarks/bench_fetch.py --repos 200 --latency-ms 20 --save /tmp/fetch.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from fake_github import FakeGitHub  # noqa: E402
+from synthetic_corpus import generate_raw_records  # noqa: E402
+
+
+def objects_fetch(base_url):
+    """The pre-lean get_repo_basic_info body."""
+    from github import Auth, Github
+
+    def fetch(repo_name):
+        g = Github(auth=Auth.Token("bench"), base_url=base_url)
+        repo = g.get_repo(repo_name)
+        return {
+            "modelId": repo.full_name,
+            "author": repo.owner.login,
+            "description": repo.description or "",
+            "stars": repo.stargazers_count,
+            "language": repo.language or "unknown",
+            "topics": list(repo.get_topics()),
+            "license": repo.license.spdx_id if repo.license else "unknown",
+            "url": repo.html_url,
+        }
+
+    return fetch
+
+
+def lean_fetch(base_url):
+    import config
+    config.GITHUB_API_URL = base_url
+    config.GITHUB_TOKEN = "bench"
+    config.MOCK_MODE = False
+    from github_pipeline.github_loader import get_repo_basic_info  # reads config on import
+
+    return get_repo_basic_info
+
+
+def run_variant(fake, fetch, names):
+    fake.reset_counters()
+    records = []
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in names:
+            records.append(fetch(name))
+    elapsed = time.perf_counter() - t0
+    total = sum(fake.requests.values())
+    return records, {
+        "requests": total,
+        "requests_per_repo": round(total / len(names), 3),
+        "by_endpoint": dict(sorted(fake.requests.items())),
+        "ms_per_repo": round(elapsed / len(names) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repo fetch request-count benchmark")
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per fake GitHub request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    args = parser.parse_args(argv)
+
+    corpus = list(generate_raw_records(args.repos, args.seed))
+    names = [r["modelId"] for r in corpus]
+
+    print("=" * 78)
+    print(f"📡 Repo fetch benchmark ({args.repos} repos, +{args.latency_ms} ms per request)")
+    print("=" * 78)
+    report = {"repos": args.repos, "latency_ms": args.latency_ms, "variants": {}}
+    with FakeGitHub(corpus, latency_ms=args.latency_ms) as fake:
+        outputs = {}
+        for label, factory in (("objects", objects_fetch), ("lean", lean_fetch)):
+            outputs[label], r = run_variant(fake, factory(fake.url), names)
+            report["variants"][label] = r
+            print(f"  {label:<8} {r['requests']:>6} requests ({r['requests_per_repo']}/repo) "
+                  f"{r['ms_per_repo']:>8.2f} ms/repo   {r['by_endpoint']}")
+
+    same = outputs["objects"] == outputs["lean"]
+    exact = report["variants"]["lean"]["requests"] == args.repos
+    report.update(same_records=same, one_request_per_repo=exact)
+    print(f"\n{'✅' if same else '❌'} records identical on both paths")
+    print(f"{'✅' if exact else '❌'} lean path: exactly one request per repo")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0 if same and exact else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Similar-model Neighbor Table Benchmark
+--------------------------------------
+Builds the neighbor table (github_pipeline/neighbors.py) over the synthetic
+corpus and reports, per corpus size:
+
+- build time (compute + serialize), throughput and table size
+- recall@K on a sample of models: the share of each sampled model's exact
+  top-K (cosine over all other models, same weights) that the table's
+  neighbors match or beat in score; ties count as hits
+
+The exact top-K costs one pass over the corpus per sampled model, so the
+sample stays small (--sample).
+
+Usage:
+    python benchmarks/bench_neighbors.py --sizes 10k,100k
+    python benchmarks/bench_neighbors.py --sizes 1M --sample 50 --save /tmp/nbr.json
+"""
+
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+
+def exact_recall(records, table, sample, seed):
+    from github_pipeline.neighbors import MIN_SCORE, TOPIC_WEIGHT, model_terms
+
+    by_id = {r["modelId"]: r for r in records}
+    keys = [table.key(d) for d in range(len(table))]
+    terms = [model_terms(by_id[key]) for key in keys]
+    df = {}
+    for found in terms:
+        for t in found:
+            df[t] = df.get(t, 0) + 1
+    n = len(keys)
+    w2 = {t: (math.log(1 + n / c) * (TOPIC_WEIGHT if t.startswith("#") else 1.0)) ** 2
+          for t, c in df.items()}
+    norms = [math.sqrt(sum(w2[t] for t in found)) for found in terms]
+
+    recalls = []
+    for a in random.Random(seed).sample(range(n), min(sample, n)):
+        if not norms[a]:
+            continue
+        exact = sorted((sum(w2[t] for t in terms[a] & terms[b]) / (norms[a] * norms[b]), b)
+                       for b in range(n) if b != a and norms[b])[-table.k:]
+        exact = [score for score, _ in exact if score >= MIN_SCORE]
+        if not exact:
+            continue
+        # table scores are quantized to 1/255
+        got = [score for _, score in table.similar(keys[a])]
+        recalls.append(sum(score >= min(exact) - 1 / 255 for score in got) / len(exact))
+    return sum(recalls) / len(recalls) if recalls else None
+
+
+def run_size(n, seed, sample):
+    from github_pipeline.neighbors import NeighborTable, build_neighbors
+
+    records = list(generate_raw_records(n, seed))
+    t0 = time.perf_counter()
+    data = build_neighbors(records)
+    elapsed = time.perf_counter() - t0
+    table = NeighborTable(data)
+    recall = exact_recall(records, table, sample, seed)
+    return {
+        "size": format_size(n),
+        "seconds": round(elapsed, 1),
+        "models_per_sec": round(n / elapsed),
+        "table_mb": round(len(data) / 1e6, 1),
+        "recall_at_k": None if recall is None else round(recall, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neighbor table benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--sample", type=int, default=200, help="models checked against exact top-K")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.seed, args.sample)))
+        return 0
+
+    print("=" * 78)
+    print(f"🧭 Neighbor table benchmark (seed {args.seed}, recall sample {args.sample})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(parse_size(size)),
+             "--seed", str(args.seed), "--sample", str(args.sample)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{size} failed:\n{proc.stderr}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        reports.append(r)
+        print(f"\n📦 {r['size']} models: {r['seconds']:.1f}s ({r['models_per_sec']:,} models/s), "
+              f"{r['table_mb']} MB, recall@K {r['recall_at_k']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
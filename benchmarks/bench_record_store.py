@@ -0,0 +1,128 @@
+"""
+Keyed Record Store Benchmark
+----------------------------
+Builds the record store (github_pipeline/record_store.py) over the
+synthetic corpus, maps it from a temp file, and reports per corpus size:
+
+- build time and file size (vs. the compact ready JSON)
+- point lookup latency by modelId (p50 / p99, over --lookups random keys)
+- author-prefix scan latency for the first --scan-limit records
+- the alternative: parsing the full ready JSON to find one model
+
+Usage:
+    python benchmarks/bench_record_store.py --sizes 10k,100k
+    python benchmarks/bench_record_store.py --sizes 1M --save /tmp/kv.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def run_size(n, seed, lookups, scan_limit):
+    from github_pipeline import codec
+    from github_pipeline.record_store import RecordStore, build_record_store
+    from github_pipeline.records import ReadyRecord
+
+    ready = [ReadyRecord.from_mapped(r) for r in generate_raw_records(n, seed)]
+    blob = codec.dumps(ready)
+
+    t0 = time.perf_counter()
+    data = build_record_store(ready)
+    build_s = time.perf_counter() - t0
+
+    with tempfile.NamedTemporaryFile(suffix=".kv", delete=False) as f:
+        f.write(data)
+    kv = RecordStore.open(f.name)
+    os.unlink(f.name)
+
+    rng = random.Random(seed)
+    keys = [ready[i].modelId for i in rng.sample(range(n), min(lookups, n))]
+    get_us = []
+    for key in keys:
+        t0 = time.perf_counter()
+        kv.get(key)
+        get_us.append((time.perf_counter() - t0) * 1e6)
+
+    prefixes = [key.split("/")[0][:-1] for key in keys[:200]]
+    scan_ms = []
+    for prefix in prefixes:
+        t0 = time.perf_counter()
+        list(kv.scan_author(prefix, scan_limit))
+        scan_ms.append((time.perf_counter() - t0) * 1e3)
+
+    t0 = time.perf_counter()
+    next(r for r in codec.loads(blob) if r["modelId"] == keys[0])
+    full_parse_s = time.perf_counter() - t0
+
+    return {
+        "size": format_size(n),
+        "build_seconds": round(build_s, 2),
+        "store_mb": round(len(data) / 1e6, 1),
+        "ready_json_mb": round(len(blob) / 1e6, 1),
+        "get_p50_us": round(percentile(get_us, 50), 1),
+        "get_p99_us": round(percentile(get_us, 99), 1),
+        "scan_p50_ms": round(percentile(scan_ms, 50), 2),
+        "full_parse_ms": round(full_parse_s * 1e3, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keyed record store benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--scan-limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.seed, args.lookups, args.scan_limit)))
+        return 0
+
+    print("=" * 78)
+    print(f"🗝️ Record store benchmark ({args.lookups} lookups, scans of {args.scan_limit}, seed {args.seed})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(parse_size(size)), "--seed", str(args.seed),
+             "--lookups", str(args.lookups), "--scan-limit", str(args.scan_limit)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{size} failed:\n{proc.stderr}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        reports.append(r)
+        print(f"\n📦 {r['size']} models: built in {r['build_seconds']:.2f}s, "
+              f"{r['store_mb']} MB (ready JSON {r['ready_json_mb']} MB)")
+        print(f"  get: p50 {r['get_p50_us']} µs, p99 {r['get_p99_us']} µs   "
+              f"author scan: p50 {r['scan_p50_ms']} ms   full JSON parse: {r['full_parse_ms']:,} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Snapshot Store Benchmark
+------------------------
+Commits a series of daily snapshots of the synthetic corpus to the
+content-addressed snapshot store (github_pipeline/snapshots.py) in a
+memory:// store and reports, per corpus size:
+
+- bytes written per run (new segment + manifest) vs. the full JSON blob
+- commit, full reconstruction and diff (latest vs. previous) times
+
+Between runs --churn of the records change: half get new star counts, a
+quarter are removed and a quarter are new repos.
+
+Usage:
+    python benchmarks/bench_snapshots.py --sizes 10k,100k
+    python benchmarks/bench_snapshots.py --sizes 1M --runs 3 --save /tmp/snapshots.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+
+def churn(records, fraction, rng, run):
+    changed = int(len(records) * fraction)
+    records = list(records)
+    for i in rng.sample(range(len(records)), changed // 2):
+        records[i] = dict(records[i], stars=records[i]["stars"] + 1)
+    for i in sorted(rng.sample(range(len(records)), changed // 4), reverse=True):
+        del records[i]
+    for i in range(changed // 4):
+        records.append(dict(rng.choice(records), modelId=f"new{run:02d}/repo-{i:08d}"))
+    return records
+
+
+def run_size(n, seed, runs, fraction):
+    from github_pipeline.snapshots import SnapshotStore
+    from github_pipeline.storage import get_backend
+
+    store = get_backend(f"memory://bench-snapshots-{n}")
+    snaps = SnapshotStore(store, "snapshots")
+    rng = random.Random(seed)
+    records = list(generate_raw_records(n, seed))
+    full = len(json.dumps(records, ensure_ascii=False).encode("utf-8"))
+
+    commits = []
+    for run in range(runs):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = snaps.commit("raw", records, snapshot_id=f"run{run:03d}")
+        summary["seconds"] = round(time.perf_counter() - t0, 2)
+        commits.append(summary)
+        records = churn(records, fraction, rng, run)
+
+    t0 = time.perf_counter()
+    loaded = snaps.load("raw")
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    diff = snaps.diff("raw", f"run{runs - 2:03d}") if runs > 1 else {"counts": {}}
+    diff_s = time.perf_counter() - t0
+    return {
+        "size": format_size(n),
+        "full_json_mb": round(full / 1e6, 1),
+        "runs": [{"new_records": c["new_records"], "seconds": c["seconds"],
+                  "written_mb": round((c["segment_bytes"] + c["manifest_bytes"]) / 1e6, 2)}
+                 for c in commits],
+        "load_seconds": round(load_s, 2),
+        "loaded": len(loaded),
+        "diff_seconds": round(diff_s, 3),
+        "diff_counts": diff["counts"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot store benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--runs", type=int, default=4)
+    parser.add_argument("--churn", type=float, default=0.03, help="fraction of records changed per run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.seed, args.runs, args.churn)))
+        return 0
+
+    print("=" * 78)
+    print(f"🗃️ Snapshot store benchmark ({args.runs} runs, {args.churn:.0%} churn, seed {args.seed})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(parse_size(size)), "--seed", str(args.seed),
+             "--runs", str(args.runs), "--churn", str(args.churn)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{size} failed:\n{proc.stderr}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        reports.append(r)
+        print(f"\n📦 {r['size']} repos (full JSON {r['full_json_mb']} MB)")
+        for i, run in enumerate(r["runs"]):
+            print(f"  run {i}: {run['new_records']:>9,} new records, "
+                  f"{run['written_mb']:>8.2f} MB written, {run['seconds']:.2f}s")
+        print(f"  load latest: {r['load_seconds']:.2f}s ({r['loaded']:,} records), "
+              f"diff vs previous: {r['diff_seconds'] * 1e3:.0f} ms {r['diff_counts']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Stage Benchmarks — taxonomy mapper and normalizer
+-------------------------------------------------
+Runs the CPU-bound pipeline stages over a deterministic synthetic corpus
+(benchmarks/synthetic_corpus.py) and reports, per stage and corpus size:
+
+- records/sec
+- per-record latency percentiles (p50 / p95 / p99, microseconds)
+- peak RSS of the worker process (each stage x size runs in a fresh process)
+
+Stages:
+    find_task_from_text     keyword matching only
+    map_taxonomy            task + data type + categories for one record
+    map_models              batch API (its per-record printing goes to /dev/null)
+    normalize_github_model  dict normalizer (local pipeline)
+    ready_record            ReadyRecord.from_mapped (slotted normalizer; slower, so
+                            prepare and pipelined use the dict normalizer)
+
+Usage:
+    python benchmarks/bench_stages.py run --sizes 1k,10k,100k --save benchmarks/results/baseline.json
+    python benchmarks/bench_stages.py run --sizes 1k,10k --save /tmp/current.json
+    python benchmarks/bench_stages.py compare benchmarks/results/baseline.json /tmp/current.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+STAGES = ["find_task_from_text", "map_taxonomy", "map_models", "normalize_github_model", "ready_record"]
+DEFAULT_SIZES = "1k,10k,100k"
+RESERVOIR = 100_000   # latency samples kept per run
+BATCH = 10_000        # map_models batch size
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class _Latencies:
+    """Reservoir of per-record latencies (ns), bounded for 10M-record runs."""
+
+    def __init__(self, size=RESERVOIR, seed=0):
+        self.samples = array("q")
+        self.size = size
+        self.seen = 0
+        self.total_ns = 0
+        self._rng = random.Random(seed)
+
+    def add(self, ns, count=1):
+        self.total_ns += ns * count
+        for _ in range(count):
+            self.seen += 1
+            if len(self.samples) < self.size:
+                self.samples.append(ns)
+            else:
+                j = self._rng.randrange(self.seen)
+                if j < self.size:
+                    self.samples[j] = ns
+
+    def summary(self):
+        values = sorted(self.samples)
+        return {
+            "records": self.seen,
+            "records_per_sec": round(self.seen / (self.total_ns / 1e9), 1) if self.total_ns else 0.0,
+            "p50_us": round(_percentile(values, 0.50) / 1000, 3),
+            "p95_us": round(_percentile(values, 0.95) / 1000, 3),
+            "p99_us": round(_percentile(values, 0.99) / 1000, 3),
+        }
+
+
+def _mapped_stream(n, seed):
+    from github_pipeline.taxonomy_mapper import map_taxonomy
+    for record in generate_raw_records(n, seed):
+        yield map_taxonomy(record)
+
+
+def run_stage(stage, n, seed):
+    """Run one stage over ``n`` records in this process and return its metrics."""
+    from github_pipeline.taxonomy_mapper import find_task_from_text, map_models, map_taxonomy
+    from github_pipeline.prepare_github_for_mapper import normalize_github_model
+    from github_pipeline.records import ReadyRecord
+
+    lat = _Latencies(seed=seed)
+    clock = time.perf_counter_ns
+
+    if stage == "find_task_from_text":
+        for r in generate_raw_records(n, seed):
+            text = " ".join([r["description"], r["modelId"], " ".join(r["topics"])])
+            t0 = clock()
+            find_task_from_text(text)
+            lat.add(clock() - t0)
+
+    elif stage == "map_taxonomy":
+        for r in generate_raw_records(n, seed):
+            t0 = clock()
+            map_taxonomy(r)
+            lat.add(clock() - t0)
+
+    elif stage == "map_models":
+        records = generate_raw_records(n, seed)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            while True:
+                batch = [r for _, r in zip(range(BATCH), records)]
+                if not batch:
+                    break
+                t0 = clock()
+                map_models(batch)
+                # batch API: per-record latency is the batch average
+                lat.add((clock() - t0) // len(batch), len(batch))
+
+    elif stage in ("normalize_github_model", "ready_record"):
+        normalize = normalize_github_model if stage == "normalize_github_model" else ReadyRecord.from_mapped
+        for m in _mapped_stream(n, seed):
+            t0 = clock()
+            normalize(m)
+            lat.add(clock() - t0)
+
+    else:
+        raise ValueError(f"unknown stage: {stage}")
+
+    result = {"stage": stage, "size": format_size(n), **lat.summary()}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return result
+
+
+def _run_isolated(stage, n, seed):
+    proc = subprocess.run(
+        [sys.executable, __file__, "worker", stage, str(n), "--seed", str(seed)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} @ {n} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def cmd_run(args):
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    stages = args.stages.split(",") if args.stages else STAGES
+
+    print("=" * 78)
+    print("🏁 Stage benchmark (synthetic corpus, seed %d)" % args.seed)
+    print("=" * 78)
+    print(f"{'stage':<24}{'size':>7}{'rec/s':>14}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}{'RSS MB':>9}")
+
+    results = []
+    for stage in stages:
+        for n in sizes:
+            r = _run_isolated(stage, n, args.seed)
+            results.append(r)
+            print(f"{r['stage']:<24}{r['size']:>7}{r['records_per_sec']:>14,.0f}"
+                  f"{r['p50_us']:>10.2f}{r['p95_us']:>10.2f}{r['p99_us']:>10.2f}{r['peak_rss_mb']:>9.1f}")
+
+    report = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.save:
+        out = Path(args.save)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results saved to: {out}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold):
+    """
+    Compare two reports.
+
+    Returns:
+        list of (stage, size, metric, old, new, change) for every regression
+        beyond ``threshold`` (0.1 = 10%).
+    """
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = base.get((r["stage"], r["size"]))
+        if old is None:
+            continue
+        # throughput: lower is worse; latency: higher is worse
+        checks = [("records_per_sec", -1), ("p95_us", 1)]
+        for metric, worse in checks:
+            if not old[metric]:
+                continue
+            change = (r[metric] - old[metric]) / old[metric]
+            if change * worse > threshold:
+                regressions.append((r["stage"], r["size"], metric, old[metric], r[metric], change))
+    return regressions
+
+
+def cmd_compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    regressions = compare_reports(baseline, current, args.threshold)
+    if not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+        return 0
+    print(f"🔥 {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    for stage, size, metric, old, new, change in regressions:
+        print(f"  {stage:<24}{size:>7}  {metric:<16}{old:>14,.2f} → {new:>14,.2f}  ({change:+.1%})")
+    return 1
+
+
+def cmd_worker(args):
+    print(json.dumps(run_stage(args.stage, args.n, args.seed)))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Taxonomy mapper / normalizer benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the benchmark suite")
+    run.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated, e.g. 1k,100k,10M")
+    run.add_argument("--stages", help=f"comma separated subset of {','.join(STAGES)}")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--save", help="write results JSON (e.g. a baseline)")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="flag regressions between two result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="relative change, 0.1 = 10%%")
+    cmp_.set_defaults(func=cmd_compare)
+
+    worker = sub.add_parser("worker", help=argparse.SUPPRESS)
+    worker.add_argument("stage", choices=STAGES)
+    worker.add_argument("n", type=int)
+    worker.add_argument("--seed", type=int, default=42)
+    worker.set_defaults(func=cmd_worker)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
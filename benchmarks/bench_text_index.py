@@ -0,0 +1,129 @@
+"""
+Full-text Index Benchmark
+-------------------------
+Builds the BM25 text index (github_pipeline/text_index.py) over the
+synthetic corpus and reports, per corpus size:
+
+- build time (add + to_bytes) and index size
+- top-K query latency p50 / p95 (ms) over a fixed query set, from a
+  memory-mapped index file
+
+Each size runs in a fresh process. The synthetic corpus has a small,
+uniformly spread vocabulary, which is close to the worst case for
+MaxScore pruning (most query terms are "dense" and go through the
+term-subset pass); treat long queries here as a pessimistic bound.
+
+Usage:
+    python benchmarks/bench_text_index.py --sizes 10k,100k,1M
+    python benchmarks/bench_text_index.py --sizes 100k --k 20 --save /tmp/text.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+QUERIES = [
+    "pytorch",
+    "translation model",
+    "fast detector retail",
+    "lightweight segmentation for drones",
+    "gpt satellite diffusion bert mobile",
+    "robust multilingual translation model for manufacturing in jax",
+]
+REPEAT = 20
+
+
+def run_size(n, seed, k):
+    from github_pipeline.text_index import TextIndex, TextIndexBuilder
+
+    t0 = time.perf_counter()
+    builder = TextIndexBuilder()
+    for record in generate_raw_records(n, seed):
+        builder.add(record)
+    t1 = time.perf_counter()
+    data = builder.to_bytes()
+    t2 = time.perf_counter()
+    del builder
+
+    with tempfile.NamedTemporaryFile(suffix=".idx", delete=False) as f:
+        f.write(data)
+    try:
+        t3 = time.perf_counter()
+        index = TextIndex.open(f.name)
+        open_ms = (time.perf_counter() - t3) * 1000
+        queries = {}
+        for query in QUERIES:
+            index.search_ids(query, k)  # fault the pages in
+            samples = []
+            for _ in range(REPEAT):
+                t = time.perf_counter()
+                index.search_ids(query, k)
+                samples.append((time.perf_counter() - t) * 1000)
+            samples.sort()
+            queries[query] = {"p50_ms": round(samples[len(samples) // 2], 3),
+                              "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 3)}
+    finally:
+        os.unlink(f.name)
+
+    return {
+        "size": format_size(n),
+        "add_s": round(t1 - t0, 2),
+        "to_bytes_s": round(t2 - t1, 2),
+        "index_mb": round(len(data) / 1e6, 1),
+        "open_ms": round(open_ms, 3),
+        "queries": queries,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BM25 text index benchmark")
+    parser.add_argument("--sizes", default="10k,100k")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.seed, args.k)))
+        return 0
+
+    print("=" * 78)
+    print(f"🔤 Text index benchmark (top-{args.k}, seed {args.seed})")
+    print("=" * 78)
+    reports = []
+    for size in args.sizes.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(parse_size(size)),
+             "--seed", str(args.seed), "--k", str(args.k)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{size} failed:\n{proc.stderr}")
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        reports.append(r)
+        print(f"\n📦 {r['size']} docs — build {r['add_s'] + r['to_bytes_s']:.1f}s, "
+              f"{r['index_mb']} MB, open {r['open_ms']:.2f} ms")
+        for query, q in r["queries"].items():
+            print(f"  {query[:56]:<58}{q['p50_ms']:>9.2f} ms{q['p95_ms']:>9.2f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Wildcard Expansion Benchmark
+----------------------------
+Extracts every repo of the --owners largest owners of the synthetic corpus
+from the fake GitHub API (benchmarks/fake_github.py) three ways:
+
+- per-repo:      hand-listed names, one GET /repos/{owner}/{repo} each
+                 (github_loader.get_repo_basic_info)
+- listing:       "owner/*" entries, paged at 100 per request
+                 (github_pipeline.wildcards.RepoLister), empty cache
+- listing+cache: the same with the previous run's ETag page cache
+                 (unchanged pages come back as 304)
+
+and reports requests, response bytes and wall time per variant. The
+records from the listing must equal the per-repo records.
+
+Usage:
+    python benchmarks/bench_wildcards.py --size 10k --owners 5
+    python benchmarks/bench_wildcards.py --size 100k --owners 20 --latency-ms 20 --save /tmp/wc.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(BENCH_DIR)]
+
+from fake_github import FakeGitHub  # noqa: E402
+from synthetic_corpus import format_size, generate_raw_records, parse_size  # noqa: E402
+
+
+def measure(fake, run):
+    fake.reset_counters()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = run()
+    return records, {
+        "records": len(records),
+        "requests": sum(fake.requests.values()),
+        "by_endpoint": dict(sorted(fake.requests.items())),
+        "kb_sent": round(fake.bytes_sent / 1024, 1),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wildcard expansion benchmark")
+    parser.add_argument("--size", default="10k", help="synthetic corpus size")
+    parser.add_argument("--owners", type=int, default=5, help="expand the N largest owners")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per fake GitHub request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON")
+    args = parser.parse_args(argv)
+
+    corpus = list(generate_raw_records(parse_size(args.size), args.seed))
+    owners = [o for o, _ in Counter(r["author"] for r in corpus).most_common(args.owners)]
+    names = sorted((r["modelId"] for r in corpus if r["author"] in owners), key=str.lower)
+
+    print("=" * 78)
+    print(f"🔭 Wildcard expansion benchmark ({len(owners)} owners, {len(names)} repos "
+          f"of a {format_size(len(corpus))} corpus, +{args.latency_ms} ms per request)")
+    print("=" * 78)
+
+    with FakeGitHub(corpus, latency_ms=args.latency_ms) as fake:
+        import config
+        config.GITHUB_API_URL = fake.url
+        config.GITHUB_TOKEN = "bench"
+        config.MOCK_MODE = False
+        from github_pipeline.github_loader import get_repo_basic_info  # reads config on import
+        from github_pipeline.wildcards import RepoLister
+
+        cache = {}
+        variants = {
+            "per-repo": lambda: [get_repo_basic_info(n) for n in names],
+            "listing": lambda: list(RepoLister("bench", fake.url, cache=cache).expand(owners)),
+            "listing+cache": lambda: list(RepoLister("bench", fake.url, cache=cache).expand(owners)),
+        }
+        outputs, results = {}, {}
+        for label, run in variants.items():
+            outputs[label], results[label] = measure(fake, run)
+            r = results[label]
+            print(f"  {label:<15}{r['requests']:>7} requests {r['kb_sent']:>10,.1f} KB "
+                  f"{r['seconds']:>8.2f}s   {r['by_endpoint']}")
+
+    by_name = {r["modelId"]: r for r in outputs["per-repo"]}
+    same = all(outputs[label] == [by_name[n] for n in names] for label in ("listing", "listing+cache"))
+    print(f"\n{'✅' if same else '❌'} listing records identical to per-repo records")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"owners": owners, "repos": len(names), "variants": results,
+                       "same_records": same}, f, indent=2)
+        print(f"\n💾 Results saved to: {args.save}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Fake GitHub API
+---------------
+A local stand-in for the parts of the GitHub REST API the loaders use,
+serving the synthetic corpus (benchmarks/synthetic_corpus.py):
+
+    GET /repos/{owner}/{repo}
+    GET /repos/{owner}/{repo}/topics
+    GET /repos/{owner}/{repo}/tarball                (302 → /codeload/...)
+    GET /orgs/{org}/repos, GET /users/{user}/repos   (?per_page=&page=)
+    GET /rate_limit
+
+Every request is counted per endpoint (``requests``) and per path without
+the query (``paths``), together with the response bytes, and responses carry X-RateLimit-* headers like the real API. Repo
+listings are paginated with a Link header (sorted by full name), carry
+an ETag and answer a matching If-None-Match with 304 Not Modified.
+Owners passed as ``users`` are users: /orgs/{user}/repos is a 404 for them.
+Tarballs are laid out like GitHub's (one top directory, entries in git
+tree order): README.md, data/, requirements.txt (the framework named in
+the description), src/; data/ and src/ hold ``tarball_kb`` of
+incompressible filler between them.
+
+Point the loaders at it with GITHUB_API_URL=http://127.0.0.1:<port>.
+
+Usage:
+    python benchmarks/fake_github.py 10k --port 8765
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import random
+import tarfile
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic_corpus import generate_raw_records, parse_size
+
+RATE_LIMIT = 5000
+# framework named in a synthetic description -> its requirements.txt line
+REQUIREMENTS = {"PyTorch": "torch>=2.1", "TensorFlow": "tensorflow==2.15.0", "JAX": "jax[cuda12]",
+                "ONNX": "onnxruntime", "Keras": "keras>=3", "NumPy": "numpy"}
+
+
+def tarball_bytes(record: dict, filler_kb: int) -> bytes:
+    """A GitHub-style .tar.gz of a synthetic repo."""
+    owner, name = record["modelId"].split("/", 1)
+    top = f"{owner}-{name}-0000000"
+    framework = record["description"].rsplit(" in ", 1)[-1].split(".", 1)[0]
+    filler = random.Random(record["modelId"]).randbytes(filler_kb * 1024)
+    half = len(filler) // 2
+    files = [
+        ("README.md", f"# {name}\n\n{record['description']}\n\n## Install\n\n"
+                      f"    pip install -r requirements.txt\n".encode("utf-8")),
+        ("data/sample.bin", filler[:half]),
+        ("requirements.txt", f"# {name}\nnumpy\n{REQUIREMENTS.get(framework, 'scipy')}\n".encode("utf-8")),
+        ("src/weights.bin", filler[half:]),
+    ]
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz", format=tarfile.PAX_FORMAT) as tar:
+        for path, data in [(top, None)] + [(f"{top}/{p}", d) for p, d in files]:
+            info = tarfile.TarInfo(path)
+            if data is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def repo_payload(record: dict, base_url: str) -> dict:
+    """Shape a raw corpus record like GET /repos/{owner}/{repo}."""
+    owner, name = record["modelId"].split("/", 1)
+    license_id = record["license"]
+    return {
+        "id": abs(hash(record["modelId"])) % 10**9,
+        "name": name,
+        "full_name": record["modelId"],
+        "owner": {"login": owner, "type": "Organization", "url": f"{base_url}/users/{owner}"},
+        "private": False,
+        "html_url": record["url"],
+        "description": record["description"],
+        "url": f"{base_url}/repos/{record['modelId']}",
+        "stargazers_count": record["stars"],
+        "watchers_count": record["stars"],
+        "language": None if record["language"] == "unknown" else record["language"],
+        "license": None if license_id == "unknown" else {"key": license_id.lower(), "spdx_id": license_id},
+        "topics": record["topics"],
+        "default_branch": "main",
+        "fork": False,
+        "pushed_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:00:00Z",
+    }
+
+
+class FakeGitHub:
+    """Threaded HTTP server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, records, host="127.0.0.1", port=0, latency_ms=0.0, users=(), tarball_kb=256):
+        self.repos = {r["modelId"]: r for r in records}
+        self.by_owner = defaultdict(list)
+        for name in sorted(self.repos, key=str.lower):
+            self.by_owner[name.split("/", 1)[0]].append(self.repos[name])
+        self.users = set(users)
+        self.tarball_kb = tarball_kb
+        self.latency = latency_ms / 1000
+        self.requests = Counter()
+        self.paths = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.paths.clear()
+            self.bytes_sent = 0
+
+    def _record(self, endpoint, path, nbytes):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.paths[path.partition("?")[0]] += 1
+            self.bytes_sent += nbytes
+            return RATE_LIMIT - sum(self.requests.values())
+
+    def _listing(self, path, query, kind, owner):
+        """-> (endpoint, status, body, extra headers) of one listing page."""
+        endpoint = f"{kind[:-1]}_repos"
+        if owner not in self.by_owner or (kind == "orgs" and owner in self.users):
+            return endpoint, 404, {"message": "Not Found"}, {}
+        per_page = min(100, int(query.get("per_page", ["30"])[0]))
+        page = max(1, int(query.get("page", ["1"])[0]))
+        repos = self.by_owner[owner]
+        body = [repo_payload(r, self.url) for r in repos[(page - 1) * per_page:page * per_page]]
+        headers = {}
+        if page * per_page < len(repos):
+            params = {k: v[0] for k, v in query.items()}
+            params["page"] = page + 1
+            headers["Link"] = f'<{self.url}{path}?{urllib.parse.urlencode(params)}>; rel="next"'
+        return endpoint, 200, body, headers
+
+    def _route(self, path):
+        """-> (endpoint, status, body, extra headers)"""
+        route, _, query = path.partition("?")
+        parts = [p for p in route.split("/") if p]
+        if parts == ["rate_limit"]:
+            return "rate_limit", 200, {"resources": {"core": {"limit": RATE_LIMIT}}}, {}
+        if len(parts) == 3 and parts[0] in ("orgs", "users") and parts[2] == "repos":
+            return self._listing(route, urllib.parse.parse_qs(query), parts[0], parts[1])
+        if len(parts) == 5 and parts[0] == "codeload" and parts[3] == "tar.gz":
+            record = self.repos.get(f"{parts[1]}/{parts[2]}")
+            if record is None:
+                return "codeload", 404, {"message": "Not Found"}, {}
+            return "codeload", 200, tarball_bytes(record, self.tarball_kb), {}
+        if len(parts) >= 3 and parts[0] == "repos":
+            full_name = f"{parts[1]}/{parts[2]}"
+            record = self.repos.get(full_name)
+            if record is None:
+                return "repo", 404, {"message": "Not Found"}, {}
+            if parts[3:] == ["topics"]:
+                return "topics", 200, {"names": record["topics"]}, {}
+            if parts[3:] == ["tarball"]:
+                location = f"{self.url}/codeload/{full_name}/tar.gz/main"
+                return "tarball", 302, {}, {"Location": location}
+            if not parts[3:]:
+                return "repo", 200, repo_payload(record, self.url), {}
+        return "other", 404, {"message": "Not Found"}, {}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                endpoint, status, body, headers = fake._route(self.path)
+                binary = isinstance(body, bytes)
+                payload = body if binary else json.dumps(body).encode("utf-8")
+                if endpoint.endswith("_repos") and status == 200:
+                    headers["ETag"] = f'"{hashlib.md5(payload).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, payload = 304, b""
+                remaining = fake._record(endpoint, self.path, len(payload))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                content_type = "application/x-gzip" if binary else "application/json; charset=utf-8"
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("X-RateLimit-Limit", str(RATE_LIMIT))
+                self.send_header("X-RateLimit-Remaining", str(max(0, remaining)))
+                self.send_header("X-RateLimit-Used", str(RATE_LIMIT - max(0, remaining)))
+                self.send_header("X-RateLimit-Resource", "core")
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass    # the client stopped reading (tarball scans stop early)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic corpus as a fake GitHub API")
+    parser.add_argument("size", help="corpus size, e.g. 1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per request")
+    args = parser.parse_args(argv)
+
+    fake = FakeGitHub(generate_raw_records(parse_size(args.size), args.seed),
+                      port=args.port, latency_ms=args.latency_ms)
+    print(f"🛰️ Fake GitHub API on {fake.url} ({len(fake.repos)} repos)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cold-start Import Benchmark
+---------------------------
+Measures module import time of every Cloud Function entrypoint with
+``python -X importtime`` in a fresh interpreter, which is what a cold start
+pays before the handler runs (interpreter startup itself is excluded).
+
+Results are compared against the per-function budget stored in
+benchmarks/cold_start_budget.json.
+
+Usage:
+    python benchmarks/import_time.py              # measure + check budget
+    python benchmarks/import_time.py --record     # measure + save as budget
+    python benchmarks/import_time.py --top 15     # show heaviest imports
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).resolve().parent / "cold_start_budget.json"
+
+# function name -> (working dir, module imported by the runtime)
+FUNCTIONS = {
+    "raw_extract_github": ("cloud_functions/raw_extract_github", "main"),
+    "map_github_taxonomy": ("cloud_functions/map_github_taxonomy", "main"),
+    "prepare_github_for_merge": ("cloud_functions/prepare_github_for_merge", "main"),
+    "search_github_models": ("cloud_functions/search_github_models", "main"),
+    "github_loader_v3": ("cloud_functions/github_loader_v3", "github_loader"),
+    "gcp": ("gcp", "main"),
+}
+
+
+def parse_importtime(stderr, module):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        (total_us, [(module, cumulative_us), ...])
+        total_us is the cumulative import time of ``module`` itself, so
+        interpreter startup (site, .pth hooks) does not count against the
+        budget; the list holds its direct children, which is where heavy
+        dependencies such as google.cloud.storage show up.
+    """
+    total_us = 0
+    pending = []  # imports are reported after their children
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        name = parts[2][1:]  # drop the separator space
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        if depth == 0:
+            if name.strip() == module:
+                total_us = int(parts[1])
+                children = pending
+            pending = []
+        elif depth == 1:
+            pending.append((name.strip(), int(parts[1])))
+    return total_us, children
+
+
+def measure(func_dir, module, runs=3):
+    """Import ``module`` from ``func_dir`` in fresh interpreters, keep the fastest run."""
+    cwd = PROJECT_ROOT / func_dir
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(cwd), str(PROJECT_ROOT)])
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+            return {"ok": False, "error": last[0]}
+        total_us, top_level = parse_importtime(proc.stderr, module)
+        if best is None or total_us < best["total_us"]:
+            best = {"ok": True, "total_us": total_us, "imports": top_level}
+    return best
+
+
+def load_budget():
+    if BUDGET_FILE.exists():
+        with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", action="store_true", help="save results as the new budget")
+    parser.add_argument("--runs", type=int, default=5, help="interpreter launches per function")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to print")
+    parser.add_argument("--slack", type=float, default=1.5, help="budget multiplier when recording")
+    args = parser.parse_args(argv)
+
+    budget = load_budget()
+    results = {}
+    over_budget = []
+
+    print("=" * 60)
+    print("⏱️  Cold-start import benchmark (-X importtime)")
+    print("=" * 60)
+
+    for name, (func_dir, module) in FUNCTIONS.items():
+        res = measure(func_dir, module, runs=args.runs)
+        if not res["ok"]:
+            print(f"❌ {name}: import failed ({res['error']})")
+            continue
+
+        ms = res["total_us"] / 1000
+        limit = budget.get(name, {}).get("budget_ms")
+        status = "✅" if limit is None or ms <= limit else "🔥"
+        if limit is not None and ms > limit:
+            over_budget.append(name)
+        limit_txt = f" / budget {limit:.1f} ms" if limit is not None else ""
+        print(f"{status} {name}: {ms:.1f} ms{limit_txt}")
+        for mod, us in sorted(res["imports"], key=lambda x: -x[1])[:args.top]:
+            print(f"     {us / 1000:8.1f} ms  {mod}")
+
+        results[name] = {
+            "measured_ms": round(ms, 2),
+            "budget_ms": round(ms * args.slack, 2),
+        }
+
+    if args.record:
+        budget.update(results)
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 Budget saved to: {BUDGET_FILE}")
+
+    print("=" * 60)
+    if over_budget:
+        print(f"🔥 Over budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
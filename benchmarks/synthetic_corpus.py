@@ -0,0 +1,157 @@
+"""
+Synthetic GitHub Corpus
+-----------------------
+Deterministic generator of raw GitHub records shaped like the output of
+github_loader.get_repo_basic_info, for benchmarks that must not touch the
+GitHub API.
+
+- descriptions are built from templates around the taxonomy keywords, with
+  a share of records matching no task at all (-> "unknown")
+- topics, authors and tasks follow Zipf-like distributions, so a few values
+  dominate as they do on GitHub
+- the same (size, seed) always yields the same corpus, streaming, so 10M
+  records never have to be held in memory by the generator
+
+Usage:
+    python benchmarks/synthetic_corpus.py 100k -o /tmp/corpus.json
+    python benchmarks/synthetic_corpus.py 1M --ndjson -o /tmp/corpus.ndjson
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+
+# ===== Vocabulary =====
+TASK_PHRASES = {
+    "text-generation": ["GPT-style language model", "LLM inference server", "generative transformer"],
+    "text-classification": ["BERT sentiment classifier", "RoBERTa text classification"],
+    "translation": ["multilingual translation model", "neural machine translate toolkit"],
+    "summarization": ["abstractive summarization", "meeting summary generator"],
+    "object-detection": ["YOLO object detection", "real-time detector", "Faster-RCNN detection"],
+    "image-segmentation": ["semantic segmentation network", "promptable segment model", "instance mask predictor"],
+    "image-classification": ["ResNet image classification", "ViT ImageNet baseline"],
+    "reinforcement-learning": ["reinforcement learning agent", "policy optimization library"],
+}
+NEUTRAL_PHRASES = [
+    "collection of utilities", "dataset loader", "training scripts", "benchmark harness",
+    "research code", "web dashboard", "data pipeline", "experiment tracker",
+]
+ADJECTIVES = ["Lightweight", "Fast", "Minimal", "Scalable", "Efficient", "Simple", "Robust", "Open"]
+DOMAINS = [
+    "drones", "agriculture", "medical imaging", "satellite imagery", "finance", "robotics",
+    "autonomous driving", "retail", "manufacturing", "education", "climate", "security",
+]
+FRAMEWORKS = ["PyTorch", "TensorFlow", "JAX", "ONNX", "Keras", "NumPy"]
+TOPICS = [
+    "pytorch", "deep-learning", "machine-learning", "computer-vision", "nlp", "python",
+    "tensorflow", "transformer", "yolo", "llm", "gpt", "segmentation", "detection",
+    "jax", "onnx", "reinforcement-learning", "dataset", "benchmark", "inference",
+    "edge", "mobile", "cuda", "diffusion", "bert", "classification", "robotics",
+    "medical", "satellite", "agriculture", "drones", "translation", "summarization",
+]
+LANGUAGES = [("Python", 0.78), ("Jupyter Notebook", 0.08), ("C++", 0.06), ("Rust", 0.02), (None, 0.06)]
+LICENSES = [("MIT", 0.38), ("Apache-2.0", 0.32), ("GPL-3.0", 0.08), ("BSD-3-Clause", 0.06), (None, 0.16)]
+UNKNOWN_SHARE = 0.2  # records whose text matches no task keyword
+
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text) -> int:
+    """'1k' -> 1000, '10M' -> 10_000_000, '2500' -> 2500."""
+    text = str(text).strip().lower()
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(n: int) -> str:
+    for suffix, factor in (("M", 1_000_000), ("k", 1_000)):
+        if n >= factor and n % factor == 0:
+            return f"{n // factor}{suffix}"
+    return str(n)
+
+
+class _Zipf:
+    """Draws items with probability proportional to 1 / rank**s."""
+
+    def __init__(self, items, s=1.1):
+        self.items = list(items)
+        weights = [1 / (rank ** s) for rank in range(1, len(self.items) + 1)]
+        self.cum = list(itertools.accumulate(weights))
+
+    def draw(self, rng):
+        return self.items[bisect.bisect_left(self.cum, rng.random() * self.cum[-1])]
+
+
+def _weighted(rng, choices):
+    x = rng.random()
+    for value, p in choices:
+        x -= p
+        if x <= 0:
+            return value
+    return choices[-1][0]
+
+
+def generate_raw_records(n: int, seed: int = 42):
+    """Yield ``n`` raw GitHub records deterministically."""
+    rng = random.Random(seed)
+    authors = _Zipf([f"org{i:05d}" for i in range(max(1, n // 20))], s=0.9)
+    tasks = _Zipf(list(TASK_PHRASES), s=0.8)
+    topics = _Zipf(TOPICS, s=1.1)
+
+    for i in range(n):
+        author = authors.draw(rng)
+        if rng.random() < UNKNOWN_SHARE:
+            phrase = rng.choice(NEUTRAL_PHRASES)
+        else:
+            phrase = rng.choice(TASK_PHRASES[tasks.draw(rng)])
+        description = f"{rng.choice(ADJECTIVES)} {phrase} for {rng.choice(DOMAINS)} in {rng.choice(FRAMEWORKS)}"
+        if rng.random() < 0.3:
+            description += ". " + " ".join(rng.choice(NEUTRAL_PHRASES) for _ in range(rng.randint(2, 8)))
+
+        repo_topics = []
+        for _ in range(min(8, int(rng.expovariate(0.4)))):
+            t = topics.draw(rng)
+            if t not in repo_topics:
+                repo_topics.append(t)
+
+        name = f"{author}/repo-{i:08d}"
+        yield {
+            "modelId": name,
+            "author": author,
+            "description": description,
+            "stars": int(rng.lognormvariate(4, 2)),
+            "language": _weighted(rng, LANGUAGES) or "unknown",
+            "topics": repo_topics,
+            "license": _weighted(rng, LICENSES) or "unknown",
+            "url": f"https://github.com/{name}",
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic raw GitHub corpus")
+    parser.add_argument("size", help="number of records, e.g. 1k, 100k, 10M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ndjson", action="store_true", help="one record per line")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        records = generate_raw_records(parse_size(args.size), args.seed)
+        if args.ndjson:
+            for r in records:
+                out.write(json.dumps(r, ensure_ascii=False) + "\n")
+        else:
+            json.dump(list(records), out, ensure_ascii=False)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
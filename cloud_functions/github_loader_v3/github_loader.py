@@ -5,26 +5,64 @@ Features:
 1. Extracts repo metadata from GitHub API
 2. Supports checkpointing (each repo saved individually)
 3. Automatically merges all files into github_raw_v3_data.json
+4. Collapses or flags near-duplicate repos in the merged file (DEDUP_MODE)
+5. With WORK_QUEUE set (path to a SQLite file on a shared disk), repos are
+   leased from a work queue (github_pipeline.work_queue) instead of
+   submitted directly, so several processes can drain one list together;
+   a crashed worker's repos are retried by the others once its lease
+   expires, and repos that keep failing are dead-lettered. Keys are scoped
+   to WORK_QUEUE_RUN (default: today's UTC date), so repos done or
+   dead-lettered by an earlier run are extracted again by the next one
+6. Extracts repos highest priority first (github_pipeline.scheduler: stars,
+   recent pushes, staleness, PINNED_REPOS); the scores of the run are kept
+   in github_raw_v3_data.schedule.json
+7. Expands "owner/*" entries by listing the owner's repos 100 per request
+   (github_pipeline.wildcards); listed repos are saved straight from the
+   listing while the other repos are fetched, and the page cache is kept
+   in github_raw_v3_data.expansion.json
 """
 
 import os
-import json
+import time
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from github import Github, Auth
-from config import GITHUB_TOKEN, GITHUB_REPOS, MOCK_MODE
+from config import DEDUP_MODE, GITHUB_TOKEN, GITHUB_API_URL, GITHUB_REPOS, MOCK_MODE, PINNED_REPOS
+from github_pipeline import codec
+from github_pipeline.github_usage import usage, usage_blob_for
+from github_pipeline.metrics import finish_run, metrics
+from github_pipeline.scheduler import schedule, schedule_blob_for
 
 
 # Output directories
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output" / "github_raw_v3"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 MERGED_FILE = OUTPUT_DIR.parents[0] / "github_raw_v3_data.json"
+SCHEDULE_FILE = MERGED_FILE.with_name(schedule_blob_for(MERGED_FILE.name))
+EXPANSION_FILE = MERGED_FILE.with_name("github_raw_v3_data.expansion.json")
+WORK_QUEUE = os.environ.get("WORK_QUEUE", "")
+WORK_QUEUE_RUN = os.environ.get("WORK_QUEUE_RUN") or time.strftime("%Y-%m-%d", time.gmtime())
+
+
+def repo_record(payload):
+    """Raw record from a GET /repos/{owner}/{repo} payload (repo listings use the same shape)"""
+    owner = payload.get("owner") or {}
+    license_info = payload.get("license") or {}
+    return {
+        "modelId": payload["full_name"],
+        "author": owner.get("login") or payload["full_name"].split("/")[0],
+        "description": payload.get("description") or "",
+        "stars": payload.get("stargazers_count", 0),
+        "language": payload.get("language") or "unknown",
+        "topics": list(payload.get("topics") or []),
+        "license": license_info.get("spdx_id") or "unknown",
+        "url": payload.get("html_url", ""),
+    }
 
 
 def get_repo_basic_info(repo_name):
     """Extract metadata for a single repository."""
     if MOCK_MODE:
         print(f"🔶 Mock mode enabled: {repo_name}")
+        schedule.observe(repo_name, stars=1000)
         return {
             "modelId": repo_name,
             "author": repo_name.split("/")[0],
@@ -37,23 +75,23 @@ def get_repo_basic_info(repo_name):
         }
 
     try:
-        auth = Auth.Token(GITHUB_TOKEN)
-        g = Github(auth=auth)
-        repo = g.get_repo(repo_name)
-
-        return {
-            "modelId": repo.full_name,
-            "author": repo.owner.login,
-            "description": repo.description or "",
-            "stars": repo.stargazers_count,
-            "language": repo.language or "unknown",
-            "topics": list(repo.get_topics()),
-            "license": repo.license.spdx_id if repo.license else "unknown",
-            "url": repo.html_url,
-            "task": "unknown"
-        }
+        # PyGithub is imported lazily so MOCK_MODE runs never pay for it
+        from github import Github, Auth
+        usage.install()
+
+        with metrics.timer("github.fetch"), usage.attribute(repo_name):
+            auth = Auth.Token(GITHUB_TOKEN)
+            g = Github(auth=auth, base_url=GITHUB_API_URL)
+            # one request: the repo payload already has owner, license and topics
+            payload = g.get_repo(repo_name).raw_data
+            data = repo_record(payload)
+            data["task"] = "unknown"
+            schedule.observe(repo_name, stars=data["stars"], pushed_at=payload.get("pushed_at"))
+        metrics.incr("github.repos_fetched")
+        return data
 
     except Exception as e:
+        metrics.incr("github.errors")
         print(f"❌ Failed to fetch {repo_name}: {e}")
         return None
 
@@ -62,29 +100,75 @@ def process_repo(repo_name):
     """Handle extraction + caching for a single repo."""
     save_path = OUTPUT_DIR / f"{repo_name.replace('/', '__')}.json"
     if save_path.exists():
+        metrics.incr("cache.hits")
         return f"🟡 Skipped (already exists): {repo_name}"
 
+    metrics.incr("cache.misses")
     data = get_repo_basic_info(repo_name)
     if data:
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        save_path.write_bytes(codec.dumps(data))
         return f"✅ Saved successfully: {repo_name}"
     else:
         return f"❌ Failed: {repo_name}"
 
 
+def expand_wildcards(owners):
+    """Save every repo of the ``owners`` from their listings; returns the lower-cased names saved."""
+    from github_pipeline.wildcards import RepoLister
+
+    cache = codec.loads(EXPANSION_FILE.read_bytes()) if EXPANSION_FILE.exists() else {}
+    lister = RepoLister(GITHUB_TOKEN, GITHUB_API_URL, cache=cache)
+    listed = set()
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    for data in lister.expand(owners, listed):
+        data["task"] = "unknown"
+        (OUTPUT_DIR / f"{data['modelId'].replace('/', '__')}.json").write_bytes(codec.dumps(data))
+    EXPANSION_FILE.write_bytes(codec.dumps(cache))
+    return listed
+
+
+def process_leased_repo(lease):
+    """Work-queue handler: raising fails the lease, so the repo is retried or dead-lettered."""
+    message = process_repo(lease.key)
+    print(message)
+    if message.startswith("❌"):
+        raise RuntimeError(f"fetch failed: {lease.key}")
+    return None
+
+
+def drain_work_queue(path, repos, max_workers=10):
+    """Enqueue ``repos`` for this run (idempotent; leased by priority score) and help drain the shared queue."""
+    from github_pipeline.work_queue import WorkQueue
+
+    queue = WorkQueue(path)
+    added = queue.enqueue(repos, priorities={e["repo"]: e["score"] for e in schedule.entries},
+                          run=WORK_QUEUE_RUN)
+    print(f"📬 Work queue {path} (run {WORK_QUEUE_RUN}): {added} new of {len(repos)} repos, {queue.stats()}")
+    counts = queue.drain(process_leased_repo, workers=max_workers)
+    stats = queue.stats()
+    print(f"📭 Drained: {counts}, queue now {stats}")
+    if stats["dead"]:
+        print(f"☠️ {stats['dead']} repos dead-lettered (python -m github_pipeline.work_queue {path} --dead)")
+
+
 def merge_raw_files():
     """Combine all individual repo JSON files."""
-    all_files = list(OUTPUT_DIR.glob("*.json"))
+    from github_pipeline.dedup import dedup, dedup_blob_for
+
+    all_files = list(OUTPUT_DIR.glob("*.json")) if OUTPUT_DIR.exists() else []
     data = []
     for f in all_files:
         try:
-            with open(f, "r", encoding="utf-8") as j:
-                data.append(json.load(j))
+            data.append(codec.loads(f.read_bytes()))
         except Exception:
             print(f"⚠️ Skipping corrupted file: {f}")
-    with open(MERGED_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    data, report = dedup(data, DEDUP_MODE)
+    # output/ only exists once a repo was saved: a run where every fetch
+    # failed still writes an (empty) merge and its sidecars
+    MERGED_FILE.parent.mkdir(parents=True, exist_ok=True)
+    MERGED_FILE.write_bytes(codec.dumps(data))
+    MERGED_FILE.with_name(dedup_blob_for(MERGED_FILE.name)).write_bytes(codec.dumps(report))
     print(f"💾 Merged {len(data)} repos → {MERGED_FILE}")
 
 
@@ -92,12 +176,43 @@ def load_github_models(max_workers=10):
     """Run parallel GitHub extraction."""
     print(f"\n🚀 Starting extraction for {len(GITHUB_REPOS)} repositories...\n")
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(process_repo, r) for r in GITHUB_REPOS]
-        for f in as_completed(futures):
-            print(f.result())
-
-    merge_raw_files()
+    # urllib.request (wildcards) is slow to import: keep it out of module import
+    from github_pipeline.wildcards import split_covered, split_entries
+
+    metrics.reset()
+    previous = codec.loads(SCHEDULE_FILE.read_bytes()) if SCHEDULE_FILE.exists() else None
+    names, owners = split_entries(GITHUB_REPOS)
+    repos = schedule.plan(names, previous, PINNED_REPOS)
+    print(f"🎯 Priority order, top: {schedule.summary(5)['top']}")
+    listed = set()
+    expand = owners and not MOCK_MODE
+    with metrics.timer("extract") as timer, usage.tracking():
+        if WORK_QUEUE:
+            if expand:
+                listed = expand_wildcards(owners)
+                repos = [r for r in repos if r.lower() not in listed]
+            drain_work_queue(WORK_QUEUE, repos, max_workers)
+        else:
+            # repos of a wildcard owner wait for its listing, which usually has
+            # them; the rest are fetched by the pool while this thread lists
+            independent, covered = split_covered(repos, owners) if expand else (repos, [])
+            # the pool starts tasks in submission order: highest priority first
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(process_repo, r) for r in independent]
+                if expand:
+                    listed = expand_wildcards(owners)
+                repos = independent + [r for r in covered if r.lower() not in listed]
+                futures += [executor.submit(process_repo, r) for r in repos[len(independent):]]
+                for f in as_completed(futures):
+                    print(f.result())
+        timer.records = len(repos) + len(listed)
+
+    with metrics.timer("merge"):
+        merge_raw_files()
+    usage_file = MERGED_FILE.with_name(usage_blob_for(MERGED_FILE.name))
+    usage_file.write_bytes(codec.dumps(usage.summary()))
+    SCHEDULE_FILE.write_bytes(codec.dumps(schedule.state()))
+    finish_run("github_loader_v3")
     print("\n✅ All tasks completed.")
 
 
@@ -3,43 +3,50 @@ Cloud Function: map-github-taxonomy (HTTP)
 ------------------------------------------
 Reads raw GitHub models JSON from GCS, maps taxonomy using local pipeline,
 and writes the mapped JSON back to GCS under github/mapped/.
+If the raw blob has not changed since the last run (same generation/md5 as
+recorded in the mapped file's metadata block) and neither has the mapping
+code (CODE_MODULES, see storage.code_version), the run is skipped after a
+metadata-only check.
+Alongside the mapped file it writes a BM25 full-text index over
+description/topics/modelId (<mapped>.text.idx, see
+github_pipeline.text_index), which search_github_models serves for ?q=.
+When SNAPSHOT_PREFIX is set, the mapped models are also kept as a
+versioned snapshot (dataset "mapped", see github_pipeline.snapshots).
+Storage goes through github_pipeline.storage, so the same code runs against
+a local directory or an in-memory store.
 """
 
-import json
 import os
-from pathlib import Path
 from datetime import datetime, timezone
-from google.cloud import storage
 
-# import your local pipeline modules (copied with the function)
-from github_pipeline.taxonomy_mapper import map_models
+# Heavy dependencies (google.cloud.storage) and the taxonomy tables pulled in
+# by github_pipeline.taxonomy_mapper are imported inside the functions that
+# use them, so module import on cold start stays cheap.
+from github_pipeline import codec
+from github_pipeline.metrics import finish_run, metrics
+from github_pipeline.profiling import profiled
+from github_pipeline.records import records_from_dicts
+from github_pipeline.storage import code_version, fingerprint, get_backend, matches_fingerprint
+from github_pipeline.text_index import TextIndexBuilder, text_index_blob_for
 
 # === Config via env (with sane defaults) ===
+# BUCKET_NAME may also be a local directory or memory:// store (see storage.py)
 BUCKET_NAME = os.environ.get("BUCKET_NAME", "sunnysett-pipeline-output")
 RAW_BLOB = os.environ.get("RAW_BLOB", "github/raw/github_raw_data.json")
 MAPPED_BLOB = os.environ.get("MAPPED_BLOB", "github/mapped/github_mapped_data.json")
+SNAPSHOT_PREFIX = os.environ.get("SNAPSHOT_PREFIX", "")
 
-LOCAL_RAW = Path("/tmp/github_raw_data.json")
-LOCAL_MAPPED = Path("/tmp/github_mapped_data.json")
-
-
-def _download_from_gcs(bucket: str, blob: str, local_path: Path) -> None:
-    client = storage.Client()
-    bkt = client.bucket(bucket)
-    obj = bkt.blob(blob)
-    if not obj.exists():
-        raise FileNotFoundError(f"gs://{bucket}/{blob} not found")
-    local_path.parent.mkdir(parents=True, exist_ok=True)
-    obj.download_to_filename(str(local_path))
-
-
-def _upload_to_gcs(bucket: str, blob: str, local_path: Path) -> None:
-    client = storage.Client()
-    bkt = client.bucket(bucket)
-    obj = bkt.blob(blob)
-    obj.upload_from_filename(str(local_path))
+# modules whose source is part of the skip fingerprint: editing keywords,
+# the schema or the record layout reprocesses an unchanged raw blob
+CODE_MODULES = (
+    "github_pipeline.taxonomy_mapper",
+    "github_pipeline.taxonomy_schema",
+    "github_pipeline.records",
+    "github_pipeline.text_index",
+)
 
 
+@profiled("map_github_taxonomy")
 def main(request):
     """
     HTTP entrypoint.
@@ -47,9 +54,15 @@ def main(request):
       {
         "bucket": "...",
         "raw_blob": "...",
-        "mapped_blob": "..."
+        "mapped_blob": "...",
+        "force": false,         # reprocess even if the raw blob is unchanged
+        "snapshot_prefix": "",  # override SNAPSHOT_PREFIX ("" = no snapshot)
+        "profile": false,       # cProfile this run (see github_pipeline.profiling)
+        "profile_memory": false # + tracemalloc top allocations
       }
     """
+    metrics.reset()
+    store = None
     try:
         body = {}
         try:
@@ -61,28 +74,73 @@ def main(request):
         raw_blob = body.get("raw_blob", RAW_BLOB)
         mapped_blob = body.get("mapped_blob", MAPPED_BLOB)
 
-        print(f"Reading: gs://{bucket}/{raw_blob}")
-        _download_from_gcs(bucket, raw_blob, LOCAL_RAW)
-
-        with open(LOCAL_RAW, "r", encoding="utf-8") as f:
-            raw_models = json.load(f)
+        snapshot_prefix = body.get("snapshot_prefix", SNAPSHOT_PREFIX)
+        force = bool(body.get("force", False))
+
+        store = get_backend(bucket)
+        raw_info = store.stat(raw_blob)
+        if raw_info is None:
+            raise FileNotFoundError(f"{store.uri(raw_blob)} not found")
+
+        text_blob = text_index_blob_for(mapped_blob)
+        version = code_version(*CODE_MODULES)
+
+        # Skip-if-unchanged: compare the raw blob's metadata against what the
+        # last run recorded, reading only the head of the mapped file.
+        previous = None if force else store.read_json_head(mapped_blob, "metadata")
+        if matches_fingerprint(previous, raw_info, version) and store.exists(text_blob):
+            msg = {
+                "status": "skipped",
+                "reason": "source unchanged",
+                "bucket": bucket,
+                "mapped_blob": mapped_blob,
+                "count": previous.get("count")
+            }
+            metrics.incr("cache.hits")
+            finish_run("map_github_taxonomy", store)
+            print(msg)
+            return (codec.dumps(msg), 200, {"Content-Type": "application/json"})
+
+        metrics.incr("cache.misses")
+        print(f"Reading: {store.uri(raw_blob)}")
+        # compact slotted records; map_taxonomy fills task/data_types/categories in place
+        raw_models = records_from_dicts(store.read_json(raw_blob))
+
+        # Map taxonomy (local pipeline module, copied with the function)
+        from github_pipeline.taxonomy_mapper import map_models
 
-        # Map taxonomy
         mapped = map_models(raw_models)
 
         # Stamp a run metadata block
         out = {
             "metadata": {
-                "source": f"gs://{bucket}/{raw_blob}",
+                "source": store.uri(raw_blob),
+                **fingerprint(raw_info, version),
+                "count": len(mapped),
                 "generated_at": datetime.now(timezone.utc).isoformat()
             },
             "models": mapped
         }
 
-        with open(LOCAL_MAPPED, "w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2, ensure_ascii=False)
-
-        _upload_to_gcs(bucket, mapped_blob, LOCAL_MAPPED)
+        # full-text index, fed one mapped record at a time
+        with metrics.timer("text_index") as timer:
+            builder = TextIndexBuilder()
+            for model in mapped:
+                builder.add(model)
+            text_bytes = builder.to_bytes(source=store.uri(mapped_blob),
+                                          generated_at=out["metadata"]["generated_at"])
+            timer.records = len(builder)
+        store.write_bytes(text_blob, text_bytes, content_type="application/octet-stream")
+        print(f"🔤 Wrote text index ({len(text_bytes) / 1e6:.1f} MB) to {store.uri(text_blob)}")
+
+        # the mapped file goes last: its metadata block is what marks the run done
+        store.write_json(mapped_blob, out)
+        if snapshot_prefix:
+            from github_pipeline.snapshots import SnapshotStore
+
+            with metrics.timer("snapshot") as timer:
+                SnapshotStore(store, snapshot_prefix).commit("mapped", mapped, source=store.uri(mapped_blob))
+                timer.records = len(mapped)
 
         msg = {
             "status": "success",
@@ -90,10 +148,13 @@ def main(request):
             "mapped_blob": mapped_blob,
             "count": len(mapped)
         }
+        finish_run("map_github_taxonomy", store)
         print(msg)
-        return (json.dumps(msg), 200, {"Content-Type": "application/json"})
+        return (codec.dumps(msg), 200, {"Content-Type": "application/json"})
 
     except Exception as e:
         err = {"status": "error", "message": str(e)}
+        metrics.incr("errors")
+        finish_run("map_github_taxonomy", store)
         print(err)
-        return (json.dumps(err), 500, {"Content-Type": "application/json"})
+        return (codec.dumps(err), 500, {"Content-Type": "application/json"})
@@ -0,0 +1,201 @@
+"""
+Near-duplicate Detection (MinHash-LSH)
+--------------------------------------
+Forks, mirrors and re-uploads of the same model show up as separate repos
+with near-identical descriptions and topics. This stage runs right after
+load_github_models and groups them, so the downstream stages can tell
+(or, when collapsing, only ever see) one record per cluster.
+
+- Features per repo: word 3-shingles of the description, the topics, and
+  the repo name (forks keep it). Repos with fewer than MIN_FEATURES are
+  never clustered (too little text to tell).
+- MinHash: NUM_HASHES 32-bit values per repo, one SHAKE-128 output per
+  feature sliced into NUM_HASHES hash functions (cached per feature, so
+  shared topics and boilerplate shingles are hashed once).
+- LSH: BANDS bands of ROWS values. Repos sharing any band become candidate
+  pairs (sorted per band, so memory is one band at a time), and a pair is
+  a duplicate when its estimated Jaccard similarity is >= THRESHOLD.
+  Nothing is ever compared all-against-all.
+- Clusters are connected components of duplicate pairs; the canonical
+  repo is the one with the most stars (then the smallest modelId).
+
+Modes: "flag" (the default) keeps everything and sets `duplicate_of` on
+the non-canonical repos, which is carried through mapped and ready
+records; "collapse" keeps only canonical repos; "off" skips the stage. Either way the
+clusters are reported (written next to the raw blob as <raw>.dedup.json).
+
+Usage:
+    kept, report = dedup(records, mode="flag")
+"""
+
+import operator
+import re
+from array import array
+from functools import lru_cache
+
+from github_pipeline.metrics import metrics
+from github_pipeline.storage import sidecar_blob
+
+NUM_HASHES = 60
+BANDS = 12          # 12 bands x 5 rows: pairs above ~0.6 Jaccard become candidates
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.8     # estimated Jaccard similarity that makes a duplicate
+SHINGLE = 3         # words per description shingle
+MIN_FEATURES = 4
+MAX_PAIRWISE = 16   # larger buckets are only checked against their first repo
+MODES = ("collapse", "flag", "off")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def dedup_blob_for(blob: str) -> str:
+    """github/raw/github_raw_data.json -> github/raw/github_raw_data.dedup.json"""
+    return sidecar_blob(blob, ".dedup.json")
+
+
+def features(record) -> set:
+    """Description shingles, '#topic' and 'name:<repo>' strings of one record."""
+    words = _WORD.findall((record.get("description") or "").lower())
+    found = {" ".join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))} \
+        if words else set()
+    found.update(f"#{topic.lower()}" for topic in record.get("topics") or ())
+    name = (record.get("modelId") or "").rpartition("/")[2].lower()
+    if name:
+        found.add(f"name:{name}")
+    return found
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_hashes(feature: str) -> array:
+    import hashlib  # lazy: _hashlib (OpenSSL) is a cold-start cost
+
+    hashes = array("I")
+    hashes.frombytes(hashlib.shake_128(feature.encode("utf-8")).digest(4 * NUM_HASHES))
+    return hashes
+
+
+def minhash(feature_set) -> list:
+    """MinHash signature (NUM_HASHES ints) of a non-empty set of strings."""
+    return list(map(min, zip(*map(_feature_hashes, feature_set))))
+
+
+def signature(feature_set) -> list:
+    """MinHash signature of a record's features, or None below MIN_FEATURES."""
+    if len(feature_set) < MIN_FEATURES:
+        return None
+    return minhash(feature_set)
+
+
+def _similarity(sigs, a: int, b: int) -> float:
+    sa = sigs[a * NUM_HASHES:(a + 1) * NUM_HASHES]
+    sb = sigs[b * NUM_HASHES:(b + 1) * NUM_HASHES]
+    return sum(map(operator.eq, sa, sb)) / NUM_HASHES
+
+
+def find_clusters(records, threshold: float = THRESHOLD) -> list:
+    """
+    Near-duplicate clusters as lists of record indexes, canonical first.
+    Records that duplicate nothing are not listed.
+    """
+    # one flat signature array; ids[j] is the record behind signature j
+    sigs, ids = array("I"), []
+    for i, record in enumerate(records):
+        sig = signature(features(record))
+        if sig is not None:
+            sigs.extend(sig)
+            ids.append(i)
+    n = len(ids)
+
+    parent = list(range(n))
+    rejected = set()    # pairs (a * n + b) already compared and not similar
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def check(a, b):
+        ra, rb = find(a), find(b)
+        pair = a * n + b if a < b else b * n + a
+        if ra == rb or pair in rejected:
+            return
+        if _similarity(sigs, a, b) >= threshold:
+            parent[rb] = ra
+        else:
+            rejected.add(pair)
+
+    for band in range(BANDS):
+        keys = [hash(tuple(sigs[j * NUM_HASHES + band * ROWS:j * NUM_HASHES + (band + 1) * ROWS]))
+                for j in range(n)]
+        order = sorted(range(n), key=keys.__getitem__)
+        start = 0
+        for end in range(1, n + 1):
+            if end < n and keys[order[end]] == keys[order[start]]:
+                continue
+            bucket = order[start:end]
+            start = end
+            if len(bucket) < 2:
+                continue
+            if len(bucket) <= MAX_PAIRWISE:
+                for x in range(len(bucket)):
+                    for y in range(x + 1, len(bucket)):
+                        check(bucket[x], bucket[y])
+            else:
+                for other in bucket[1:]:
+                    check(bucket[0], other)
+
+    metrics.incr("dedup.comparisons", len(rejected))
+    groups = {}
+    for j in range(n):
+        groups.setdefault(find(j), []).append(ids[j])
+
+    def rank(i):
+        return -(records[i].get("stars") or 0), records[i].get("modelId") or ""
+
+    return sorted((sorted(members, key=rank) for members in groups.values() if len(members) > 1),
+                  key=lambda members: rank(members[0]))
+
+
+def dedup(records, mode: str = "flag", threshold: float = THRESHOLD) -> tuple:
+    """
+    Apply ``mode`` to raw records (dicts). Returns (records, report); the
+    input list is not modified, but "flag" sets fields on its dicts.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown dedup mode {mode!r} (one of {', '.join(MODES)})")
+    if mode == "off":
+        return records, {"mode": mode, "records": len(records)}
+
+    with metrics.timer("dedup") as timer:
+        clusters = find_clusters(records, threshold)
+        timer.records = len(records)
+
+    duplicate_of = {}
+    for members in clusters:
+        canonical = records[members[0]].get("modelId")
+        for i in members[1:]:
+            duplicate_of[i] = canonical
+
+    if mode == "collapse":
+        kept = [r for i, r in enumerate(records) if i not in duplicate_of]
+    else:
+        kept = records
+        for i, canonical in duplicate_of.items():
+            records[i]["duplicate_of"] = canonical
+
+    metrics.incr("dedup.clusters", len(clusters))
+    metrics.incr("dedup.duplicates", len(duplicate_of))
+    report = {
+        "mode": mode,
+        "threshold": threshold,
+        "records": len(records),
+        "kept": len(kept),
+        "clusters": [
+            {"canonical": records[members[0]].get("modelId"),
+             "duplicates": [records[i].get("modelId") for i in members[1:]]}
+            for members in clusters
+        ],
+    }
+    print(f"🧬 Dedup ({mode}): {len(clusters)} clusters, "
+          f"{len(duplicate_of)} near-duplicates of {len(records)} repos")
+    return kept, report
@@ -0,0 +1,170 @@
+"""
+Run Metrics
+-----------
+Lightweight, dependency-free instrumentation shared by the loaders, the
+mapper, the normalizers and the storage backends:
+
+- counters:   metrics.incr("github.api_calls")
+- histograms: metrics.observe("github.request_ms", 12.5)
+- timers:     with metrics.timer("map") as t: ...; t.records = len(models)
+
+One process-wide ``metrics`` object collects everything for the current
+run. Handlers call ``metrics.reset()`` at the start of a request and
+``finish_run()`` at the end. finish_run prints one structured (JSON) log
+line that Cloud Logging parses. If METRICS_PREFIX is set, it also writes
+the snapshot as <prefix>/<function>/<run_id>.json.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+SAMPLE_SIZE = 1024  # values kept per histogram for percentiles
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "min", "max", "samples", "_rng")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = []
+        self._rng = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(value)
+        else:
+            if self._rng is None:
+                import random  # only needed once the reservoir is full
+                self._rng = random.Random(0)
+            j = self._rng.randrange(self.count)
+            if j < SAMPLE_SIZE:
+                self.samples[j] = value
+
+    def summary(self):
+        values = sorted(self.samples)
+
+        def r(value):
+            return round(value, 3) if isinstance(value, float) else value
+
+        def pct(q):
+            return r(values[min(len(values) - 1, int(q * len(values)))]) if values else None
+
+        return {
+            "count": self.count,
+            "sum": r(self.total),
+            "min": r(self.min),
+            "max": r(self.max),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+        }
+
+
+class _Timer:
+    __slots__ = ("records",)
+
+    def __init__(self):
+        self.records = None
+
+
+class Metrics:
+    """Thread-safe counters, histograms and stage timers for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.run_id = os.urandom(6).hex()
+            self.started_at = datetime.now(timezone.utc).isoformat()
+            self._t0 = time.perf_counter()
+            self.counters = {}
+            self.histograms = {}
+            self.stages = {}  # name -> {"calls", "seconds", "records"}
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = _Histogram()
+            hist.add(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Time a stage; set ``.records`` on the yielded handle to get records/sec."""
+        handle = _Timer()
+        t0 = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "records": 0})
+                stage["calls"] += 1
+                stage["seconds"] += elapsed
+                if handle.records:
+                    stage["records"] += handle.records
+            self.observe(f"{name}.ms", elapsed * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {}
+            for name, s in self.stages.items():
+                entry = {"calls": s["calls"], "seconds": round(s["seconds"], 4)}
+                if s["records"]:
+                    entry["records"] = s["records"]
+                    entry["records_per_sec"] = round(s["records"] / s["seconds"], 1) if s["seconds"] else None
+                stages[name] = entry
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "elapsed_s": round(time.perf_counter() - self._t0, 4),
+                "stages": stages,
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {k: v.summary() for k, v in sorted(self.histograms.items())},
+            }
+
+    def slowest_stage(self):
+        with self._lock:
+            if not self.stages:
+                return None
+            return max(self.stages, key=lambda k: self.stages[k]["seconds"])
+
+
+metrics = Metrics()
+
+
+def finish_run(function: str, store=None, prefix: str = None) -> dict:
+    """
+    Emit the run's metrics as one structured log line and, when a prefix is
+    configured (argument or METRICS_PREFIX), as a JSON blob in ``store``.
+    """
+    snap = metrics.snapshot()
+    snap["function"] = function
+    snap["slowest_stage"] = metrics.slowest_stage()
+    print(json.dumps({"severity": "INFO", "message": f"run metrics: {function}", "metrics": snap},
+                     ensure_ascii=False))
+
+    prefix = prefix if prefix is not None else os.environ.get("METRICS_PREFIX", "")
+    if prefix and store is not None:
+        name = f"{prefix.rstrip('/')}/{function}/{snap['run_id']}.json"
+        try:
+            store.write_json(name, snap)
+        except Exception as e:  # metrics must never fail a run
+            print(f"⚠️ Could not write metrics to {store.uri(name)}: {e}")
+    return snap
@@ -0,0 +1,130 @@
+"""
+Partitioned Output Layout
+-------------------------
+Writes normalized models as Hive-style NDJSON partitions keyed by the
+`data_types` / `task` fields set by the taxonomy mapper:
+
+    <prefix>/data_type=vision/task=object-detection/part-0000.ndjson
+    <prefix>/data_type=nlp/task=text-generation/part-0000.ndjson
+    <prefix>/_manifest.json
+
+The manifest lists every partition with its record count and byte size, so
+readers can prune partitions before doing any I/O (see read_partitions).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from github_pipeline import codec
+
+MANIFEST_NAME = "_manifest.json"
+PART_SIZE = 50000  # records per part file
+
+
+def _safe(value) -> str:
+    """Partition values become path segments."""
+    return str(value or "unknown").replace("/", "_").replace("=", "_")
+
+
+def partition_key(model: dict) -> tuple:
+    """(data_type, task) of a normalized model; a model has at most one data type."""
+    data_types = model.get("data_types") or ["unknown"]
+    return _safe(data_types[0]), _safe(model.get("task"))
+
+
+def _join(prefix: str, name: str) -> str:
+    prefix = prefix.strip("/")
+    return f"{prefix}/{name}" if prefix else name
+
+
+def partition_path(prefix: str, data_type: str, task: str, part: int) -> str:
+    return _join(prefix, f"data_type={data_type}/task={task}/part-{part:04d}.ndjson")
+
+
+def build_partitions(models, prefix: str, part_size: int = PART_SIZE):
+    """
+    Group models into part files.
+
+    Returns:
+        (files, manifest_partitions)
+        files: {blob name: NDJSON bytes}
+        manifest_partitions: list of partition entries for the manifest
+    """
+    groups = defaultdict(list)
+    for model in models:
+        groups[partition_key(model)].append(model)
+
+    files = {}
+    partitions = []
+    for (data_type, task), rows in sorted(groups.items()):
+        entry = {"data_type": data_type, "task": task, "records": len(rows), "bytes": 0, "files": []}
+        for part, start in enumerate(range(0, len(rows), part_size)):
+            chunk = rows[start:start + part_size]
+            payload = codec.dumps_lines(chunk)
+            name = partition_path(prefix, data_type, task, part)
+            files[name] = payload
+            entry["files"].append({"name": name, "records": len(chunk), "bytes": len(payload)})
+            entry["bytes"] += len(payload)
+        partitions.append(entry)
+    return files, partitions
+
+
+def write_partitions(store, models, prefix: str, source: str = None,
+                     part_size: int = PART_SIZE, max_workers: int = 8) -> dict:
+    """
+    Write the partitioned layout plus manifest to a storage backend and drop
+    part files left over from earlier runs. Returns the manifest.
+    """
+    files, partitions = build_partitions(models, prefix, part_size)
+    store.write_many(files, max_workers=max_workers, content_type="application/x-ndjson")
+
+    manifest = {
+        "source": source,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "layout": "data_type/task",
+        "total_records": sum(p["records"] for p in partitions),
+        "total_bytes": sum(p["bytes"] for p in partitions),
+        "partitions": partitions,
+    }
+    store.write_json(_join(prefix, MANIFEST_NAME), manifest)
+
+    # the manifest is authoritative; stale parts are only cleaned up after it
+    for name in store.list(_join(prefix, "")):
+        if "data_type=" in name and name.endswith(".ndjson") and name not in files:
+            store.delete(name)
+
+    return manifest
+
+
+def read_manifest(store, prefix: str):
+    """Load the manifest, or None if the prefix has never been written."""
+    manifest_blob = _join(prefix, MANIFEST_NAME)
+    if not store.exists(manifest_blob):
+        return None
+    return store.read_json(manifest_blob)
+
+
+def select_files(manifest: dict, data_type: str = None, task: str = None) -> list:
+    """Part files matching the filters, decided from the manifest alone."""
+    names = []
+    for p in manifest["partitions"]:
+        if data_type and p["data_type"] != data_type:
+            continue
+        if task and p["task"] != task:
+            continue
+        names.extend(f["name"] for f in p["files"])
+    return names
+
+
+def read_partitions(store, prefix: str, data_type: str = None, task: str = None,
+                    max_workers: int = 8) -> list:
+    """Read only the partitions matching ``data_type`` / ``task``."""
+    manifest = read_manifest(store, prefix)
+    if manifest is None:
+        raise FileNotFoundError(f"{store.uri(_join(prefix, MANIFEST_NAME))} not found")
+
+    models = []
+    blobs = store.read_many(select_files(manifest, data_type, task), max_workers=max_workers)
+    for payload in blobs.values():
+        models.extend(codec.loads_lines(payload))
+    return models
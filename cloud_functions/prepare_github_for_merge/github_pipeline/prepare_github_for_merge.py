@@ -5,27 +5,72 @@ This function:
 1. Reads mapped GitHub model metadata from GCS.
 2. Normalizes it into a Hugging Face–aligned JSON list.
 3. Writes the normalized list back to GCS as the "ready" file.
+4. Records the mapped blob's generation/md5 and the code version of this
+   stage (CODE_MODULES, see storage.code_version) in a small sidecar
+   (<ready>.meta.json); the next trigger skips all work if both still match.
+5. Optionally writes a partitioned copy (data_type=/task= NDJSON parts plus
+   a manifest) when READY_PARTITION_PREFIX is set.
+6. Writes the binary search index (<ready>.idx, see search_index.py) for
+   the search_github_models function, stamped with the ready blob's
+   generation so the two are versioned together.
+7. Writes the similar-models neighbor table (<ready>.neighbors.idx, see
+   neighbors.py): top-K models by topic/description similarity per model.
+   Only up to NEIGHBORS_INLINE_MAX models; above that the build (minutes
+   of pure Python) is left to the offline `python -m github_pipeline.neighbors`
+   job and the search function keeps serving the previous table until then.
+8. Writes a change-data-capture delta (<ready>.delta.json, see delta.py):
+   inserts/updates/deletes by modelId against the previous run, found by
+   comparing per-record content hashes (kept in <ready>.hashes.json) that
+   leave out volatile fields such as ingested_at.
+9. Writes the keyed record store (<ready>.kv, see record_store.py): point
+   lookups by modelId and author-prefix scans over a memory map, without
+   parsing the ready JSON.
+10. Optionally keeps the run as a versioned snapshot (dataset "ready", see
+   snapshots.py) when SNAPSHOT_PREFIX is set: new records only, plus a
+   manifest of record hashes.
 
 Environment variables:
 - BUCKET_NAME: sunnysett-pipeline-output
 - MAPPED_BLOB: github/mapped/github_mapped_data.json
 - READY_BLOB:  github/ready_for_merge/github_ready_data.json
+- READY_PARTITION_PREFIX (optional): e.g. github/ready_for_merge/partitioned
+- SNAPSHOT_PREFIX (optional): e.g. github/snapshots
+- NEIGHBORS_INLINE_MAX (optional): largest corpus whose neighbor table is
+  built here (default neighbors.INLINE_MAX_MODELS, 0 = always offline)
 """
 
-import json
 import os
-from datetime import datetime
-from google.cloud import storage
+from datetime import datetime, timezone
+
+from github_pipeline.delta import delta_blob_for, hashes_blob_for
+from github_pipeline.metrics import finish_run, metrics
+from github_pipeline.neighbors import INLINE_MAX_MODELS, neighbors_blob_for
+from github_pipeline.partitioning import read_manifest, write_partitions
+from github_pipeline.record_store import record_store_blob_for
+from github_pipeline.search_index import index_blob_for
+from github_pipeline.storage import code_version, fingerprint, get_backend, matches_fingerprint, sidecar_blob
+
+# modules whose source is part of the skip fingerprint: a change to the
+# normalizer or to any output builder reprocesses an unchanged mapped blob
+CODE_MODULES = (
+    "github_pipeline.prepare_github_for_merge",
+    "github_pipeline.records",
+    "github_pipeline.partitioning",
+    "github_pipeline.search_index",
+    "github_pipeline.neighbors",
+    "github_pipeline.record_store",
+    "github_pipeline.delta",
+)
 
 
 def normalize_model(model: dict) -> dict:
     """Normalize a single GitHub model entry into a Hugging Face–style record."""
-    return {
+    ready = {
         "modelId": model.get("modelId"),
         "author": model.get("author"),
         "pipeline_tag": model.get("task", "unknown"),
         "tags": model.get("topics", []) + ["source:github"],
-        "library": model.get("language", "unknown"),
+        "library": model.get("library") or model.get("language", "unknown"),
         "license": model.get("license", "unknown"),
         "downloads": model.get("downloads", None),
         "likes": model.get("stars", 0),
@@ -39,47 +84,192 @@ def normalize_model(model: dict) -> dict:
         "safetensors": model.get("safetensors", False),
         "ingested_at": datetime.utcnow().isoformat() + "+00:00",
     }
+    # near-duplicates flagged by dedup keep their canonical repo
+    if model.get("duplicate_of"):
+        ready["duplicate_of"] = model["duplicate_of"]
+    return ready
+
+
+def meta_blob_for(ready_blob: str) -> str:
+    """Sidecar holding the run metadata of a ready blob (the blob itself is a plain list)."""
+    return sidecar_blob(ready_blob, ".meta.json")
+
+
+def _request_body(request) -> dict:
+    try:
+        return request.get_json(silent=True) or {}
+    except Exception:
+        return {}
 
 
 def handle_request(request):
     """
     Main callable invoked by the HTTP Cloud Function.
     Downloads mapped data, normalizes it, and re-uploads the ready file.
+    Optional JSON body:
+      {"force": true}                  reprocess an unchanged mapped blob
+      {"partition_prefix": "..."}      override READY_PARTITION_PREFIX
+      {"snapshot_prefix": "..."}       override SNAPSHOT_PREFIX
+      {"profile": true}                cProfile the run (see github_pipeline.profiling)
     """
+    metrics.reset()
+    store = None
     try:
         # Load environment variables
         bucket_name = os.environ["BUCKET_NAME"]
         mapped_blob = os.environ["MAPPED_BLOB"]
         ready_blob = os.environ["READY_BLOB"]
+        meta_blob = meta_blob_for(ready_blob)
+        index_blob = index_blob_for(ready_blob)
+        neighbors_blob = neighbors_blob_for(ready_blob)
+        kv_blob = record_store_blob_for(ready_blob)
+        delta_blob = delta_blob_for(ready_blob)
+        hashes_blob = hashes_blob_for(ready_blob)
+        body = _request_body(request)
+        force = bool(body.get("force", False))
+        partition_prefix = body.get("partition_prefix", os.environ.get("READY_PARTITION_PREFIX", ""))
+        snapshot_prefix = body.get("snapshot_prefix", os.environ.get("SNAPSHOT_PREFIX", ""))
+        neighbors_max = int(os.environ.get("NEIGHBORS_INLINE_MAX", INLINE_MAX_MODELS))
+
+        store = get_backend(bucket_name)
+        version = code_version(*CODE_MODULES)
+        mapped_info = store.stat(mapped_blob)
+        if mapped_info is None:
+            raise FileNotFoundError(f"{store.uri(mapped_blob)} not found")
+
+        # Skip-if-unchanged: two metadata lookups plus a tiny sidecar read
+        partitions_ready = not partition_prefix or read_manifest(store, partition_prefix) is not None
+        outputs_ready = all(store.exists(b) for b in (ready_blob, index_blob, kv_blob,
+                                                     delta_blob, hashes_blob))
+        if not force and partitions_ready and outputs_ready:
+            previous = store.read_json(meta_blob) if store.exists(meta_blob) else None
+            # the neighbor table only counts when the last run built it inline
+            neighbors_ready = not (previous or {}).get("neighbors_blob") or store.exists(neighbors_blob)
+            if neighbors_ready and matches_fingerprint(previous, mapped_info, version):
+                print(f"⏭️ Skipped: {store.uri(mapped_blob)} unchanged since last run")
+                metrics.incr("cache.hits")
+                finish_run("prepare_github_for_merge", store)
+                return {"status": "skipped", "reason": "source unchanged",
+                        "count": previous.get("count")}
 
-        print(f"📦 Loading from: gs://{bucket_name}/{mapped_blob}")
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(mapped_blob)
+        metrics.incr("cache.misses")
+        print(f"📦 Loading from: {store.uri(mapped_blob)}")
 
         # Read JSON from GCS
-        data = json.loads(blob.download_as_text())
+        data = store.read_json(mapped_blob)
 
         # Handle both structures: list or {"models": [...]}
         models = data.get("models", data) if isinstance(data, dict) else data
         if not isinstance(models, list):
             raise ValueError("Mapped file format invalid: expected list or {'models': list}")
 
-        # Normalize all entries
-        normalized = [normalize_model(m) for m in models]
+        # Normalize all entries (plain dicts: about twice as fast to build as
+        # ReadyRecords, see records.py)
+        with metrics.timer("normalize") as timer:
+            normalized = [normalize_model(m) for m in models]
+            timer.records = len(normalized)
 
         # Upload normalized data
-        output_blob = bucket.blob(ready_blob)
-        output_blob.upload_from_string(
-            json.dumps(normalized, indent=2, ensure_ascii=False),
-            content_type="application/json"
-        )
+        ready_info = store.write_json(ready_blob, normalized)
+        if partition_prefix:
+            manifest = write_partitions(store, normalized, partition_prefix,
+                                        source=store.uri(mapped_blob))
+            print(f"🗂️ Wrote {len(manifest['partitions'])} partitions under {store.uri(partition_prefix)}")
+
+        # the builder functions are only looked up when there is work to do
+        # (their modules come in above for the *_blob_for helpers)
+        from github_pipeline.delta import compute_delta
+        from github_pipeline.neighbors import build_neighbors
+        from github_pipeline.record_store import build_record_store
+        from github_pipeline.search_index import build_index
+
+        with metrics.timer("search_index") as timer:
+            index_bytes = build_index(normalized, ready_blob=ready_blob,
+                                      ready_generation=ready_info.generation,
+                                      generated_at=datetime.now(timezone.utc).isoformat())
+            store.write_bytes(index_blob, index_bytes, content_type="application/octet-stream")
+            timer.records = len(normalized)
+        print(f"🔎 Wrote search index ({len(index_bytes) / 1e6:.1f} MB) to {store.uri(index_blob)}")
+
+        # similar models from the mapped records (descriptions are not in the ready ones)
+        neighbors_inline = len(models) <= neighbors_max
+        if neighbors_inline:
+            with metrics.timer("neighbors") as timer:
+                neighbor_bytes = build_neighbors(models, ready_blob=ready_blob,
+                                                 ready_generation=ready_info.generation,
+                                                 generated_at=datetime.now(timezone.utc).isoformat())
+                store.write_bytes(neighbors_blob, neighbor_bytes, content_type="application/octet-stream")
+                timer.records = len(models)
+            print(f"🧭 Wrote neighbor table ({len(neighbor_bytes) / 1e6:.1f} MB) to {store.uri(neighbors_blob)}")
+        else:
+            metrics.incr("neighbors.deferred")
+            print(f"⏳ Neighbor table deferred: {len(models)} models > NEIGHBORS_INLINE_MAX={neighbors_max}; "
+                  f"run `python -m github_pipeline.neighbors {bucket_name}`")
+
+        with metrics.timer("record_store") as timer:
+            kv_bytes = build_record_store(normalized, ready_blob=ready_blob,
+                                          ready_generation=ready_info.generation,
+                                          generated_at=datetime.now(timezone.utc).isoformat())
+            store.write_bytes(kv_blob, kv_bytes, content_type="application/octet-stream")
+            timer.records = len(normalized)
+        print(f"🗝️ Wrote record store ({len(kv_bytes) / 1e6:.1f} MB) to {store.uri(kv_blob)}")
+
+        # delta against the hashes of the last run; the hashes are written
+        # after the delta, so a crash in between recomputes the same delta
+        with metrics.timer("delta") as timer:
+            previous_hashes = store.read_json(hashes_blob) if store.exists(hashes_blob) else {}
+            delta, hashes = compute_delta(normalized, previous_hashes.get("hashes"))
+            generated_at = datetime.now(timezone.utc).isoformat()
+            store.write_json(delta_blob, {
+                "ready_blob": ready_blob,
+                "base_generation": previous_hashes.get("ready_generation"),
+                "ready_generation": ready_info.generation,
+                "generated_at": generated_at,
+                **delta,
+            })
+            store.write_json(hashes_blob, {
+                "ready_generation": ready_info.generation,
+                "generated_at": generated_at,
+                "hashes": hashes,
+            })
+            timer.records = len(normalized)
+        counts = delta["counts"]
+        for name in ("inserts", "updates", "deletes"):
+            metrics.incr(f"delta.{name}", counts[name])
+        print(f"🔁 Wrote delta (+{counts['inserts']} ~{counts['updates']} -{counts['deletes']}, "
+              f"{counts['unchanged']} unchanged) to {store.uri(delta_blob)}")
+
+        if snapshot_prefix:
+            from github_pipeline.snapshots import SnapshotStore
+
+            with metrics.timer("snapshot") as timer:
+                SnapshotStore(store, snapshot_prefix).commit(
+                    "ready", normalized, source=store.uri(ready_blob),
+                    ready_generation=ready_info.generation)
+                timer.records = len(normalized)
+
+        # written after the ready blob and indexes, so a crash in between means a re-run
+        store.write_json(meta_blob, {
+            "source": store.uri(mapped_blob),
+            **fingerprint(mapped_info, version),
+            "ready_generation": ready_info.generation,
+            "index_blob": index_blob,
+            "neighbors_blob": neighbors_blob if neighbors_inline else None,
+            "record_store_blob": kv_blob,
+            "delta_blob": delta_blob,
+            "delta_counts": counts,
+            "count": len(normalized),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        })
 
         print(f"✅ Successfully processed {len(normalized)} models.")
-        print(f"💾 Saved to: gs://{bucket_name}/{ready_blob}")
+        print(f"💾 Saved to: {store.uri(ready_blob)}")
+        finish_run("prepare_github_for_merge", store)
 
-        return {"status": "success", "count": len(normalized)}
+        return {"status": "success", "count": len(normalized), "delta": counts}
 
     except Exception as e:
         print(f"❌ Error in handle_request: {e}")
+        metrics.incr("errors")
+        finish_run("prepare_github_for_merge", store)
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,117 @@
+"""
+On-demand Profiling
+-------------------
+Opt-in cProfile / tracemalloc wrapper for the HTTP entrypoints:
+
+    @profiled("map_github_taxonomy")
+    def main(request): ...
+
+Enable per request with a JSON body flag, or for every request via env:
+    {"profile": true}                   cProfile
+    {"profile": true, "profile_memory": true}   + tracemalloc
+    PROFILE=1 / PROFILE_MEMORY=1
+
+Reports are uploaded next to the data, under DIAGNOSTICS_PREFIX
+(default "diagnostics"):
+    <prefix>/<function>/<timestamp>_<run_id>.prof        (load with pstats / snakeviz)
+    <prefix>/<function>/<timestamp>_<run_id>.txt         top functions by cumulative time
+    <prefix>/<function>/<timestamp>_<run_id>_alloc.txt   top allocations (memory mode)
+
+When disabled the wrapper only checks the flags and calls the handler.
+"""
+
+import functools
+import io
+import os
+from datetime import datetime, timezone
+
+from github_pipeline.metrics import metrics
+from github_pipeline.storage import get_backend
+
+TOP_FUNCTIONS = 50
+TOP_ALLOCATIONS = 25
+
+
+def _truthy(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def _body(request) -> dict:
+    try:
+        return request.get_json(silent=True) or {}
+    except Exception:
+        return {}
+
+
+def _profile_report(profiler) -> tuple:
+    """(.prof bytes in pstats format, human-readable top list)"""
+    import marshal
+    import pstats
+
+    profiler.create_stats()
+    raw = marshal.dumps(profiler.stats)
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return raw, text.getvalue()
+
+
+def _alloc_report(snapshot) -> str:
+    lines = [f"Top {TOP_ALLOCATIONS} allocations by line"]
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def _upload(function, bucket, files):
+    store = get_backend(bucket)
+    prefix = os.environ.get("DIAGNOSTICS_PREFIX", "diagnostics").rstrip("/")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    base = f"{prefix}/{function}/{stamp}_{metrics.run_id}"
+    for suffix, payload in files.items():
+        name = base + suffix
+        store.write_bytes(name, payload, content_type="application/octet-stream")
+        print(f"🩺 Profile report: {store.uri(name)}")
+
+
+def profiled(function: str, default_bucket: str = "sunnysett-pipeline-output"):
+    """Decorator for an HTTP entrypoint ``handler(request)``."""
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(request):
+            body = _body(request)
+            cpu = _truthy(body.get("profile", os.environ.get("PROFILE", "")))
+            memory = _truthy(body.get("profile_memory", os.environ.get("PROFILE_MEMORY", "")))
+            if not (cpu or memory):
+                return handler(request)
+
+            import cProfile
+            import tracemalloc
+
+            profiler = cProfile.Profile() if cpu else None
+            if memory:
+                tracemalloc.start()
+            if profiler:
+                profiler.enable()
+            try:
+                return handler(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+                files = {}
+                if memory:
+                    files["_alloc.txt"] = _alloc_report(tracemalloc.take_snapshot()).encode("utf-8")
+                    tracemalloc.stop()
+                if profiler:
+                    raw, text = _profile_report(profiler)
+                    files[".prof"] = raw
+                    files[".txt"] = text.encode("utf-8")
+                bucket = body.get("bucket") or os.environ.get("BUCKET_NAME", default_bucket)
+                try:
+                    _upload(function, bucket, files)
+                except Exception as e:  # diagnostics must never fail a run
+                    print(f"⚠️ Could not upload profile: {e}")
+
+        return wrapper
+
+    return decorator
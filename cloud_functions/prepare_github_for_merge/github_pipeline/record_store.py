@@ -0,0 +1,237 @@
+"""
+Keyed Record Store
+------------------
+Random access to single ready records without downloading and parsing the
+whole ready JSON. prepare_github_for_merge writes it next to the ready
+blob (<ready>.kv), prepare_github_models next to its output file.
+
+- Point lookup by modelId in O(1): open-addressing hash table (CRC-32 of
+  the key, linear probing, load factor <= 1/2) over record ids; the key
+  bytes are compared, so collisions never return the wrong record.
+- Range scans by author prefix in O(log A + hits): records are stored
+  sorted by (author, modelId), and a sorted table of distinct authors maps
+  each author to its first record, so a prefix is one binary search plus a
+  contiguous run of records.
+- Records are length-prefixed (uint32) compact JSON (github_pipeline.codec),
+  so the records section can also be read front to back without offsets.
+
+On-disk layout (a binfile.py container: native byte order; sections
+8-byte aligned; offsets in the JSON header):
+    magic b"SSREC\\x00\\x00\\x01", uint32 header length, header JSON
+    key_offsets      uint32[N+1]   into key_bytes (modelIds, in record order)
+    key_bytes
+    slots            uint32[M]     record id + 1, 0 = empty; M a power of two
+    author_offsets   uint32[A+1]   into author_bytes (distinct authors, sorted)
+    author_bytes
+    author_start     uint32[A+1]   first record id of each author
+    record_offsets   uint64[N]     into records, at the length prefix
+    records          (uint32 length, JSON) per record
+
+Usage:
+    kv = RecordStore.open("github_ready_data.kv")
+    kv.get("ultralytics/yolov5")              # dict or None
+    list(kv.scan_author("hugging"))           # records of authors hugging*
+"""
+
+import sys
+from array import array
+from zlib import crc32
+
+from github_pipeline import binfile, codec
+from github_pipeline.storage import sidecar_blob
+
+MAGIC = b"SSREC\x00\x00\x01"
+_SECTIONS = ("key_offsets", "key_bytes", "slots", "author_offsets", "author_bytes",
+             "author_start", "record_offsets", "records")
+
+
+def record_store_blob_for(ready_blob: str) -> str:
+    """github/ready_for_merge/github_ready_data.json -> .../github_ready_data.kv"""
+    return sidecar_blob(ready_blob, ".kv")
+
+
+def _strings(values) -> tuple:
+    offsets, data = array("I", [0]), bytearray()
+    for value in values:
+        data += value.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, bytes(data)
+
+
+def build_record_store(records, **meta) -> bytes:
+    """Record store bytes for ready records (dicts or ReadyRecords); the first of duplicate modelIds wins."""
+    seen, rows, duplicates = set(), [], 0
+    for record in records:
+        key = record.get("modelId") or ""
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        rows.append(((record.get("author") or ""), key, record))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    n = len(rows)
+
+    key_offsets, key_bytes = _strings(key for _, key, _ in rows)
+
+    size = 1
+    while size < 2 * n:
+        size *= 2
+    slots = array("I", [0]) * size
+    mask = size - 1
+    for i, (_, key, _) in enumerate(rows):
+        s = crc32(key.encode("utf-8")) & mask
+        while slots[s]:
+            s = (s + 1) & mask
+        slots[s] = i + 1
+
+    authors, author_start = [], array("I")
+    for i, (author, _, _) in enumerate(rows):
+        if not authors or authors[-1] != author:
+            authors.append(author)
+            author_start.append(i)
+    author_start.append(n)
+    author_offsets, author_bytes = _strings(authors)
+
+    record_offsets, data = array("Q"), bytearray()
+    for _, _, record in rows:
+        payload = codec.dumps(record)
+        record_offsets.append(len(data))
+        data += len(payload).to_bytes(4, sys.byteorder)
+        data += payload
+
+    sections = {
+        "key_offsets": key_offsets.tobytes(),
+        "key_bytes": key_bytes,
+        "slots": slots.tobytes(),
+        "author_offsets": author_offsets.tobytes(),
+        "author_bytes": author_bytes,
+        "author_start": author_start.tobytes(),
+        "record_offsets": record_offsets.tobytes(),
+        "records": bytes(data),
+    }
+    header = {"count": n, "authors": len(authors), "duplicates_dropped": duplicates,
+              "byteorder": sys.byteorder, "meta": meta, "sections": {}}
+    return binfile.pack(MAGIC, header, {name: sections[name] for name in _SECTIONS})
+
+
+class RecordStore:
+    """Read side of build_record_store, over bytes or a read-only mmap."""
+
+    def __init__(self, buf):
+        view, header = binfile.read_header(buf, MAGIC, "record store")
+
+        self._buf = buf
+        self.header = header
+        self.meta = header["meta"]
+
+        def section(name, fmt=None):
+            return binfile.section(view, header, name, fmt)
+
+        self._key_offsets = section("key_offsets", "I")
+        self._key_bytes = section("key_bytes")
+        self._slots = section("slots", "I")
+        self._mask = len(self._slots) - 1
+        self._author_offsets = section("author_offsets", "I")
+        self._author_bytes = section("author_bytes")
+        self._author_start = section("author_start", "I")
+        self._record_offsets = section("record_offsets", "Q")
+        self._records = section("records")
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a store file read-only."""
+        return cls(binfile.map_file(path))
+
+    def __len__(self):
+        return self.header["count"]
+
+    def __iter__(self):
+        """All records in (author, modelId) order."""
+        return (self.record(i) for i in range(len(self)))
+
+    def __contains__(self, model_id):
+        return self.record_id(model_id) is not None
+
+    def key(self, i: int) -> str:
+        return bytes(self._key_bytes[self._key_offsets[i]:self._key_offsets[i + 1]]).decode("utf-8")
+
+    def author(self, a: int) -> str:
+        """The a-th distinct author, in sorted order."""
+        return bytes(self._author_bytes[self._author_offsets[a]:self._author_offsets[a + 1]]).decode("utf-8")
+
+    def record(self, i: int) -> dict:
+        pos = self._record_offsets[i]
+        length = int.from_bytes(self._records[pos:pos + 4], sys.byteorder)
+        return codec.loads(self._records[pos + 4:pos + 4 + length])
+
+    def record_id(self, model_id: str):
+        """Record id of ``model_id`` (hash probe), or None."""
+        if not len(self):
+            return None
+        key = model_id.encode("utf-8")
+        s = crc32(key) & self._mask
+        while True:
+            slot = self._slots[s]
+            if not slot:
+                return None
+            i = slot - 1
+            if self._key_bytes[self._key_offsets[i]:self._key_offsets[i + 1]] == key:
+                return i
+            s = (s + 1) & self._mask
+
+    def get(self, model_id: str, default=None):
+        """The record stored under ``model_id``, or ``default``."""
+        i = self.record_id(model_id)
+        return default if i is None else self.record(i)
+
+    def _author_bound(self, value: str) -> int:
+        """Index of the first distinct author >= ``value``."""
+        lo, hi = 0, self.header["authors"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.author(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def author_range(self, prefix: str) -> range:
+        """Record ids of every author starting with ``prefix`` (contiguous)."""
+        # the authors with a prefix are exactly those in [prefix, prefix + U+10FFFF)
+        lo = self._author_bound(prefix)
+        hi = self._author_bound(prefix + "\U0010ffff") if prefix else self.header["authors"]
+        return range(self._author_start[lo], self._author_start[hi])
+
+    def scan_author(self, prefix: str, limit: int = None):
+        """Records of authors starting with ``prefix``, in (author, modelId) order."""
+        ids = self.author_range(prefix)
+        if limit is not None:
+            ids = ids[:limit]
+        return (self.record(i) for i in ids)
+
+
+def open_record_store(store, blob: str) -> RecordStore:
+    """Map ``blob`` from a storage backend (see binfile.open_mapped)."""
+    return binfile.open_mapped(store, blob, RecordStore.open, ".kv")
+
+
+def _main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Point lookups and author scans over a record store")
+    parser.add_argument("path", help="record store file (<ready>.kv)")
+    parser.add_argument("--get", action="append", default=[], metavar="MODEL_ID")
+    parser.add_argument("--author", metavar="PREFIX", help="records of authors with this prefix")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    kv = RecordStore.open(args.path)
+    for model_id in args.get:
+        print(codec.dumps({model_id: kv.get(model_id)}).decode("utf-8"))
+    if args.author is not None:
+        for record in kv.scan_author(args.author, args.limit):
+            print(codec.dumps(record).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    _main()
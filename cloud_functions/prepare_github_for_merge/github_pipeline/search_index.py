@@ -0,0 +1,125 @@
+"""
+Binary Search Index
+-------------------
+A prebuilt, memory-mappable file version of QueryIndex
+(github_pipeline.query_index). prepare_github_for_merge writes it next to
+the ready blob; the search function maps it at cold start. Opening costs one
+small JSON header parse, not a parse of the full dataset.
+
+Layout (a binfile.py container: native byte order, recorded in the
+header; sections 8-byte aligned):
+
+    0    magic            b"SSIDX\\x00\\x00\\x01"
+    8    header length    uint32
+    12   header           JSON: count, sort, direction, source metadata and
+                          {field: {value: [byte offset, length]}} postings
+    ...  postings         uint32 doc ids, rank-ordered per value
+    ...  doc offsets      uint64 x (count + 1)
+    ...  docs             one compact JSON object per doc, in rank order
+
+Doc ids are ranks, exactly as in QueryIndex, so MappedIndex reuses its
+early-terminating top-K queries unchanged. Postings are zero-copy
+memoryviews into the map, and only the docs a query returns are decoded.
+"""
+
+import sys
+from array import array
+
+from github_pipeline import binfile, codec
+from github_pipeline.query_index import QueryIndex
+from github_pipeline.storage import sidecar_blob
+
+MAGIC = b"SSIDX\x00\x00\x01"
+
+
+def index_blob_for(ready_blob: str) -> str:
+    """github/ready_for_merge/github_ready_data.json -> .../github_ready_data.idx"""
+    return sidecar_blob(ready_blob, ".idx")
+
+
+def build_index(records, **meta) -> bytes:
+    """Serialize ``records`` (ready dicts or ReadyRecords) into index bytes."""
+    index = records if isinstance(records, QueryIndex) else QueryIndex(records)
+
+    docs = bytearray()
+    offsets = array("Q", [0])
+    for doc in index.docs:
+        docs += codec.dumps(doc)
+        offsets.append(len(docs))
+
+    postings = bytearray()
+    fields = {}
+    for field, values in index.postings.items():
+        fields[field] = {}
+        for value, plist in values.items():
+            fields[field][value] = [len(postings), len(plist)]
+            postings += plist.tobytes()
+
+    header = {
+        "count": len(index.docs),
+        "sort": index.sort,
+        "direction": index.direction,
+        "byteorder": sys.byteorder,
+        "meta": meta,
+        "fields": fields,
+    }
+    # this format keeps its section offsets as top-level header fields
+    header.update(postings_at=0, offsets_at=0, docs_at=0)
+
+    def place(header, positions):
+        header.update(postings_at=positions["postings"][0], offsets_at=positions["offsets"][0],
+                      docs_at=positions["docs"][0])
+
+    return binfile.pack(MAGIC, header, {"postings": bytes(postings), "offsets": offsets.tobytes(),
+                                        "docs": bytes(docs)}, place)
+
+
+class _Docs:
+    """Sequence view of the docs section; decodes one doc per access."""
+
+    def __init__(self, buf, offsets, count):
+        self._buf = buf
+        self._offsets = offsets
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return codec.loads(self._buf[self._offsets[i]:self._offsets[i + 1]])
+
+
+class MappedIndex(QueryIndex):
+    """QueryIndex over a buffer produced by build_index (bytes or mmap)."""
+
+    def __init__(self, buf):
+        view, header = binfile.read_header(buf, MAGIC, "search index")
+
+        self._buf = buf
+        self.meta = header["meta"]
+        self.sort = header["sort"]
+        self.direction = header["direction"]
+        count = header["count"]
+
+        postings_at = header["postings_at"]
+        self.postings = {}
+        for field, values in header["fields"].items():
+            self.postings[field] = {
+                value: view[postings_at + off:postings_at + off + 4 * n].cast("I")
+                for value, (off, n) in values.items()
+            }
+        offsets_at, docs_at = header["offsets_at"], header["docs_at"]
+        offsets = view[offsets_at:docs_at].cast("Q")
+        self.docs = _Docs(view[docs_at:], offsets, count)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an index file read-only."""
+        return cls(binfile.map_file(path))
+
+
+def open_index(store, blob: str) -> MappedIndex:
+    """Map ``blob`` from a storage backend (see binfile.open_mapped)."""
+    return binfile.open_mapped(store, blob, MappedIndex.open, ".idx")
@@ -0,0 +1,306 @@
+"""
+Content-addressed Snapshot Store
+--------------------------------
+Every run overwrites the raw, mapped and ready blobs, so history is lost,
+and dated full copies would cost one full dataset per run. Instead each
+record is stored once, keyed by its content hash (delta.content_hash:
+canonical JSON without volatile fields), and a run only writes the
+records that are new plus a manifest listing the hashes of its snapshot.
+
+Layout under a prefix (SNAPSHOT_PREFIX, e.g. github/snapshots):
+    segments/<hash>.seg                 records first seen in one run
+    <dataset>/<snapshot_id>.manifest    record hashes of one run, in order
+
+New records are found against the dataset's latest manifest, so a run
+stores O(changed records) plus a manifest of N * (DIGEST + 4) bytes. A
+record that disappears and comes back later is stored again (rare, cheap).
+
+Both files are binfile.py containers like the other binary sidecars
+(native byte order; sections 8-byte aligned; offsets in the JSON header):
+    magic, uint32 header length, header JSON
+    segment:  hashes uint8[N*DIGEST] (sorted), offsets uint64[N+1],
+              payload (canonical JSON records, back to back)
+    manifest: hashes uint8[N*DIGEST] (snapshot order), segment_ids uint32[N]
+              into header["segments"]
+
+Reading a segment starts with ranged reads of its header and hash/offset
+tables; a full snapshot pulls whole segments in parallel, a diff only the
+records whose hashes differ. Volatile fields (ingested_at) are stored once
+per manifest with the first record's value, and restored on every record.
+
+Usage:
+    snaps = SnapshotStore(store, "github/snapshots")
+    snaps.commit("ready", records, source=...)      # -> summary dict
+    snaps.load("ready")                              # latest, list of dicts
+    snaps.diff("ready", old_id, new_id)              # delta.compute_delta shape
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+from github_pipeline import binfile, codec
+from github_pipeline.delta import VOLATILE_FIELDS, canonical_json
+from github_pipeline.metrics import metrics
+
+SEGMENT_MAGIC = b"SSSEG\x00\x00\x01"
+MANIFEST_MAGIC = b"SSMAN\x00\x00\x01"
+DIGEST = 16
+WHOLE_SEGMENT = 0.125   # fetch the whole segment above this share of its records
+
+
+def _read_header(store, blob: str, magic: bytes) -> dict:
+    """Segment header by ranged reads, without fetching the segment."""
+    what = f"snapshot segment ({store.uri(blob)})"
+    size = binfile.header_length(store.read_bytes(blob, 0, binfile.HEADER_AT), magic, what)
+    return binfile.parse_header(store.read_bytes(blob, binfile.HEADER_AT, binfile.HEADER_AT + size), what)
+
+
+def _digest(payload: bytes) -> bytes:
+    import hashlib  # lazy: _hashlib (OpenSSL) is a cold-start cost
+
+    return hashlib.blake2b(payload, digest_size=DIGEST).digest()
+
+
+class Manifest:
+    """One snapshot: record hashes in order, and the segment holding each."""
+
+    def __init__(self, buf):
+        view, self.header = binfile.read_header(buf, MANIFEST_MAGIC, "snapshot manifest")
+        hashes = bytes(binfile.section(view, self.header, "hashes"))
+        self.hashes = [hashes[i:i + DIGEST] for i in range(0, len(hashes), DIGEST)]
+        self.segment_ids = binfile.section(view, self.header, "segment_ids", "I")
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @property
+    def snapshot_id(self) -> str:
+        return self.header["snapshot_id"]
+
+    def locations(self) -> dict:
+        """{hash: segment name} of every record in the snapshot."""
+        segments = self.header["segments"]
+        return {h: segments[s] for h, s in zip(self.hashes, self.segment_ids)}
+
+
+class _Segment:
+    """Lazy reader over one segment blob: header and tables first, records on demand."""
+
+    def __init__(self, store, blob: str):
+        self.store = store
+        self.blob = blob
+        self.header = _read_header(store, blob, SEGMENT_MAGIC)
+        sections = self.header["sections"]
+        # hashes and offsets are adjacent: one ranged read for both
+        lo = sections["hashes"][0]
+        hi = sections["offsets"][0] + sections["offsets"][1]
+        tables = store.read_bytes(blob, lo, hi)
+        start, length = sections["hashes"]
+        self.hashes = tables[start - lo:start - lo + length]
+        start, length = sections["offsets"]
+        self.offsets = memoryview(tables[start - lo:start - lo + length]).cast("Q")
+        self.payload_start = sections["payload"][0]
+
+    def __len__(self):
+        return self.header["count"]
+
+    def _find(self, digest: bytes):
+        i = bisect_left(range(len(self)), digest,
+                        key=lambda j: self.hashes[j * DIGEST:(j + 1) * DIGEST])
+        if i < len(self) and self.hashes[i * DIGEST:(i + 1) * DIGEST] == digest:
+            return i
+        raise KeyError(f"{self.store.uri(self.blob)}: record {digest.hex()} missing")
+
+    def fetch(self, digests) -> dict:
+        """{hash: canonical JSON bytes} for ``digests`` (all stored in this segment)."""
+        digests = set(digests)
+        if len(digests) > len(self) * WHOLE_SEGMENT:
+            payload = self.store.read_bytes(self.blob, self.payload_start)
+            out = {}
+            for i in range(len(self)):
+                digest = self.hashes[i * DIGEST:(i + 1) * DIGEST]
+                if digest in digests:
+                    out[digest] = payload[self.offsets[i]:self.offsets[i + 1]]
+            if len(out) != len(digests):
+                raise KeyError(f"{self.store.uri(self.blob)}: {len(digests) - len(out)} records missing")
+            return out
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def read(digest):
+            i = self._find(digest)
+            base = self.payload_start
+            return self.store.read_bytes(self.blob, base + self.offsets[i], base + self.offsets[i + 1])
+
+        digests = list(digests)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return dict(zip(digests, executor.map(read, digests)))
+
+
+class SnapshotStore:
+    """Versioned, content-addressed snapshots of record lists under ``prefix``."""
+
+    def __init__(self, store, prefix: str):
+        self.store = store
+        self.prefix = prefix.rstrip("/")
+
+    def _manifest_blob(self, dataset: str, snapshot_id: str) -> str:
+        return f"{self.prefix}/{dataset}/{snapshot_id}.manifest"
+
+    def snapshots(self, dataset: str) -> list:
+        """Snapshot ids of ``dataset``, oldest first."""
+        base = f"{self.prefix}/{dataset}/"
+        return [name[len(base):-len(".manifest")] for name in self.store.list(base)
+                if name.endswith(".manifest") and "/" not in name[len(base):]]
+
+    def manifest(self, dataset: str, snapshot_id: str = None) -> Manifest:
+        """A snapshot's manifest; the latest one when ``snapshot_id`` is None."""
+        if snapshot_id is None:
+            ids = self.snapshots(dataset)
+            if not ids:
+                raise FileNotFoundError(f"no snapshots of {dataset!r} under {self.store.uri(self.prefix)}")
+            snapshot_id = ids[-1]
+        return Manifest(self.store.read_bytes(self._manifest_blob(dataset, snapshot_id)))
+
+    def commit(self, dataset: str, records, snapshot_id: str = None, **meta) -> dict:
+        """
+        Store a snapshot of ``records`` (dicts or _Records). Only records
+        missing from the dataset's latest snapshot are written, as one new
+        segment. Returns a summary of what was stored.
+        """
+        created_at = datetime.now(timezone.utc)
+        snapshot_id = snapshot_id or created_at.strftime("%Y%m%dT%H%M%S%fZ")
+        ids = self.snapshots(dataset)
+        if snapshot_id in ids:
+            raise ValueError(f"snapshot {dataset}/{snapshot_id} already exists")
+        if ids and snapshot_id < ids[-1]:
+            raise ValueError(f"snapshot id {snapshot_id!r} sorts before the latest ({ids[-1]!r})")
+        known = self.manifest(dataset, ids[-1]).locations() if ids else {}
+
+        fields, volatile = [], {}
+        hashes, new = [], {}
+        for record in records:
+            if not fields:
+                fields = list(record.keys())
+                volatile = {f: record.get(f) for f in VOLATILE_FIELDS if f in record}
+            payload = canonical_json(record).encode("utf-8")
+            digest = _digest(payload)
+            hashes.append(digest)
+            if digest not in known:
+                new[digest] = payload
+
+        segment_bytes = 0
+        if new:
+            order = sorted(new)
+            offsets, pos = array("Q", [0]), 0
+            for digest in order:
+                pos += len(new[digest])
+                offsets.append(pos)
+            table = b"".join(order)
+            data = binfile.pack(SEGMENT_MAGIC, {"count": len(order), "digest_size": DIGEST,
+                                         "dataset": dataset, "snapshot_id": snapshot_id},
+                         {"hashes": table, "offsets": offsets.tobytes(),
+                          "payload": b"".join(new[d] for d in order)})
+            segment = f"{self.prefix}/segments/{_digest(table).hex()}.seg"
+            if not self.store.exists(segment):
+                self.store.write_bytes(segment, data)
+                segment_bytes = len(data)
+            for digest in order:
+                known[digest] = segment
+
+        segments, segment_ids = {}, array("I")
+        for digest in hashes:
+            segment_ids.append(segments.setdefault(known[digest], len(segments)))
+        data = binfile.pack(MANIFEST_MAGIC, {
+            "dataset": dataset,
+            "snapshot_id": snapshot_id,
+            "parent": ids[-1] if ids else None,
+            "created_at": created_at.isoformat(),
+            "count": len(hashes),
+            "fields": fields,
+            "volatile": volatile,
+            "segments": list(segments),
+            "meta": meta,
+        }, {"hashes": b"".join(hashes), "segment_ids": segment_ids.tobytes()})
+        self.store.write_bytes(self._manifest_blob(dataset, snapshot_id), data)
+
+        metrics.incr("snapshot.records", len(hashes))
+        metrics.incr("snapshot.new_records", len(new))
+        summary = {
+            "dataset": dataset,
+            "snapshot_id": snapshot_id,
+            "count": len(hashes),
+            "new_records": len(new),
+            "segment_bytes": segment_bytes,
+            "manifest_bytes": len(data),
+        }
+        print(f"🗃️ Snapshot {dataset}/{snapshot_id}: {len(hashes)} records, {len(new)} new "
+              f"({(segment_bytes + len(data)) / 1e6:.1f} MB written)")
+        return summary
+
+    def _fetch(self, manifest: Manifest, digests) -> dict:
+        """{hash: canonical JSON bytes} for hashes of ``manifest``, one reader per segment."""
+        locations = manifest.locations()
+        by_segment = {}
+        for digest in digests:
+            by_segment.setdefault(locations[digest], []).append(digest)
+        out = {}
+        for blob, wanted in by_segment.items():
+            out.update(_Segment(self.store, blob).fetch(wanted))
+        return out
+
+    @staticmethod
+    def _restore(payload: bytes, header: dict) -> dict:
+        data = codec.loads(payload)
+        data.update(header["volatile"])
+        ordered = {f: data.pop(f) for f in header["fields"] if f in data}
+        ordered.update(data)
+        return ordered
+
+    def load(self, dataset: str, snapshot_id: str = None) -> list:
+        """Rebuild a snapshot (the latest by default) as a list of dicts, in run order."""
+        manifest = self.manifest(dataset, snapshot_id)
+        payloads = self._fetch(manifest, set(manifest.hashes))
+        return [self._restore(payloads[d], manifest.header) for d in manifest.hashes]
+
+    def diff(self, dataset: str, old_id: str, new_id: str = None) -> dict:
+        """
+        Changes from snapshot ``old_id`` to ``new_id`` (latest by default),
+        keyed by modelId, in the shape of delta.compute_delta. Only records
+        whose hashes differ are read.
+        """
+        old = self.manifest(dataset, old_id)
+        new = self.manifest(dataset, new_id)
+        old_set, new_set = set(old.hashes), set(new.hashes)
+        removed, added = old_set - new_set, new_set - old_set
+
+        removed_payloads = self._fetch(old, removed)
+        added_payloads = self._fetch(new, added)
+        before = {}
+        for digest in removed:
+            record = self._restore(removed_payloads[digest], old.header)
+            before[record.get("modelId")] = record
+
+        inserts, updates, seen = [], [], set()
+        for digest in new.hashes:
+            if digest not in added or digest in seen:
+                continue
+            seen.add(digest)
+            record = self._restore(added_payloads[digest], new.header)
+            (updates if record.get("modelId") in before else inserts).append(record)
+        after = {r.get("modelId") for r in updates}
+        deletes = sorted(key for key in before if key not in after)
+        return {
+            "base": old.snapshot_id,
+            "snapshot": new.snapshot_id,
+            "counts": {
+                "inserts": len(inserts),
+                "updates": len(updates),
+                "deletes": len(deletes),
+                "unchanged": len(new_set & old_set),
+            },
+            "inserts": inserts,
+            "updates": updates,
+            "deletes": deletes,
+        }
@@ -0,0 +1,464 @@
+"""
+Full-text Index (BM25)
+----------------------
+Free-text search over `description`, `topics` and `modelId`
+("lightweight segmentation for drones"). The map_github_taxonomy stage
+builds it with one ``add()`` per mapped record and writes it next to the
+mapped blob (<mapped>.text.idx).
+
+Scoring is BM25 (k1=1.2, b=0.75). Each posting stores its BM25 contribution
+precomputed at build time and quantized to one byte (an "impact"). A query
+score is therefore a sum of small integers, and every term carries an
+upper bound: its largest impact.
+
+Top-K retrieval uses MaxScore. Terms are ordered by upper bound; once the
+k-th best score exceeds the sum of the smallest bounds, those terms become
+"non-essential". Only documents from the essential terms are enumerated,
+and non-essential terms are probed by binary search only while they could
+still lift a document over the threshold. When a single term is left
+essential, its per-block maxima (BLOCK postings each) let whole blocks be
+skipped.
+
+Common terms (in at least 1/DENSE_RATIO of the docs) also store a bitmap.
+Queries of up to SUBSET_TERMS terms that hit one go through a term-subset
+pass first: docs are grouped by exactly which query terms they contain
+(int bitset AND / AND NOT), and groups are scored in order of their bound
+until none can beat the threshold. On vocabularies of common words this
+replaces most of the union walk.
+
+On-disk layout (a binfile.py container: native byte order; sections
+8-byte aligned; offsets in the JSON header):
+    magic b"SSTXT\\x00\\x00\\x01", uint32 header length, header JSON
+    term_offsets  uint32[V+1]   into term_bytes (terms sorted, utf-8)
+    term_bytes
+    term_starts   uint32[V+1]   first posting of each term
+    block_starts  uint32[V+1]   first block max of each term
+    term_max      uint8[V]      upper bound per term
+    bitmap_ids    uint32[V]     slot in bitmaps, or 0xFFFFFFFF
+    doc_ids       uint32[P]     per term, ascending
+    impacts       uint8[P]
+    block_max     uint8[B]
+    bitmaps       ceil(N/8) bytes per dense term, little-endian bit order
+    key_offsets   uint32[N+1]   into key_bytes (modelIds, by doc id)
+    key_bytes
+
+The sections are fixed-width so a memory-mapped index is queried without
+decoding postings. That costs 5 bytes per posting plus 1 byte per block,
+plus N/8 bytes per dense term.
+"""
+
+import heapq
+import math
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from github_pipeline import binfile
+from github_pipeline.storage import sidecar_blob
+
+MAGIC = b"SSTXT\x00\x00\x01"
+K1 = 1.2
+B = 0.75
+BLOCK = 128
+DENSE_RATIO = 32    # terms in >= 1/32 of the docs also get a bitmap
+DENSE_MIN_DOCS = 1024
+SUBSET_TERMS = 8    # longer queries skip the term-subset pass
+SUBSET_CAP = 4096   # larger term-subset groups are left to MaxScore
+_NO_BITMAP = 0xFFFFFFFF
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the this to with".split()
+)
+_SECTIONS = ("term_offsets", "term_bytes", "term_starts", "block_starts", "term_max",
+             "bitmap_ids", "doc_ids", "impacts", "block_max", "bitmaps",
+             "key_offsets", "key_bytes")
+
+
+def text_index_blob_for(mapped_blob: str) -> str:
+    """github/mapped/github_mapped_data.json -> github/mapped/github_mapped_data.text.idx"""
+    return sidecar_blob(mapped_blob, ".text.idx")
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def record_tokens(record) -> list:
+    """Tokens of the indexed fields of one record (dict or pipeline record)."""
+    topics = record.get("topics") or []
+    text = " ".join([record.get("description") or "", " ".join(topics), record.get("modelId") or ""])
+    return tokenize(text)
+
+
+class TextIndexBuilder:
+    """Accumulates documents one at a time; ``to_bytes()`` writes the index."""
+
+    def __init__(self):
+        self.keys = []
+        self.lengths = array("I")
+        self.postings = {}  # term -> (doc ids, term frequencies)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, record):
+        doc_id = len(self.keys)
+        tokens = record_tokens(record)
+        self.keys.append(record.get("modelId") or "")
+        self.lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            plist = self.postings.get(term)
+            if plist is None:
+                plist = self.postings[term] = (array("I"), array("H"))
+            plist[0].append(doc_id)
+            plist[1].append(min(tf, 0xFFFF))
+
+    def to_bytes(self, **meta) -> bytes:
+        n = len(self.keys)
+        avgdl = (sum(self.lengths) / n) if n else 0.0
+        norm = [K1 * (1 - B + B * dl / avgdl) if avgdl else K1 for dl in self.lengths]
+
+        # pass 1: exact BM25 contributions, to find the quantization scale
+        terms = sorted(self.postings)
+        scores = {}
+        scale = 0.0
+        for term in terms:
+            docs, tfs = self.postings[term]
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            s = [idf * tf * (K1 + 1) / (tf + norm[d]) for d, tf in zip(docs, tfs)]
+            scores[term] = s
+            scale = max(scale, max(s))
+
+        # pass 2: one-byte impacts (at least 1, so every match counts)
+        q = 255 / scale if scale else 0.0
+        sections = {name: bytearray() for name in _SECTIONS}
+        term_offsets, term_starts, block_starts = array("I", [0]), array("I", [0]), array("I", [0])
+        term_max, bitmap_ids = array("B"), array("I")
+        doc_ids, impacts, block_max = array("I"), array("B"), array("B")
+        term_bytes, bitmaps = bytearray(), bytearray()
+        nbytes = (n + 7) // 8
+        dense = n >= DENSE_MIN_DOCS
+        for term in terms:
+            docs = self.postings[term][0]
+            imp = array("B", [max(1, min(255, round(s * q))) for s in scores.pop(term)])
+            term_bytes += term.encode("utf-8")
+            term_offsets.append(len(term_bytes))
+            doc_ids.extend(docs)
+            impacts.extend(imp)
+            term_starts.append(len(doc_ids))
+            block_max.extend(max(imp[i:i + BLOCK]) for i in range(0, len(imp), BLOCK))
+            block_starts.append(len(block_max))
+            term_max.append(max(imp))
+            if dense and len(docs) * DENSE_RATIO >= n:
+                bitmap = bytearray(nbytes)
+                for d in docs:
+                    bitmap[d >> 3] |= 1 << (d & 7)
+                bitmap_ids.append(len(bitmaps) // nbytes)
+                bitmaps += bitmap
+            else:
+                bitmap_ids.append(_NO_BITMAP)
+
+        key_bytes = bytearray()
+        key_offsets = array("I", [0])
+        for key in self.keys:
+            key_bytes += key.encode("utf-8")
+            key_offsets.append(len(key_bytes))
+
+        sections.update(
+            term_offsets=term_offsets.tobytes(), term_bytes=bytes(term_bytes),
+            term_starts=term_starts.tobytes(), block_starts=block_starts.tobytes(),
+            term_max=term_max.tobytes(), bitmap_ids=bitmap_ids.tobytes(),
+            doc_ids=doc_ids.tobytes(), impacts=impacts.tobytes(),
+            block_max=block_max.tobytes(), bitmaps=bytes(bitmaps), key_offsets=key_offsets.tobytes(),
+            key_bytes=bytes(key_bytes),
+        )
+        header = {
+            "docs": n, "terms": len(terms), "postings": len(doc_ids), "avgdl": avgdl,
+            "k1": K1, "b": B, "block": BLOCK, "scale": scale / 255 if scale else 0.0,
+            "byteorder": sys.byteorder, "meta": meta, "sections": {},
+        }
+        return binfile.pack(MAGIC, header, {name: sections[name] for name in _SECTIONS})
+
+
+class TextIndex:
+    """Read side over the bytes of ``TextIndexBuilder.to_bytes`` (or an mmap)."""
+
+    def __init__(self, buf):
+        view, header = binfile.read_header(buf, MAGIC, "text index")
+
+        self._buf = buf
+        self.header = header
+        self.meta = header["meta"]
+        self.scale = header["scale"]
+        self.block = header["block"]
+
+        def section(name, fmt=None):
+            return binfile.section(view, header, name, fmt)
+
+        self._term_offsets = section("term_offsets", "I")
+        self._term_bytes = section("term_bytes")
+        self._term_starts = section("term_starts", "I")
+        self._block_starts = section("block_starts", "I")
+        self._term_max = section("term_max")
+        self._bitmap_ids = section("bitmap_ids", "I")
+        self._bitmaps = section("bitmaps")
+        self._doc_ids = section("doc_ids", "I")
+        self._impacts = section("impacts")
+        self._block_max = section("block_max")
+        self._key_offsets = section("key_offsets", "I")
+        self._key_bytes = section("key_bytes")
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an index file read-only."""
+        return cls(binfile.map_file(path))
+
+    def __len__(self):
+        return self.header["docs"]
+
+    def _term_id(self, term: str):
+        """Binary search in the sorted term table."""
+        target = term.encode("utf-8")
+        offsets, raw = self._term_offsets, self._term_bytes
+        lo, hi = 0, self.header["terms"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(raw[offsets[mid]:offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.header["terms"] and bytes(raw[offsets[lo]:offsets[lo + 1]]) == target:
+            return lo
+        return None
+
+    def key(self, doc_id: int) -> str:
+        return bytes(self._key_bytes[self._key_offsets[doc_id]:self._key_offsets[doc_id + 1]]).decode("utf-8")
+
+    def _bitmap(self, t: int, ids) -> int:
+        """Term ``t``'s docs as an int bitset: stored for dense terms, else built."""
+        nbytes = (self.header["docs"] + 7) // 8
+        slot = self._bitmap_ids[t]
+        if slot != _NO_BITMAP:
+            return int.from_bytes(self._bitmaps[slot * nbytes:(slot + 1) * nbytes], "little")
+        bitmap = bytearray(nbytes)
+        for d in ids:
+            bitmap[d >> 3] |= 1 << (d & 7)
+        return int.from_bytes(bitmap, "little")
+
+    def _subsets(self, lists, k, heap, scored, theta):
+        """
+        Exhaustive top-k for short queries with dense terms: docs grouped by
+        exactly which query terms they contain (bitset algebra), groups with
+        the largest possible score first, until no group can beat theta.
+        Single-term groups score one impact each, so those are read off that
+        term's postings with block-max skipping instead. Groups of more than
+        SUBSET_CAP docs are deferred; returns (theta, complete) so the caller
+        can finish with MaxScore, which skips every doc in ``scored``.
+        """
+        n, block = len(lists), self.block
+        complete = True
+        bitmaps = [self._bitmap(entry[4], entry[1]) for entry in lists]
+
+        def offer(doc, score):
+            nonlocal theta
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -doc))
+            elif (score, -doc) > heap[0]:
+                heapq.heapreplace(heap, (score, -doc))
+            if len(heap) == k:
+                theta = heap[0][0]
+
+        bound = lambda m: sum(lists[i][0] for i in range(n) if m >> i & 1)  # noqa: E731
+        for mask in sorted(range(1, 1 << n), key=bound, reverse=True):
+            if bound(mask) <= theta:
+                break            # sorted by bound: no group left can beat theta
+            members = [i for i in range(n) if mask >> i & 1]
+            if len(members) == 1:
+                (i,) = members
+                _, ids, imps, bmax, _ = lists[i]
+                others = bitmaps[:i] + bitmaps[i + 1:]
+                for b in range(len(bmax)):
+                    if bmax[b] <= theta:
+                        continue
+                    for p in range(b * block, min((b + 1) * block, len(ids))):
+                        doc = ids[p]
+                        if imps[p] > theta and doc not in scored and \
+                                not any(other >> doc & 1 for other in others):
+                            scored.add(doc)
+                            offer(doc, imps[p])
+                continue
+            exact = -1
+            for i in range(n):
+                if exact:
+                    exact = exact & bitmaps[i] if mask >> i & 1 else exact & ~bitmaps[i]
+            if not exact:
+                continue
+            if exact.bit_count() > SUBSET_CAP:
+                complete = False
+                continue
+            raw = exact.to_bytes((exact.bit_length() + 7) // 8, "little")
+            for match in re.finditer(rb"[^\x00]", raw):
+                byte, base = match.group()[0], match.start() << 3
+                while byte:
+                    low = byte & -byte
+                    doc = base + low.bit_length() - 1
+                    byte ^= low
+                    if doc in scored:
+                        continue
+                    scored.add(doc)
+                    score = 0
+                    for i in members:
+                        ids = lists[i][1]
+                        score += lists[i][2][bisect_left(ids, doc)]
+                    offer(doc, score)
+        return theta, complete
+
+    def _lists(self, query: str):
+        lists = []
+        for term in dict.fromkeys(tokenize(query)):
+            t = self._term_id(term)
+            if t is None:
+                continue
+            start, end = self._term_starts[t], self._term_starts[t + 1]
+            bstart, bend = self._block_starts[t], self._block_starts[t + 1]
+            lists.append((self._term_max[t], self._doc_ids[start:end],
+                          self._impacts[start:end], self._block_max[bstart:bend], t))
+        lists.sort(key=lambda entry: entry[0])
+        return lists
+
+    def search_ids(self, query: str, k: int = 10) -> list:
+        """[(doc_id, impact sum)] of the best ``k`` documents, best first."""
+        lists = self._lists(query)
+        if not lists or k <= 0:
+            return []
+        n = len(lists)
+        ub = [entry[0] for entry in lists]
+        ids = [entry[1] for entry in lists]
+        imps = [entry[2] for entry in lists]
+        bmax = [entry[3] for entry in lists]
+        lens = [len(i) for i in ids]
+        prefix = [0]
+        for bound in ub:
+            prefix.append(prefix[-1] + bound)
+
+        block = self.block
+        heap = []         # (score, -doc_id): the current top k
+        scored = set()    # docs already scored exactly (seeds)
+
+        # seed: fully score the docs of each term's best block, so theta
+        # starts high instead of climbing from the first doc ids
+        for i in range(n):
+            best = max(range(len(bmax[i])), key=bmax[i].__getitem__)
+            for p in range(best * block, min((best + 1) * block, lens[i])):
+                doc = ids[i][p]
+                if doc in scored:
+                    continue
+                scored.add(doc)
+                score = 0
+                for j in range(n):
+                    q = bisect_left(ids[j], doc)
+                    if q < lens[j] and ids[j][q] == doc:
+                        score += imps[j][q]
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -doc))
+                elif (score, -doc) > heap[0]:
+                    heapq.heapreplace(heap, (score, -doc))
+
+        theta = heap[0][0] if len(heap) == k else 0   # score to beat
+        if 1 < n <= SUBSET_TERMS and any(self._bitmap_ids[entry[4]] != _NO_BITMAP
+                                         for entry in lists):
+            theta, complete = self._subsets(lists, k, heap, scored, theta)
+            if complete:
+                return [(-neg, score) for score, neg in sorted(heap, reverse=True)]
+        first = 0         # lists[first:] are essential
+        while first < n and prefix[first + 1] <= theta:
+            first += 1
+        pos = [0] * n
+
+        # several essential lists: walk their union doc by doc
+        while first < n - 1:
+            doc = None
+            for i in range(first, n):
+                if pos[i] < lens[i]:
+                    d = ids[i][pos[i]]
+                    if doc is None or d < doc:
+                        doc = d
+            if doc is None:
+                break
+
+            score = 0
+            for i in range(first, n):
+                p = pos[i]
+                if p < lens[i] and ids[i][p] == doc:
+                    score += imps[i][p]
+                    pos[i] = p + 1
+            if doc in scored:
+                continue
+            # non-essential lists, largest bound first, while they still matter
+            for i in range(first - 1, -1, -1):
+                if score + prefix[i + 1] <= theta:
+                    break
+                p = bisect_left(ids[i], doc, pos[i], lens[i])
+                pos[i] = p
+                if p < lens[i] and ids[i][p] == doc:
+                    score += imps[i][p]
+
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -doc))
+            elif score > theta:
+                heapq.heapreplace(heap, (score, -doc))
+            else:
+                continue
+            if len(heap) == k:
+                theta = heap[0][0]
+                while first < n and prefix[first + 1] <= theta:
+                    first += 1
+
+        # one essential list left: skip blocks, then postings, whose impact
+        # plus every other term's bound cannot beat theta
+        if first == n - 1:
+            top = n - 1
+            tids, timps, tmax, end_all = ids[top], imps[top], bmax[top], lens[top]
+            rest = prefix[top]
+            p = pos[top]
+            while p < end_all:
+                b = p // block
+                if tmax[b] + rest <= theta:
+                    p = (b + 1) * block
+                    continue
+                end = min((b + 1) * block, end_all)
+                cutoff = theta - rest
+                while p < end:
+                    if timps[p] > cutoff:
+                        doc = tids[p]
+                        if doc not in scored:
+                            score = timps[p]
+                            for i in range(top - 1, -1, -1):
+                                if score + prefix[i + 1] <= theta:
+                                    break
+                                q = bisect_left(ids[i], doc, pos[i], lens[i])
+                                pos[i] = q
+                                if q < lens[i] and ids[i][q] == doc:
+                                    score += imps[i][q]
+                            if len(heap) < k:
+                                heapq.heappush(heap, (score, -doc))
+                            elif score > theta:
+                                heapq.heapreplace(heap, (score, -doc))
+                            if len(heap) == k:
+                                theta = heap[0][0]
+                                cutoff = theta - rest
+                    p += 1
+
+        return [(-neg, score) for score, neg in sorted(heap, reverse=True)]
+
+    def search(self, query: str, k: int = 10) -> list:
+        """[(modelId, BM25 score)] of the best ``k`` matches, best first."""
+        return [(self.key(doc), round(score * self.scale, 4))
+                for doc, score in self.search_ids(query, k)]
+
+
+def open_text_index(store, blob: str) -> TextIndex:
+    """Map ``blob`` from a storage backend (see binfile.open_mapped)."""
+    return binfile.open_mapped(store, blob, TextIndex.open, ".idx")
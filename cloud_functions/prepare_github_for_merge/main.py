@@ -4,11 +4,16 @@ Entrypoint for Cloud Function: prepare-github-for-merge
 HTTP-triggered wrapper that calls the normalization logic.
 """
 
-from flask import jsonify, Request
 from github_pipeline.prepare_github_for_merge import handle_request
+from github_pipeline.profiling import profiled
 
 
-def main(request: Request):
+@profiled("prepare_github_for_merge")
+def main(request):
+    # flask is already loaded by the functions framework; importing it here
+    # keeps this module cheap to import outside of it (tests, benchmarks).
+    from flask import jsonify
+
     try:
         print("🚀 Received HTTP request for GitHub-to-HuggingFace normalization")
         result = handle_request(request)
@@ -7,11 +7,13 @@ PROJECT_ROOT = Path(__file__).parent
 OUTPUT_DIR = PROJECT_ROOT / "output"
 DATA_DIR = PROJECT_ROOT / "data"
 
-OUTPUT_DIR.mkdir(exist_ok=True)
-DATA_DIR.mkdir(exist_ok=True)
+# Directories are created by the writers on first write, not at import time,
+# so importing config stays side-effect free on Cloud Function cold start.
 
 
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+# Point at a GitHub Enterprise host or a local stand-in (benchmarks)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
 
 
 GITHUB_REPOS = [
@@ -22,10 +24,24 @@ GITHUB_REPOS = [
 
 BUCKET_NAME = "sunnysett-pipeline-output"
 
+# Near-duplicate handling after extraction (github_pipeline/dedup.py):
+# "flag" (default) keeps every repo and marks near-duplicates with
+# duplicate_of, "collapse" keeps one repo per cluster, "off"
+DEDUP_MODE = os.environ.get("DEDUP_MODE", "flag")
+
+# Repos extracted first in every run, whatever their priority score
+# (github_pipeline/scheduler.py); PINNED_REPOS="owner/a,owner/b" overrides
+PINNED_REPOS = [r.strip() for r in os.environ.get("PINNED_REPOS", "").split(",") if r.strip()]
+
+# Optional stage after extraction (github_pipeline/enrichment.py): README text
+# and framework library from each repo's tarball; ENRICH_TARBALLS=1 turns it on
+ENRICH_TARBALLS = os.environ.get("ENRICH_TARBALLS", "").lower() in ("1", "true", "yes", "on")
+
 
 FILE_PATTERNS = {
     "python": [".py"],
     "markdown": [".md"],
+    "readme": ["", ".md", ".markdown", ".rst", ".txt"],
     "requirements": ["requirements.txt"]
 }
 
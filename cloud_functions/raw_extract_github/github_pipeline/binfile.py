@@ -0,0 +1,131 @@
+"""
+Binary Section Files
+--------------------
+The container shared by the memory-mappable files of the pipeline (search
+index, text index, neighbor table, record store, snapshot segments and
+manifests):
+
+    0    magic            8 bytes, one per file kind and format version
+    8    header length    uint32
+    12   header           JSON, padded with spaces up to the first section
+    ...  sections         raw bytes, each starting 8-byte aligned
+
+Everything is in native byte order; the header records it ("byteorder")
+and readers refuse a file built on the other endianness. Section offsets
+are absolute and live in the header ("sections": {name: [offset, length]}
+unless the caller places them itself), so readers slice zero-copy
+memoryviews out of the buffer.
+
+Usage:
+    data = pack(MAGIC, {"count": n, "meta": meta}, {"keys": keys, "values": values})
+    view, header = read_header(data, MAGIC, "neighbor table")
+    keys = section(view, header, "keys", "I")
+    table = open_mapped(store, blob, NeighborTable.open, ".idx")
+"""
+
+import json
+import sys
+
+ALIGN = 8
+HEADER_AT = 12
+
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+def _place_sections(header: dict, positions: dict):
+    header["sections"] = positions
+
+
+def pack(magic: bytes, header: dict, sections: dict, place=None) -> bytes:
+    """
+    ``magic``, ``header`` (plus "byteorder" and section positions) and the
+    ``sections`` in order. ``place(header, {name: [offset, length]})``
+    records the positions; the default stores them as header["sections"].
+    """
+    header = {**header, "byteorder": sys.byteorder}
+    if place is None:
+        header.setdefault("sections", {})
+        place = _place_sections
+    # section offsets depend on the header size: grow until it fits
+    # (spaces pad the header up to the first section)
+    first = 0
+    while True:
+        raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if HEADER_AT + len(raw) <= first:
+            break
+        first = HEADER_AT + len(raw) + _pad(HEADER_AT + len(raw)) + ALIGN
+        positions, pos = {}, first
+        for name, data in sections.items():
+            positions[name] = [pos, len(data)]
+            pos += len(data) + _pad(len(data))
+        place(header, positions)
+    raw += b" " * (first - HEADER_AT - len(raw))
+
+    out = bytearray(magic)
+    out += len(raw).to_bytes(4, sys.byteorder)
+    out += raw
+    for data in sections.values():
+        out += data
+        out += b"\0" * _pad(len(data))
+    return bytes(out)
+
+
+def header_length(head, magic: bytes, what: str) -> int:
+    """Header length from the first HEADER_AT bytes of a file; checks the magic."""
+    if bytes(head[:8]) != magic:
+        raise ValueError(f"not a {what} (bad magic)")
+    return int.from_bytes(head[8:HEADER_AT], sys.byteorder)
+
+
+def parse_header(raw, what: str) -> dict:
+    header = json.loads(bytes(raw))
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"{what} was built on a {header['byteorder']}-endian machine")
+    return header
+
+
+def read_header(buf, magic: bytes, what: str) -> tuple:
+    """(memoryview of ``buf``, header) of a packed buffer (bytes or mmap)."""
+    view = memoryview(buf)
+    size = header_length(view, magic, what)
+    return view, parse_header(view[HEADER_AT:HEADER_AT + size], what)
+
+
+def section(view, header: dict, name: str, fmt: str = None):
+    """Zero-copy view of one section, cast to ``fmt`` when given."""
+    start, length = header["sections"][name]
+    part = view[start:start + length]
+    return part.cast(fmt) if fmt else part
+
+
+def map_file(path):
+    """Memory-map a file read-only."""
+    import mmap
+
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_mapped(store, blob: str, opener, suffix: str = ""):
+    """
+    ``opener(path)`` on ``blob`` of a storage backend: local files are mapped
+    in place, remote blobs are downloaded once to a temp file and mapped
+    from there.
+    """
+    path = store.local_path(blob)
+    if path is not None:
+        return opener(path)
+
+    import os
+    import tempfile
+
+    with tempfile.NamedTemporaryFile(prefix="pipeline_", suffix=suffix, delete=False) as f:
+        f.write(store.read_bytes(blob))
+    opened = opener(f.name)
+    try:
+        os.unlink(f.name)  # the mapping keeps the data alive (POSIX)
+    except OSError:
+        pass
+    return opened
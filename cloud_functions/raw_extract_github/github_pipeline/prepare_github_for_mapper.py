@@ -7,21 +7,23 @@ It fills in missing fields (downloads, private, gated, etc.)
 and ensures consistent field naming for dataset merging.
 """
 
-import json
 from datetime import datetime
 from pathlib import Path
 
+from github_pipeline import codec
+from github_pipeline.metrics import metrics
+
 
 def normalize_github_model(model: dict) -> dict:
     """
     Map GitHub model fields to Hugging Face–style format.
     """
-    return {
+    ready = {
         "modelId": model.get("modelId"),
         "author": model.get("author"),
         "pipeline_tag": model.get("task", "unknown"),
         "tags": model.get("topics", []) + ["source:github"],
-        "library": model.get("language", "unknown"),
+        "library": model.get("library") or model.get("language", "unknown"),
         "license": model.get("license", "unknown"),
         "downloads": None,
         "likes": model.get("stars", 0),
@@ -35,26 +37,52 @@ def normalize_github_model(model: dict) -> dict:
         "safetensors": False,
         "ingested_at": datetime.utcnow().isoformat() + "+00:00",
     }
+    # near-duplicates flagged by dedup keep their canonical repo
+    if model.get("duplicate_of"):
+        ready["duplicate_of"] = model["duplicate_of"]
+    return ready
 
 
-def prepare_github_models(input_path: Path, output_path: Path):
+def prepare_github_models(input_path: Path, output_path: Path, partition_dir: Path = None,
+                          store_path: Path = None):
     """
     Read mapped GitHub models and export them
     in a unified Hugging Face–compatible JSON format.
+    If partition_dir is given, also write the data_type=/task= partitioned
+    layout there (see github_pipeline.partitioning).
+    Also writes the keyed record store (see github_pipeline.record_store)
+    to store_path, by default next to output_path (<output>.kv).
     """
     print("\n" + "=" * 60)
     print("🧭 Prepare GitHub Models - Normalizing to Hugging Face format")
     print("=" * 60)
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        models = json.load(f)
+    with open(input_path, "rb") as f:
+        models = codec.loads(f.read())
 
-    normalized = [normalize_github_model(m) for m in models]
+    with metrics.timer("normalize") as timer:
+        normalized = [normalize_github_model(m) for m in models]
+        timer.records = len(normalized)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(normalized, f, indent=2, ensure_ascii=False)
+    with open(output_path, "wb") as f:
+        f.write(codec.dumps(normalized))
 
     print(f"✅ Saved normalized data: {output_path}")
+
+    from github_pipeline.record_store import build_record_store, record_store_blob_for
+
+    store_path = Path(store_path or record_store_blob_for(str(output_path)))
+    with metrics.timer("record_store") as timer:
+        store_path.write_bytes(build_record_store(normalized, source=str(output_path)))
+        timer.records = len(normalized)
+    print(f"🗝️ Saved record store: {store_path}")
+
+    if partition_dir is not None:
+        from github_pipeline.partitioning import write_partitions
+        from github_pipeline.storage import LocalBackend
+
+        manifest = write_partitions(LocalBackend(partition_dir), normalized, "", source=str(input_path))
+        print(f"🗂️ Wrote {len(manifest['partitions'])} partitions under {partition_dir}")
     print(f"📊 Total models processed: {len(normalized)}")
     print("=" * 60)
     return normalized
@@ -0,0 +1,174 @@
+"""
+Extraction Scheduler
+--------------------
+Orders the repos of an extraction run by priority, so that a run cut
+short by quota or a timeout has spent its requests on the repos that
+matter most rather than on whatever came first in GITHUB_REPOS.
+
+Score of a repo = sum of weighted components, each in [0, 1]:
+
+- stars:      log10(1 + stars) / log10(1 + STARS_SCALE), from the previous run
+- activity:   0.5 ** (days since pushed_at / ACTIVITY_HALF_LIFE_DAYS)
+- staleness:  days since the last successful fetch / STALE_AFTER_DAYS
+              (capped at 1; never fetched = 1)
+- pinned:     + PIN_BOOST for repos in PINNED_REPOS, which always go first
+
+The loaders report what they fetch through ``schedule.observe`` (stars and
+pushed_at come with the repo payload, no extra request). Repos found by a
+wildcard listing (wildcards.py) join the plan through ``schedule.add``,
+ranked after the planned ones, and are observed from the listing. The state is
+kept next to the raw output as <raw>.schedule.json, together with every
+repo's score, components and rank for the run, which is the run report
+for the ordering.
+
+Usage:
+    order = schedule.plan(GITHUB_REPOS, previous_state, PINNED_REPOS)
+    for name in order: ...fetch...; schedule.observe(name, stars, pushed_at)
+    store.write_json(schedule_blob_for(raw_blob), schedule.state())
+"""
+
+import math
+import threading
+from datetime import datetime, timezone
+
+from github_pipeline.storage import sidecar_blob
+
+WEIGHTS = {"stars": 1.0, "activity": 1.0, "staleness": 2.0}
+STARS_SCALE = 100000            # stars at which the stars component reaches 1
+ACTIVITY_HALF_LIFE_DAYS = 30.0
+STALE_AFTER_DAYS = 7.0
+PIN_BOOST = 100.0
+REPORT_TOP = 10                 # repos listed in summary()
+
+
+def schedule_blob_for(blob: str) -> str:
+    """github/raw/github_raw_data.json -> github/raw/github_raw_data.schedule.json"""
+    return sidecar_blob(blob, ".schedule.json")
+
+
+def _parse_time(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        # fromisoformat only accepts a trailing "Z" from Python 3.11 on
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _days(since, now) -> float:
+    return max(0.0, (now - since).total_seconds() / 86400)
+
+
+def priority_score(entry: dict, now: datetime, pinned: bool = False) -> tuple:
+    """(score, components) of one repo's state entry ({} if never seen)."""
+    stars = entry.get("stars") or 0
+    pushed_at = _parse_time(entry.get("pushed_at"))
+    fetched_at = _parse_time(entry.get("fetched_at"))
+    components = {
+        "stars": min(1.0, math.log10(1 + stars) / math.log10(1 + STARS_SCALE)),
+        "activity": 0.5 ** (_days(pushed_at, now) / ACTIVITY_HALF_LIFE_DAYS) if pushed_at else 0.0,
+        "staleness": min(1.0, _days(fetched_at, now) / STALE_AFTER_DAYS) if fetched_at else 1.0,
+    }
+    score = sum(WEIGHTS[k] * v for k, v in components.items()) + (PIN_BOOST if pinned else 0.0)
+    return score, components
+
+
+class Schedule:
+    """Thread-safe run ordering plus the fetch observations of one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.previous = {}
+            self.observed = {}
+            self.entries = []
+            self.planned = set()
+            self.pinned = set()
+
+    def plan(self, repo_names, previous: dict = None, pinned=(), now: datetime = None) -> list:
+        """
+        Reset and return ``repo_names`` highest score first (input order
+        breaks ties). ``previous`` is the last run's state() document.
+        """
+        self.reset()
+        now = now or datetime.now(timezone.utc)
+        pinned = set(pinned or ())
+        repos = (previous or {}).get("repos", {})
+        entries = []
+        for position, name in enumerate(dict.fromkeys(repo_names)):
+            score, components = priority_score(repos.get(name, {}), now, name in pinned)
+            entries.append({"repo": name, "score": round(score, 4), "pinned": name in pinned,
+                            "components": {k: round(v, 4) for k, v in components.items()},
+                            "_position": position})
+        entries.sort(key=lambda e: (-e["score"], e["_position"]))
+        for rank, entry in enumerate(entries, 1):
+            del entry["_position"]
+            entry["rank"] = rank
+        with self._lock:
+            self.previous = dict(repos)
+            self.entries = entries
+            self.planned = {e["repo"] for e in entries}
+            self.pinned = pinned
+        return [e["repo"] for e in entries]
+
+    def add(self, repo_name, now: datetime = None):
+        """Append a repo found during the run (a wildcard listing) to the plan, ranked last."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            if repo_name in self.planned:
+                return
+            pinned = repo_name in self.pinned
+            score, components = priority_score(self.previous.get(repo_name, {}), now, pinned)
+            self.planned.add(repo_name)
+            self.entries.append({"repo": repo_name, "score": round(score, 4), "pinned": pinned,
+                                 "components": {k: round(v, 4) for k, v in components.items()},
+                                 "rank": len(self.entries) + 1})
+
+    def observe(self, repo_name, stars=None, pushed_at=None):
+        """Record a successful fetch (called by the loaders)."""
+        if isinstance(pushed_at, datetime):
+            if pushed_at.tzinfo is None:
+                pushed_at = pushed_at.replace(tzinfo=timezone.utc)
+            pushed_at = pushed_at.isoformat()
+        with self._lock:
+            self.observed[repo_name] = {
+                "stars": stars,
+                "pushed_at": pushed_at,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+    def state(self) -> dict:
+        """State for the next run: last known values per planned repo, plus this run's scores."""
+        with self._lock:
+            repos = {}
+            for entry in self.entries:
+                name = entry["repo"]
+                known = dict(self.previous.get(name, {}))
+                known.update(self.observed.get(name, {}))
+                known.update(score=entry["score"], rank=entry["rank"], pinned=entry["pinned"],
+                              components=entry["components"], fetched_this_run=name in self.observed)
+                repos[name] = known
+            return {
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "weights": dict(WEIGHTS, pin_boost=PIN_BOOST),
+                "fetched": len(self.observed),
+                "repos": repos,
+            }
+
+    def summary(self, top: int = REPORT_TOP) -> dict:
+        """Short form for logs and HTTP responses."""
+        with self._lock:
+            return {
+                "planned": len(self.entries),
+                "fetched": len(self.observed),
+                "pinned": sum(e["pinned"] for e in self.entries),
+                "top": [{"repo": e["repo"], "score": e["score"]} for e in self.entries[:top]],
+            }
+
+
+schedule = Schedule()
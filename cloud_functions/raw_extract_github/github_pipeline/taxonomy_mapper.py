@@ -11,6 +11,7 @@ from github_pipeline.taxonomy_schema import (
     get_data_type_for_task,
     get_categories_for_task
 )
+from github_pipeline.metrics import metrics
 
 
 
@@ -58,6 +59,9 @@ def map_taxonomy(model):
     
     # 
     task = find_task_from_text(text)
+    if task == "unknown" and model.get("readme"):
+        # README from the tarball enrichment (github_pipeline/enrichment.py)
+        task = find_task_from_text(model["readme"])
     
     # 
     data_type = get_data_type_for_task(task)
@@ -78,16 +82,19 @@ def map_models(models):
     print("=" * 60)
     
     mapped_models = []
-    for i, model in enumerate(models, 1):
-        print(f"[{i}/{len(models)}] {model['modelId']}")
+    with metrics.timer("map") as timer:
+        for i, model in enumerate(models, 1):
+            print(f"[{i}/{len(models)}] {model['modelId']}")
         
-        mapped = map_taxonomy(model)
+            mapped = map_taxonomy(model)
         
-        print(f"  → Task: {mapped['task']}")
-        print(f"  → Data Type: {mapped['data_types']}")
-        print(f"  → Categories: {', '.join(mapped['categories'][:3])}")  # 只显示前3个
+            print(f"  → Task: {mapped['task']}")
+            print(f"  → Data Type: {mapped['data_types']}")
+            print(f"  → Categories: {', '.join(mapped['categories'][:3])}")  # 只显示前3个
         
-        mapped_models.append(mapped)
+            metrics.incr(f"map.task.{mapped['task']}")
+            mapped_models.append(mapped)
+        timer.records = len(mapped_models)
     
     print("=" * 60)
     print(f"✅ success！")
@@ -97,20 +104,20 @@ def map_models(models):
 
 
 if __name__ == "__main__":
-    import json
+    from github_pipeline import codec
     from pathlib import Path
 
     # from github_raw_data.json to read
     input_path = Path(__file__).resolve().parents[1] / "output/github_raw_data.json"
-    with open(input_path, "r", encoding="utf-8") as f:
-        models = json.load(f)
+    with open(input_path, "rb") as f:
+        models = codec.loads(f.read())
 
     # 
     mapped = map_models(models)
 
     # 
     output_path = Path(__file__).resolve().parents[1] / "output/github_mapped_data.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(mapped, f, indent=2, ensure_ascii=False)
+    with open(output_path, "wb") as f:
+        f.write(codec.dumps(mapped))
 
     print(f"✅ category_task_save_to：{output_path}")
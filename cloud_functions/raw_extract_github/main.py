@@ -2,43 +2,86 @@
 Cloud Function: raw-extract-github (pure GCF style)
 ---------------------------------------------------
 Extracts GitHub repository metadata using the GitHub API,
-saves locally, and uploads it to Google Cloud Storage.
+saves locally, and uploads it to Google Cloud Storage
+(or a local directory / memory:// store via github_pipeline.storage).
+Near-duplicate repos (forks, mirrors, re-uploads) are collapsed or flagged
+before upload according to DEDUP_MODE (see github_pipeline.dedup); the
+clusters are written next to the raw blob as <raw>.dedup.json.
+When SNAPSHOT_PREFIX is set, the run is also kept as a versioned snapshot
+(dataset "raw", see github_pipeline.snapshots).
+Repos are fetched highest priority first (github_pipeline.scheduler); the
+scheduler state and this run's scores are kept as <raw>.schedule.json.
+"owner/*" entries in GITHUB_REPOS are expanded by listing the owner's repos
+(github_pipeline.wildcards); the listing page cache is <raw>.expansion.json.
+With ENRICH_TARBALLS=1 each repo's tarball is streamed once for its README
+and requirements.txt (github_pipeline.enrichment) before upload.
 """
 
 import os
-import json
-from pathlib import Path
+from config import DEDUP_MODE, ENRICH_TARBALLS, GITHUB_API_URL, GITHUB_TOKEN, MOCK_MODE
+from github_pipeline import codec
 from github_pipeline.github_loader import load_github_models
-from google.cloud import storage
+from github_pipeline.github_usage import usage, usage_blob_for
+from github_pipeline.metrics import finish_run, metrics
+from github_pipeline.profiling import profiled
+from github_pipeline.storage import get_backend
 
-BUCKET_NAME = "sunnysett-pipeline-output"
-DESTINATION_BLOB = "github/raw/github_raw_data.json"
-LOCAL_OUTPUT_PATH = Path("/tmp/github_raw_data.json")
+# BUCKET_NAME may also be a local directory or memory:// store (see storage.py)
+BUCKET_NAME = os.environ.get("BUCKET_NAME", "sunnysett-pipeline-output")
+DESTINATION_BLOB = os.environ.get("RAW_BLOB", "github/raw/github_raw_data.json")
+SNAPSHOT_PREFIX = os.environ.get("SNAPSHOT_PREFIX", "")
 
-def upload_to_gcs(local_path: Path, bucket_name: str, destination_blob: str):
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(destination_blob)
-    blob.upload_from_filename(local_path)
-    print(f"☁️ Uploaded to gs://{bucket_name}/{destination_blob}")
 
+@profiled("raw_extract_github")
 def main(request):
     """HTTP Cloud Function entrypoint"""
     print("🚀 Starting GitHub extraction...")
+    metrics.reset()
+    store = None
 
     try:
-        data = load_github_models()
+        # lazy: only runs after the (slow) extraction, keep it off cold start
+        from github_pipeline.dedup import dedup, dedup_blob_for
+        from github_pipeline.scheduler import schedule, schedule_blob_for
+        from github_pipeline.wildcards import expansion_blob_for
+
+        store = get_backend(BUCKET_NAME)
+        schedule_blob = schedule_blob_for(DESTINATION_BLOB)
+        previous = store.read_json(schedule_blob) if store.exists(schedule_blob) else None
+        expansion_blob = expansion_blob_for(DESTINATION_BLOB)
+        expansion = store.read_json(expansion_blob) if store.exists(expansion_blob) else {}
+
+        data = load_github_models(previous, expansion)
         print(f"✅ Loaded {len(data)} repos")
+        data, dedup_report = dedup(data, DEDUP_MODE)
+        enrichment = None
+        if ENRICH_TARBALLS and not MOCK_MODE:
+            from github_pipeline.enrichment import enrich_records
+
+            enrichment = enrich_records(data, GITHUB_TOKEN, GITHUB_API_URL)
 
-        with open(LOCAL_OUTPUT_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        store.write_json(DESTINATION_BLOB, data)
+        print(f"☁️ Uploaded to {store.uri(DESTINATION_BLOB)}")
+        # request/quota accounting for this run, next to the raw output
+        store.write_json(usage_blob_for(DESTINATION_BLOB), usage.summary())
+        store.write_json(dedup_blob_for(DESTINATION_BLOB), dedup_report)
+        store.write_json(schedule_blob, schedule.state())
+        if expansion.get("pages"):
+            store.write_json(expansion_blob, expansion)
+        if SNAPSHOT_PREFIX:
+            from github_pipeline.snapshots import SnapshotStore
 
-        upload_to_gcs(LOCAL_OUTPUT_PATH, BUCKET_NAME, DESTINATION_BLOB)
-        print("✅ Upload completed")
+            with metrics.timer("snapshot") as timer:
+                SnapshotStore(store, SNAPSHOT_PREFIX).commit("raw", data, source=store.uri(DESTINATION_BLOB))
+                timer.records = len(data)
+        finish_run("raw_extract_github", store)
 
-        return (json.dumps({"status": "success", "count": len(data)}), 200, {"Content-Type": "application/json"})
+        return (codec.dumps({"status": "success", "count": len(data), "schedule": schedule.summary(),
+                              "enrichment": enrichment}), 200, {"Content-Type": "application/json"})
 
     except Exception as e:
         print(f"❌ Exception: {e}")
-        return (json.dumps({"status": "error", "message": str(e)}), 500, {"Content-Type": "application/json"})
+        metrics.incr("errors")
+        finish_run("raw_extract_github", store)
+        return (codec.dumps({"status": "error", "message": str(e)}), 500, {"Content-Type": "application/json"})
 
@@ -0,0 +1,276 @@
+"""
+Similar-model Neighbor Table
+----------------------------
+Precomputed "similar models" for every model in the ready dataset, by
+topic overlap and description similarity. prepare_github_for_merge writes
+it next to the ready blob (<ready>.neighbors.idx).
+
+- Vectors: each model is a sparse set of terms, description words
+  (text_index.tokenize) plus '#topic' terms. Terms are weighted by IDF,
+  topics TOPIC_WEIGHT times more, and similarity is cosine.
+- Candidates (approximate nearest neighbors): the MinHash signature of the
+  term set (dedup.minhash) is cut into BANDS bands of ROWS values. For each
+  band the models are sorted by that band and the DEPTH values after it,
+  so models agreeing on more values sit next to each other, and each one
+  is paired with the next WINDOW models of its bucket. Work is
+  O(N * BANDS * WINDOW), never all-pairs: one sort per band over flat
+  arrays, then a bounded number of sparse dot products per model.
+- Each model keeps its best K candidates with score >= MIN_SCORE.
+
+The build is pure Python and single-core (about 1k models/s; 100k models
+take ~100 s, 1M ~19 min), so prepare only builds the table inline up to
+INLINE_MAX_MODELS models (NEIGHBORS_INLINE_MAX). Above that it defers it
+to the offline step below, run as a scheduled job next to the pipeline:
+
+    python -m github_pipeline.neighbors sunnysett-pipeline-output
+
+On-disk layout (a binfile.py container: native byte order; sections
+8-byte aligned; offsets in the JSON header):
+    magic b"SSNBR\\x00\\x00\\x01", uint32 header length, header JSON
+    key_offsets   uint32[N+1]   into key_bytes (modelIds, sorted)
+    key_bytes
+    neighbors     uint32[N*K]   doc ids, best first; 0xFFFFFFFF = empty
+    scores        uint8[N*K]    cosine * 255
+
+Usage:
+    table = NeighborTable.open("github_ready_data.neighbors.idx")
+    table.similar("ultralytics/yolov5")     # [(modelId, score), ...]
+"""
+
+import math
+import sys
+from array import array
+
+from github_pipeline import binfile
+from github_pipeline.storage import sidecar_blob
+
+MAGIC = b"SSNBR\x00\x00\x01"
+K = 10
+BANDS = 30          # 30 bands x 2 rows: pairs above ~0.18 Jaccard are likely candidates
+ROWS = 2            # BANDS * ROWS == dedup.NUM_HASHES
+WINDOW = 8
+DEPTH = 8           # signature values that order docs within a band
+TOPIC_WEIGHT = 2.0
+MIN_SCORE = 0.1
+INLINE_MAX_MODELS = 50_000  # largest corpus prepare builds the table for in its request
+_EMPTY = 0xFFFFFFFF
+_SECTIONS = ("key_offsets", "key_bytes", "neighbors", "scores")
+
+
+def neighbors_blob_for(ready_blob: str) -> str:
+    """github/ready_for_merge/github_ready_data.json -> .../github_ready_data.neighbors.idx"""
+    return sidecar_blob(ready_blob, ".neighbors.idx")
+
+
+def model_terms(model) -> set:
+    """Description words and '#topic' terms of a mapped model (dict or record)."""
+    from github_pipeline.text_index import tokenize
+
+    terms = set(tokenize(model.get("description") or ""))
+    terms.update(f"#{topic.lower()}" for topic in model.get("topics") or ())
+    return terms
+
+
+def compute_neighbors(models, k: int = K) -> tuple:
+    """
+    (keys, neighbors, scores) for mapped models: keys are the sorted
+    modelIds, neighbors[d * k:(d + 1) * k] the doc ids most similar to doc d.
+    """
+    # build-side imports; the search function only reads tables
+    from github_pipeline.dedup import NUM_HASHES, minhash
+
+    keyed = sorted((m.get("modelId") or "", i) for i, m in enumerate(models))
+    keys = [key for key, _ in keyed]
+    n = len(keys)
+
+    # sparse vectors as one flat, per-doc sorted term id array
+    vocab = {}
+    terms, offsets, df = array("I"), array("I", [0]), array("I")
+    sigs, has_sig = array("I"), bytearray(n)
+    for d, (_, i) in enumerate(keyed):
+        found = model_terms(models[i])
+        ids = sorted(vocab.setdefault(t, len(vocab)) for t in found)
+        if len(vocab) > len(df):
+            df.extend([0] * (len(vocab) - len(df)))
+        for t in ids:
+            df[t] += 1
+        terms.extend(ids)
+        offsets.append(len(terms))
+        if found:
+            sigs.extend(minhash(found))
+            has_sig[d] = 1
+        else:
+            sigs.extend([0] * NUM_HASHES)
+
+    # squared term weight: (idf * topic boost)^2, so a dot product is a sum
+    weight2 = array("d", [0.0]) * len(vocab)
+    for term, t in vocab.items():
+        w = math.log(1 + n / df[t]) * (TOPIC_WEIGHT if term.startswith("#") else 1.0)
+        weight2[t] = w * w
+    norms = array("d", (math.sqrt(sum(map(weight2.__getitem__, terms[offsets[d]:offsets[d + 1]])))
+                        for d in range(n)))
+
+    neighbors = array("I", [_EMPTY]) * (n * k)
+    scores = array("d", [0.0]) * (n * k)
+    floor = array("d", [0.0]) * n    # k-th best score so far (0 while slots are free)
+
+    def offer(a, b, score):
+        base = a * k
+        if b in neighbors[base:base + k]:
+            return
+        row = scores[base:base + k]
+        j = row.index(min(row))
+        neighbors[base + j] = b
+        scores[base + j] = score
+        row[j] = score
+        floor[a] = min(row)
+
+    for band in range(BANDS):
+        # order by this band's rows, then by the rows after it: inside a
+        # bucket, docs that agree on more MinHash values end up adjacent
+        lo = band * ROWS
+        cut = [(lo + j) % NUM_HASHES for j in range(DEPTH)]
+        keys_b = [tuple(map(sigs[d * NUM_HASHES:(d + 1) * NUM_HASHES].__getitem__, cut))
+                  if has_sig[d] else None for d in range(n)]
+        order = sorted((d for d in range(n) if has_sig[d]), key=keys_b.__getitem__)
+        for p, a in enumerate(order):
+            key = keys_b[a][:ROWS]
+            mine = None
+            for b in order[p + 1:p + 1 + WINDOW]:
+                if keys_b[b][:ROWS] != key:
+                    break
+                if b in neighbors[a * k:(a + 1) * k] and a in neighbors[b * k:(b + 1) * k]:
+                    continue        # already paired in an earlier band
+                if mine is None:
+                    mine = set(terms[offsets[a]:offsets[a + 1]])
+                shared = mine.intersection(terms[offsets[b]:offsets[b + 1]])
+                score = sum(map(weight2.__getitem__, shared)) / (norms[a] * norms[b])
+                if score < MIN_SCORE:
+                    continue
+                if score > floor[a]:
+                    offer(a, b, score)
+                if score > floor[b]:
+                    offer(b, a, score)
+
+    # best first, empty slots last
+    for d in range(n):
+        base = d * k
+        row = sorted(zip(scores[base:base + k], neighbors[base:base + k]),
+                     key=lambda pair: (-pair[0], pair[1]))
+        for j, (score, other) in enumerate(row):
+            neighbors[base + j] = other if score > 0 else _EMPTY
+            scores[base + j] = score
+    return keys, neighbors, scores
+
+
+def build_neighbors(models, k: int = K, **meta) -> bytes:
+    """Neighbor table bytes for mapped models (dicts or MappedRecords)."""
+    keys, neighbors, scores = compute_neighbors(models, k)
+
+    key_bytes = bytearray()
+    key_offsets = array("I", [0])
+    for key in keys:
+        key_bytes += key.encode("utf-8")
+        key_offsets.append(len(key_bytes))
+    sections = {
+        "key_offsets": key_offsets.tobytes(),
+        "key_bytes": bytes(key_bytes),
+        "neighbors": neighbors.tobytes(),
+        "scores": bytes(min(255, round(s * 255)) for s in scores),
+    }
+
+    header = {"docs": len(keys), "k": k, "byteorder": sys.byteorder, "meta": meta, "sections": {}}
+    return binfile.pack(MAGIC, header, {name: sections[name] for name in _SECTIONS})
+
+
+class NeighborTable:
+    """Read side of build_neighbors, over bytes or a read-only mmap."""
+
+    def __init__(self, buf):
+        view, header = binfile.read_header(buf, MAGIC, "neighbor table")
+
+        self._buf = buf
+        self.header = header
+        self.meta = header["meta"]
+        self.k = header["k"]
+
+        def section(name, fmt=None):
+            return binfile.section(view, header, name, fmt)
+
+        self._key_offsets = section("key_offsets", "I")
+        self._key_bytes = section("key_bytes")
+        self._neighbors = section("neighbors", "I")
+        self._scores = section("scores")
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a table file read-only."""
+        return cls(binfile.map_file(path))
+
+    def __len__(self):
+        return self.header["docs"]
+
+    def key(self, doc_id: int) -> str:
+        return bytes(self._key_bytes[self._key_offsets[doc_id]:self._key_offsets[doc_id + 1]]).decode("utf-8")
+
+    def doc_id(self, model_id: str):
+        """Binary search in the sorted modelIds; None if absent."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < model_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self.key(lo) == model_id else None
+
+    def similar(self, model_id: str, limit: int = None) -> list:
+        """[(modelId, score)] most similar to ``model_id``, best first."""
+        d = self.doc_id(model_id)
+        if d is None:
+            raise KeyError(model_id)
+        base, out = d * self.k, []
+        for j in range(self.k if limit is None else min(limit, self.k)):
+            other = self._neighbors[base + j]
+            if other == _EMPTY:
+                break
+            out.append((self.key(other), round(self._scores[base + j] / 255, 3)))
+        return out
+
+
+def open_neighbors(store, blob: str) -> NeighborTable:
+    """Map ``blob`` from a storage backend (see binfile.open_mapped)."""
+    return binfile.open_mapped(store, blob, NeighborTable.open, ".idx")
+
+
+def _main(argv=None):
+    import argparse
+    import time
+    from datetime import datetime, timezone
+
+    from github_pipeline.storage import get_backend
+
+    parser = argparse.ArgumentParser(description="Build the neighbor table offline, from the mapped blob")
+    parser.add_argument("bucket", help="bucket, local directory or memory:// store (see storage.py)")
+    parser.add_argument("--mapped-blob", default="github/mapped/github_mapped_data.json")
+    parser.add_argument("--ready-blob", default="github/ready_for_merge/github_ready_data.json")
+    parser.add_argument("--k", type=int, default=K)
+    args = parser.parse_args(argv)
+
+    store = get_backend(args.bucket)
+    data = store.read_json(args.mapped_blob)
+    models = data.get("models", data) if isinstance(data, dict) else data
+    # stamped with the ready blob it belongs to, as prepare does
+    ready_info = store.stat(args.ready_blob)
+    t0 = time.perf_counter()
+    table = build_neighbors(models, args.k, ready_blob=args.ready_blob,
+                            ready_generation=ready_info.generation if ready_info else None,
+                            generated_at=datetime.now(timezone.utc).isoformat())
+    blob = neighbors_blob_for(args.ready_blob)
+    store.write_bytes(blob, table, content_type="application/octet-stream")
+    print(f"🧭 Wrote neighbor table for {len(models)} models ({len(table) / 1e6:.1f} MB) "
+          f"to {store.uri(blob)} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    _main()
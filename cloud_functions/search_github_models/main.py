@@ -0,0 +1,188 @@
+"""
+Cloud Function: search-github-models (HTTP, read-only)
+------------------------------------------------------
+Serves filtered top-K searches over the GitHub ready dataset:
+
+    GET /?task=object-detection&category=agriculture&limit=20
+    GET /?data_type=vision&license=MIT&license=Apache-2.0
+    GET /?q=lightweight+segmentation+for+drones&limit=10
+    GET /?similar_to=ultralytics/yolov5
+
+Filters: task, data_type, category, license, library. Repeat a parameter
+(or comma-separate values) for OR; different parameters are ANDed. Results
+are ranked by SORT / DIRECTION from taxonomy_schema (likes for GitHub).
+
+Backed by the binary index prepare_github_for_merge writes next to the
+ready blob (<ready>.idx, see github_pipeline.search_index). The index is
+memory-mapped on the first request and never parsed as a whole. It is
+re-checked at most every INDEX_TTL_SECONDS and reloaded when its
+generation changes.
+
+q= is free-text BM25 search over description/topics/modelId, served from
+the text index that map_github_taxonomy writes (<mapped>.text.idx, see
+github_pipeline.text_index). It returns modelIds with scores and cannot
+be combined with the filters.
+
+similar_to= returns the precomputed similar models of one modelId from
+the neighbor table prepare_github_for_merge writes (<ready>.neighbors.idx,
+see github_pipeline.neighbors); at most its K neighbors.
+
+Run locally:
+    BUCKET_NAME=./output python cloud_functions/search_github_models/main.py
+"""
+
+import os
+import threading
+import time
+
+from github_pipeline import codec
+from github_pipeline.neighbors import neighbors_blob_for, open_neighbors
+from github_pipeline.query_index import MAX_PER_TASK
+from github_pipeline.search_index import index_blob_for, open_index
+from github_pipeline.storage import get_backend
+from github_pipeline.text_index import open_text_index, text_index_blob_for
+
+
+# BUCKET_NAME may also be a local directory or memory:// store (see storage.py)
+BUCKET_NAME = os.environ.get("BUCKET_NAME", "sunnysett-pipeline-output")
+READY_BLOB = os.environ.get("READY_BLOB", "github/ready_for_merge/github_ready_data.json")
+INDEX_BLOB = os.environ.get("INDEX_BLOB", index_blob_for(READY_BLOB))
+MAPPED_BLOB = os.environ.get("MAPPED_BLOB", "github/mapped/github_mapped_data.json")
+TEXT_INDEX_BLOB = os.environ.get("TEXT_INDEX_BLOB", text_index_blob_for(MAPPED_BLOB))
+NEIGHBORS_BLOB = os.environ.get("NEIGHBORS_BLOB", neighbors_blob_for(READY_BLOB))
+INDEX_TTL_SECONDS = float(os.environ.get("INDEX_TTL_SECONDS", "300"))
+DEFAULT_LIMIT = 20
+
+# query parameter -> indexed field
+FILTERS = {
+    "task": "task",
+    "data_type": "data_types",
+    "category": "categories",
+    "license": "license",
+    "library": "library",
+}
+
+
+class _Mapped:
+    """One memory-mapped index blob, reloaded when its generation changes."""
+
+    def __init__(self, blob, opener, hint):
+        self.blob = blob
+        self.opener = opener
+        self.hint = hint
+        self.index = None
+        self.generation = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.index is not None and now - self.checked_at < INDEX_TTL_SECONDS:
+                return self.index
+            store = get_backend(BUCKET_NAME)
+            info = store.stat(self.blob)
+            if info is None:
+                raise FileNotFoundError(f"{store.uri(self.blob)} not found; run {self.hint}")
+            if info.generation != self.generation:
+                t0 = time.perf_counter()
+                self.index = self.opener(store, self.blob)
+                self.generation = info.generation
+                print(f"🔎 Mapped {store.uri(self.blob)} (generation {info.generation}, "
+                      f"{len(self.index)} models) in {(time.perf_counter() - t0) * 1000:.1f} ms")
+            self.checked_at = now
+            return self.index
+
+
+_search_index = _Mapped(INDEX_BLOB, open_index, "prepare_github_for_merge")
+_text_index = _Mapped(TEXT_INDEX_BLOB, open_text_index, "map_github_taxonomy")
+_neighbors = _Mapped(NEIGHBORS_BLOB, open_neighbors, "prepare_github_for_merge")
+
+
+def get_index():
+    """The mapped filter index (reloaded when its blob has a new generation)."""
+    return _search_index.get()
+
+
+def get_text_index():
+    """The mapped BM25 text index (reloaded when its blob has a new generation)."""
+    return _text_index.get()
+
+
+def get_neighbors():
+    """The mapped similar-models table (reloaded when its blob has a new generation)."""
+    return _neighbors.get()
+
+
+def parse_query(args) -> tuple:
+    """(filters, text, similar_to, limit) from request args (a werkzeug MultiDict or a plain dict)."""
+    getlist = getattr(args, "getlist", None) or (lambda k: [args[k]] if k in args else [])
+    filters = {}
+    for param, field in FILTERS.items():
+        values = [v.strip() for raw in getlist(param) for v in str(raw).split(",") if v.strip()]
+        if values:
+            filters[field] = values
+    unknown = set(args.keys()) - set(FILTERS) - {"limit", "q", "similar_to"}
+    if unknown:
+        raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    text = str(args.get("q", "")).strip()
+    similar_to = str(args.get("similar_to", "")).strip()
+    if sum(map(bool, (filters, text, similar_to))) > 1:
+        raise ValueError("filters, q and similar_to cannot be combined")
+    limit = int(args.get("limit", DEFAULT_LIMIT))
+    if not 1 <= limit <= MAX_PER_TASK:
+        raise ValueError(f"limit must be between 1 and {MAX_PER_TASK}")
+    return filters, text, similar_to, limit
+
+
+def main(request):
+    """HTTP entrypoint (GET)."""
+    headers = {"Content-Type": "application/json"}
+    try:
+        filters, text, similar_to, limit = parse_query(request.args)
+    except ValueError as e:
+        return (codec.dumps({"status": "error", "message": str(e)}), 400, headers)
+
+    try:
+        if similar_to:
+            echo = {"similar_to": similar_to}
+            mapped = _neighbors
+            index = get_neighbors()
+            t0 = time.perf_counter()
+            try:
+                results = [{"modelId": key, "score": score}
+                           for key, score in index.similar(similar_to, limit)]
+            except KeyError:
+                return (codec.dumps({"status": "error",
+                                    "message": f"unknown modelId: {similar_to}"}), 404, headers)
+        elif text:
+            echo = {"q": text}
+            mapped = _text_index
+            index = get_text_index()
+            t0 = time.perf_counter()
+            results = [{"modelId": key, "score": score} for key, score in index.search(text, limit)]
+        else:
+            echo = {"filters": filters}
+            mapped = _search_index
+            index = get_index()
+            t0 = time.perf_counter()
+            results = index.query(limit, **filters)
+        return (codec.dumps({
+            "status": "success",
+            **echo,
+            "count": len(results),
+            "took_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "index": {"generation": mapped.generation, **index.meta},
+            "results": results,
+        }), 200, headers)
+    except Exception as e:
+        print(f"❌ Exception: {e}")
+        return (codec.dumps({"status": "error", "message": str(e)}), 500, headers)
+
+
+if __name__ == "__main__":
+    from flask import Flask, request
+
+    app = Flask(__name__)
+    app.add_url_rule("/", "main", lambda: main(request), methods=["GET"])
+    app.run(port=int(os.environ.get("PORT", "8080")))
@@ -1,23 +1,32 @@
-import os, json
+import os
+from config import DEDUP_MODE, ENRICH_TARBALLS, GITHUB_API_URL, GITHUB_TOKEN, MOCK_MODE
 from github_pipeline.github_loader import load_github_models
-from google.cloud import storage
+from github_pipeline.github_usage import usage, usage_blob_for
+from github_pipeline.metrics import finish_run
+from github_pipeline.storage import LocalBackend, get_backend, transfer
 
 OUTPUT_DIR = "../output"
-BUCKET_NAME = "sunnysett-pipeline-output"
-
-def upload_to_gcs(bucket_name, file_path, blob_name):
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    blob.upload_from_filename(file_path)
-    print(f"✅ Uploaded {file_path} → gs://{bucket_name}/{blob_name}")
+BUCKET_NAME = os.environ.get("BUCKET_NAME", "sunnysett-pipeline-output")
 
 def run_pipeline():
-    data = load_github_models()
-    output_file = os.path.join(OUTPUT_DIR, "semantic_models_github.json")
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
-    upload_to_gcs(BUCKET_NAME, output_file, "semantic_models_github.json")
+    from github_pipeline.dedup import dedup, dedup_blob_for
+
+    data, dedup_report = dedup(load_github_models(), DEDUP_MODE)
+    if ENRICH_TARBALLS and not MOCK_MODE:
+        from github_pipeline.enrichment import enrich_records
+
+        enrich_records(data, GITHUB_TOKEN, GITHUB_API_URL)
+    blob_name = "semantic_models_github.json"
+    local = LocalBackend(OUTPUT_DIR)
+    local.write_json(blob_name, data)
+    usage_name = usage_blob_for(blob_name)
+    local.write_json(usage_name, usage.summary())
+    dedup_name = dedup_blob_for(blob_name)
+    local.write_json(dedup_name, dedup_report)
+    bucket = get_backend(BUCKET_NAME)
+    transfer(local, bucket, [blob_name, usage_name, dedup_name])
+    print(f"✅ Uploaded {local.uri(blob_name)} → {bucket.uri(blob_name)}")
+    finish_run("gcp_pipeline", bucket)
 
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,109 @@
+"""
+Change-data-capture for the Ready Dataset
+-----------------------------------------
+Each prepare run rewrites the whole ready blob, and `ingested_at` is
+stamped fresh on every record, so a naive diff marks everything changed.
+This module keeps one content hash per record and emits only what changed:
+
+    <ready>.hashes.json   {modelId: content hash} of the last run
+    <ready>.delta.json    inserts / updates / deletes vs. that run
+
+Content hashes cover every field except VOLATILE_FIELDS (canonical JSON:
+sorted keys, compact separators; BLAKE2b-128). The delta is keyed by
+modelId: inserts and updates carry the full new record, deletes only the
+modelId. A consumer holding the previous snapshot applies it with
+apply_delta(); `base_generation` / `ready_generation` say which ready blob
+generation the delta starts from and leads to.
+
+The first run (no hashes yet) produces a delta with every record as an
+insert and `base_generation: null`.
+"""
+
+import json
+
+from github_pipeline.storage import sidecar_blob
+
+VOLATILE_FIELDS = ("ingested_at",)
+
+
+def hashes_blob_for(ready_blob: str) -> str:
+    """github/ready_for_merge/github_ready_data.json -> .../github_ready_data.hashes.json"""
+    return sidecar_blob(ready_blob, ".hashes.json")
+
+
+def delta_blob_for(ready_blob: str) -> str:
+    """github/ready_for_merge/github_ready_data.json -> .../github_ready_data.delta.json"""
+    return sidecar_blob(ready_blob, ".delta.json")
+
+
+def canonical_json(record) -> str:
+    """
+    Sorted-key compact JSON of a record (dict or _Record) without its
+    volatile fields. Always stdlib json, never codec: hashes must not change
+    with the installed backend.
+    """
+    data = record.to_dict() if hasattr(record, "to_dict") else dict(record)
+    for field in VOLATILE_FIELDS:
+        data.pop(field, None)
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def content_hash(record) -> str:
+    """Hash of a record (dict or ReadyRecord) without its volatile fields."""
+    import hashlib  # lazy: _hashlib (OpenSSL) is a cold-start cost
+
+    return hashlib.blake2b(canonical_json(record).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compute_delta(records, previous: dict = None) -> tuple:
+    """
+    Compare ``records`` against the previous run's {modelId: hash}.
+
+    Returns:
+        (delta, hashes)
+        delta:  {"counts": {...}, "inserts": [...], "updates": [...], "deletes": [...]}
+        hashes: {modelId: hash} to store for the next run
+    """
+    previous = previous or {}
+    hashes = {}
+    inserts, updates = [], []
+    duplicates = 0
+    for record in records:
+        key = record.get("modelId")
+        if key in hashes:
+            duplicates += 1     # first occurrence wins, as in the merge job
+            continue
+        digest = hashes[key] = content_hash(record)
+        old = previous.get(key)
+        if old is None:
+            inserts.append(record)
+        elif old != digest:
+            updates.append(record)
+    deletes = sorted(key for key in previous if key not in hashes)
+
+    delta = {
+        "counts": {
+            "inserts": len(inserts),
+            "updates": len(updates),
+            "deletes": len(deletes),
+            "unchanged": len(hashes) - len(inserts) - len(updates),
+            "duplicate_ids": duplicates,
+        },
+        "inserts": inserts,
+        "updates": updates,
+        "deletes": deletes,
+    }
+    return delta, hashes
+
+
+def apply_delta(records, delta: dict) -> list:
+    """
+    Previous snapshot (list of dicts) + delta -> new snapshot. Existing
+    models keep their position; inserted ones are appended.
+    """
+    by_id = {r.get("modelId"): r for r in records}
+    for key in delta.get("deletes", ()):
+        by_id.pop(key, None)
+    for record in list(delta.get("updates", ())) + list(delta.get("inserts", ())):
+        by_id[record.get("modelId")] = record
+    return list(by_id.values())
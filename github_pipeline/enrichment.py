@@ -0,0 +1,246 @@
+"""
+Tarball Enrichment
+------------------
+Optional stage after extraction: downloads each repo's default-branch
+tarball once
+
+    GET /repos/{owner}/{repo}/tarball      (302 → codeload.github.com)
+
+and streams through it with tarfile's "r|gz" mode, never extracting to
+disk, to pick up two root-level files (config.FILE_PATTERNS):
+
+- README (README, README.md, README.rst, README.txt, ...): its text, cut at README_MAX_CHARS,
+  becomes the record's "readme"; taxonomy_mapper.map_taxonomy falls back
+  to it when description and topics give no task
+- requirements.txt: framework dependencies (torch, tensorflow, jax and
+  their companion packages, FRAMEWORK_PACKAGES) set the record's
+  "library", which prepare uses over the GitHub language
+
+The download stops as soon as both files have been seen, and at
+MAX_TARBALL_BYTES whatever was found up to there is kept. Members over
+MAX_FILE_BYTES are skipped. At most WORKERS tarballs are in flight.
+A repo whose tarball fails is left as it was; the stage never fails a run.
+
+Requests go through urllib and are reported to github_usage (endpoint
+"tarball"), like the wildcard listings.
+
+Usage:
+    report = enrich_records(records, GITHUB_TOKEN, GITHUB_API_URL)
+    python -m github_pipeline.enrichment output/github_raw_data.json
+"""
+
+import http.client
+import re
+import tarfile
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from config import FILE_PATTERNS
+from github_pipeline.github_usage import usage
+from github_pipeline.metrics import metrics
+
+MAX_TARBALL_BYTES = 100 * 1024 * 1024   # stop reading a tarball past this
+MAX_FILE_BYTES = 512 * 1024             # README / requirements.txt larger than this are skipped
+README_MAX_CHARS = 4000                 # kept on the record for the mapper
+WORKERS = 4                             # tarballs downloaded at once
+TIMEOUT_S = 60
+
+# requirement name (lower-case, "_" → "-") -> library, in precedence order
+FRAMEWORK_PACKAGES = {
+    "pytorch": ("torch", "torchvision", "torchaudio", "pytorch-lightning", "lightning"),
+    "tensorflow": ("tensorflow", "tensorflow-gpu", "tensorflow-cpu", "tf-nightly", "keras"),
+    "jax": ("jax", "jaxlib", "flax", "optax"),
+}
+_LIBRARY_OF = {pkg: lib for lib, pkgs in FRAMEWORK_PACKAGES.items() for pkg in pkgs}
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+class _TarballTooLarge(Exception):
+    pass
+
+
+class _CappedReader:
+    """File-like view of a response that raises once ``limit`` bytes were read."""
+
+    def __init__(self, raw, limit: int):
+        self.raw = raw
+        self.limit = limit
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        if self.bytes_read >= self.limit:
+            raise _TarballTooLarge(f"over {self.limit} bytes")
+        if size is None or size < 0 or size > self.limit - self.bytes_read:
+            size = self.limit - self.bytes_read
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def frameworks_in_requirements(text: str) -> list:
+    """Libraries (FRAMEWORK_PACKAGES keys, in precedence order) required by a requirements.txt."""
+    found = set()
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        if line.lstrip().startswith("-"):       # -r other.txt, --extra-index-url, -e ...
+            continue
+        match = _REQUIREMENT_NAME.match(line)
+        if match:
+            library = _LIBRARY_OF.get(match.group(1).lower().replace("_", "-"))
+            if library:
+                found.add(library)
+    return [lib for lib in FRAMEWORK_PACKAGES if lib in found]
+
+
+def _is_readme(filename: str) -> bool:
+    stem, dot, ext = filename.partition(".")
+    return stem.lower() == "readme" and dot + ext.lower() in FILE_PATTERNS["readme"]
+
+
+def _root_file(member_name: str):
+    """File name of a member directly under the tarball's top directory, else None."""
+    parts = member_name.split("/")
+    return parts[1] if len(parts) == 2 and parts[1] else None
+
+
+def scan_tarball(fileobj, found: dict = None) -> dict:
+    """
+    Stream a .tar.gz and return {"readme": text or None, "requirements":
+    text or None}. Stops reading once both were found. ``found`` is filled
+    in place, so it keeps what was read if the stream is cut off.
+    """
+    found = {"readme": None, "requirements": None} if found is None else found
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for member in tar:
+            filename = _root_file(member.name)
+            if not filename or not member.isfile() or member.size > MAX_FILE_BYTES:
+                continue
+            if filename in FILE_PATTERNS["requirements"]:
+                key = "requirements"
+            elif _is_readme(filename) and found["readme"] is None:
+                key = "readme"
+            else:
+                continue
+            found[key] = tar.extractfile(member).read().decode("utf-8", errors="replace")
+            if found["readme"] is not None and found["requirements"] is not None:
+                break
+    return found
+
+
+class TarballEnricher:
+    """Downloads and scans repo tarballs; enrich() updates records in place."""
+
+    def __init__(self, token: str = "", base_url: str = "https://api.github.com",
+                 workers: int = WORKERS, max_bytes: int = MAX_TARBALL_BYTES):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.workers = workers
+        self.max_bytes = max_bytes
+
+    def _open(self, repo_name: str):
+        url = f"/repos/{urllib.parse.quote(repo_name)}/tarball"
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": "sunnysett-pipeline"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        # urllib follows the redirect to codeload.github.com
+        request = urllib.request.Request(self.base_url + url, headers=headers)
+        try:
+            resp = urllib.request.urlopen(request, timeout=TIMEOUT_S)
+        except urllib.error.HTTPError as e:
+            usage.record(url, e.code, {k.lower(): v for k, v in e.headers.items()})
+            raise
+        usage.record(url, resp.status, {k.lower(): v for k, v in resp.headers.items()})
+        return resp
+
+    def fetch(self, repo_name: str) -> dict:
+        """scan_tarball() of one repo, plus "bytes" read and "truncated"."""
+        with usage.attribute(repo_name), metrics.timer("github.tarball"):
+            with self._open(repo_name) as resp:
+                length = resp.headers.get("Content-Length")
+                if length and int(length) > self.max_bytes:
+                    raise _TarballTooLarge(f"{length} bytes")
+                reader = _CappedReader(resp, self.max_bytes)
+                found = {"readme": None, "requirements": None}
+                try:
+                    scan_tarball(reader, found)
+                    truncated = False
+                except _TarballTooLarge:
+                    truncated = True
+        metrics.incr("enrich.bytes", reader.bytes_read)
+        return dict(found, bytes=reader.bytes_read, truncated=truncated)
+
+    def enrich_one(self, record: dict) -> tuple:
+        """
+        Update one record; -> (outcome, bytes read), outcome one of
+        "enriched", "empty", "too_large", "failed".
+        """
+        name = record["modelId"]
+        try:
+            found = self.fetch(name)
+        except _TarballTooLarge as e:
+            metrics.incr("enrich.too_large")
+            print(f"  ⚠️ {name}: tarball skipped ({e})")
+            return "too_large", 0
+        except (OSError, http.client.HTTPException, tarfile.TarError, ValueError) as e:
+            # HTTPException: IncompleteRead and friends when a response is cut off
+            metrics.incr("enrich.errors")
+            print(f"  ❌ {name}: fail to read tarball: {e}")
+            return "failed", 0
+        if found["truncated"]:
+            metrics.incr("enrich.truncated")
+        if found["readme"] is not None:
+            record["readme"] = found["readme"][:README_MAX_CHARS]
+        if found["requirements"] is not None:
+            libraries = frameworks_in_requirements(found["requirements"])
+            if libraries:
+                record["library"] = libraries[0]
+        enriched = found["readme"] is not None or found["requirements"] is not None
+        return ("enriched" if enriched else "empty"), found["bytes"]
+
+    def enrich(self, records) -> dict:
+        """Enrich ``records`` (raw record dicts) in place; -> report."""
+        records = list(records)
+        report = {"repos": len(records), "enriched": 0, "empty": 0, "too_large": 0, "failed": 0,
+                  "bytes_read": 0, "libraries": {}}
+        print(f"📦 Enriching {len(records)} repos from their tarballs ({self.workers} at a time)...")
+        with metrics.timer("enrich") as timer, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for outcome, nbytes in pool.map(self.enrich_one, records):
+                report[outcome] += 1
+                report["bytes_read"] += nbytes
+            timer.records = len(records)
+        for record in records:
+            if record.get("library"):
+                report["libraries"][record["library"]] = report["libraries"].get(record["library"], 0) + 1
+        print(f"✅ Enriched {report['enriched']}/{len(records)} repos "
+              f"({report['failed']} failed, {report['too_large']} too large)")
+        return report
+
+
+def enrich_records(records, token: str = "", base_url: str = "https://api.github.com",
+                   workers: int = WORKERS, max_bytes: int = MAX_TARBALL_BYTES) -> dict:
+    return TarballEnricher(token, base_url, workers, max_bytes).enrich(records)
+
+
+def _main(argv=None):
+    import argparse
+    from pathlib import Path
+
+    from config import GITHUB_API_URL, GITHUB_TOKEN
+    from github_pipeline import codec
+
+    parser = argparse.ArgumentParser(description="Add README text and framework library to raw records")
+    parser.add_argument("raw", type=Path, help="raw records JSON, updated in place")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--max-mb", type=float, default=MAX_TARBALL_BYTES / 2**20)
+    args = parser.parse_args(argv)
+
+    records = codec.loads(args.raw.read_bytes())
+    report = enrich_records(records, GITHUB_TOKEN, GITHUB_API_URL, args.workers, int(args.max_mb * 2**20))
+    args.raw.write_bytes(codec.dumps(records))
+    print(codec.dumps(report).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    _main()
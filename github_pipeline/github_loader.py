@@ -4,22 +4,46 @@ GitHub Loader - v2
 1. 从 GitHub 提取 repo 的基础信息
 2. 兼容新版 Github API（使用 auth=github.Auth.Token）
 3. 自动保存到项目根目录下的 output/github_raw_data.json
+4. 按优先级顺序提取（github_pipeline/scheduler.py），便于配额不足时先处理重要的 repo
+5. 支持 "owner/*" 通配条目：分页列出组织/用户的全部 repo，列表结果直接生成记录（github_pipeline/wildcards.py）
 """
 
 import os
-import json
+from itertools import chain
 from pathlib import Path
-from github import Github, Auth
-from config import GITHUB_TOKEN, GITHUB_REPOS, MOCK_MODE
+from config import GITHUB_TOKEN, GITHUB_API_URL, GITHUB_REPOS, MOCK_MODE, PINNED_REPOS
+from github_pipeline import codec
+from github_pipeline.github_usage import usage, usage_blob_for
+from github_pipeline.metrics import metrics
+from github_pipeline.storage import LocalBackend
 
 # 设置输出目录（在 Sunnysett-test/output 下）
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
-OUTPUT_DIR.mkdir(exist_ok=True)
+
+def repo_record(payload):
+    """从 GET /repos/{owner}/{repo} 的返回 JSON 构建 raw 记录（仓库列表接口的条目格式相同）"""
+    owner = payload.get("owner") or {}
+    license_info = payload.get("license") or {}
+    return {
+        "modelId": payload["full_name"],
+        "author": owner.get("login") or payload["full_name"].split("/")[0],
+        "description": payload.get("description") or "",
+        "stars": payload.get("stargazers_count", 0),
+        "language": payload.get("language") or "unknown",
+        "topics": list(payload.get("topics") or []),
+        "license": license_info.get("spdx_id") or "unknown",
+        "url": payload.get("html_url", ""),
+    }
+
 
 def get_repo_basic_info(repo_name):
     """提取单个 repo 的基本信息"""
+    # the scheduler is imported on first use: keep it off cold start
+    from github_pipeline.scheduler import schedule
+
     if MOCK_MODE:
         print(f"  🔶 Mock use_test_data：{repo_name}")
+        schedule.observe(repo_name, stars=1000)
         return {
             "modelId": repo_name,
             "author": repo_name.split("/")[0],
@@ -33,51 +57,93 @@ def get_repo_basic_info(repo_name):
 
     print(f"  🌐  GitHub API to get {repo_name} ...")
     try:
-        auth = Auth.Token(GITHUB_TOKEN)
-        g = Github(auth=auth)
-        repo = g.get_repo(repo_name)
-
-        data = {
-            "modelId": repo.full_name,
-            "author": repo.owner.login,
-            "description": repo.description or "",
-            "stars": repo.stargazers_count,
-            "language": repo.language or "unknown",
-            "topics": list(repo.get_topics()),
-            "license": repo.license.spdx_id if repo.license else "unknown",
-            "url": repo.html_url
-        }
+        # PyGithub is imported lazily so MOCK_MODE runs never pay for it
+        from github import Github, Auth
+        usage.install()
+
+        with metrics.timer("github.fetch"), usage.attribute(repo_name):
+            auth = Auth.Token(GITHUB_TOKEN)
+            g = Github(auth=auth, base_url=GITHUB_API_URL)
+            # exactly one request: GET /repos/{name} already carries owner,
+            # license and topics; reading them through the PyGithub objects
+            # (repo.get_topics(), lazy completion) would cost more
+            payload = g.get_repo(repo_name).raw_data
+            data = repo_record(payload)
+            schedule.observe(repo_name, stars=data["stars"], pushed_at=payload.get("pushed_at"))
+        metrics.incr("github.repos_fetched")
 
         print(f"  ✅ success to get (⭐ {data['stars']} stars)")
         return data
 
     except Exception as e:
+        metrics.incr("github.errors")
         print(f"  ❌ fail to get: {e}")
         return None
 
 
-def load_github_models():
+def load_github_models(previous_schedule=None, expansion_cache=None):
     """批量加载多个 repo 信息"""
     print("\n" + "=" * 60)
     print("🚀 GitHub Loader - start extract")
     print("=" * 60)
     print(f"📋 in total {len(GITHUB_REPOS)} num_of_repo\n")
 
-    all_data = []
-    for i, repo_name in enumerate(GITHUB_REPOS, 1):
-        print(f"📦 [{i}/{len(GITHUB_REPOS)}] {repo_name}")
-        data = get_repo_basic_info(repo_name)
-        if data:
-            all_data.append(data)
-        print()
+    from github_pipeline.scheduler import schedule, schedule_blob_for
+    from github_pipeline.wildcards import (RepoLister, expansion_blob_for, interleave, split_covered,
+                                           split_entries)
 
     output_path = OUTPUT_DIR / "github_raw_data.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_data, f, indent=2, ensure_ascii=False)
+    local = LocalBackend(OUTPUT_DIR)
+    # "owner/*" entries are listed page by page (github_pipeline/wildcards.py);
+    # the previous run's page cache and schedule state come from the caller
+    # (e.g. the bucket) or the local files
+    names, owners = split_entries(GITHUB_REPOS)
+    expansion_name = expansion_blob_for(output_path.name)
+    if expansion_cache is None:
+        expansion_cache = local.read_json(expansion_name) if owners and local.exists(expansion_name) else {}
+    # highest priority first (github_pipeline/scheduler.py)
+    schedule_name = schedule_blob_for(output_path.name)
+    if previous_schedule is None and local.exists(schedule_name):
+        previous_schedule = local.read_json(schedule_name)
+    repos = schedule.plan(names, previous_schedule, PINNED_REPOS)
+    scores = {e["repo"]: e["score"] for e in schedule.entries}
+    positions = {name: i for i, name in enumerate(repos, 1)}
+
+    all_data = []
+    listed = set()
+    with metrics.timer("extract") as timer, usage.tracking():
+        expansion = ()
+        if owners and MOCK_MODE:
+            print(f"🔶 Mock mode: skipping {len(owners)} wildcard entries")
+        elif owners:
+            lister = RepoLister(GITHUB_TOKEN, GITHUB_API_URL, cache=expansion_cache)
+            expansion = lister.expand(owners, listed)
+        # listed records come in between the fetches; repos of a wildcard
+        # owner wait for the listing, which usually already has them
+        independent, covered = split_covered(repos, owners)
+        later = (name for name in covered if name.lower() not in listed)
+        for item in chain(interleave(expansion, independent), later):
+            if isinstance(item, dict):
+                all_data.append(item)
+                continue
+            i = positions[item]
+            print(f"📦 [{i}/{len(repos)}] {item} (priority {scores[item]})")
+            data = get_repo_basic_info(item)
+            if data:
+                all_data.append(data)
+            print()
+        timer.records = len(all_data)
+
+    local.write_json(output_path.name, all_data)
+    local.write_json(usage_blob_for(output_path.name), usage.summary())
+    local.write_json(schedule_name, schedule.state())
+    if owners:
+        local.write_json(expansion_name, expansion_cache)
 
     print("=" * 60)
     print(f"✅ success to get {len(all_data)} repos")
     print(f"💾 save to: {output_path}")
+    print(f"📈 GitHub requests: {usage.summary()['requests']['total']}")
     print("=" * 60)
 
     return all_data
@@ -87,4 +153,4 @@ if __name__ == "__main__":
     data = load_github_models()
     if data:
         print("\n📊 sample data（first repo）：")
-        print(json.dumps(data[0], indent=2, ensure_ascii=False))
+        print(codec.dumps(data[0], pretty=True).decode("utf-8"))
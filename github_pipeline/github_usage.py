@@ -0,0 +1,208 @@
+"""
+GitHub API Usage
+----------------
+Counts every request PyGithub actually sends during an extraction,
+including the lazy "complete the object" calls, and answers "where did
+the quota go?":
+
+- requests by endpoint type (repo, topics, search, graphql, ...) and status
+- quota used per rate-limit resource (core, search, graphql points), from
+  the X-RateLimit-* response headers
+- rate-limit headroom over time (remaining, sampled every ~1% of the limit)
+- per-repo attribution: calls made inside ``usage.attribute(repo_name)``
+
+Usage:
+    with usage.tracking():
+        for name in repos:
+            with usage.attribute(name):
+                ...PyGithub calls...
+    store.write_json(usage_blob_for(raw_blob), usage.summary())
+
+Requests are observed through PyGithub's injectable logger, so connection
+reuse and throttling are unchanged.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from github_pipeline.metrics import metrics
+from github_pipeline.storage import sidecar_blob
+
+UNATTRIBUTED = "(unattributed)"
+HEADROOM_STEPS = 100  # headroom samples per rate-limit window
+
+
+def usage_blob_for(blob: str) -> str:
+    """github/raw/github_raw_data.json -> github/raw/github_raw_data.usage.json"""
+    return sidecar_blob(blob, ".usage.json")
+
+
+def endpoint_type(url: str) -> str:
+    """Classify a request path (no host) into an endpoint type."""
+    parts = [p for p in url.split("?", 1)[0].split("/") if p]
+    # GitHub Enterprise serves the REST API under /api/v3
+    if parts[:2] == ["api", "v3"]:
+        parts = parts[2:]
+    if not parts:
+        return "root"
+    head = parts[0]
+    if head in ("graphql", "rate_limit", "search"):
+        return head
+    if head == "repos" and len(parts) >= 3:
+        return "repo" if len(parts) == 3 else parts[3]
+    if head in ("orgs", "users") and parts[-1] == "repos":
+        return f"{head[:-1]}_repos"
+    return head
+
+
+class _UsageHandler(logging.Handler):
+    """Receives PyGithub's per-request debug record (see Requester.__log)."""
+
+    def __init__(self, usage):
+        super().__init__(logging.DEBUG)
+        self.usage = usage
+
+    def emit(self, record):
+        args = record.args
+        # (verb, scheme, hostname, url, headers, input, status, responseHeaders, output)
+        if isinstance(args, tuple) and len(args) == 9:
+            self.usage.record(args[3], args[6], args[7])
+
+
+class GitHubUsage:
+    """Thread-safe request/quota accounting for one extraction run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._installed = False
+        self._active = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc).isoformat()
+            self._t0 = time.perf_counter()
+            self.by_endpoint = {}
+            self.by_status = {}
+            self.by_repo = {}
+            self.quota = {}     # resource -> {"limit", "used", "remaining_min", ...}
+            self.headroom = {}  # resource -> [[elapsed_s, remaining], ...]
+
+    # ----- collection -----
+
+    @contextmanager
+    def tracking(self):
+        """Reset the counters and observe PyGithub requests until exit."""
+        self.reset()
+        self._active = True
+        try:
+            yield self
+        finally:
+            self._active = False
+            if self._installed:
+                from github.Requester import Requester
+                Requester.resetLogger()
+                self._installed = False
+
+    def install(self):
+        """Hook into PyGithub; called after it is imported (no-op in MOCK_MODE)."""
+        if not self._active or self._installed:
+            return
+        from github.Requester import Requester
+
+        logger = logging.getLogger("github_pipeline.github_usage.requests")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        if not any(isinstance(h, _UsageHandler) for h in logger.handlers):
+            logger.addHandler(_UsageHandler(self))
+        Requester.injectLogger(logger)
+        self._installed = True
+
+    @contextmanager
+    def attribute(self, repo_name):
+        """Attribute requests made in this block (and thread) to ``repo_name``."""
+        previous = getattr(self._local, "repo", None)
+        self._local.repo = repo_name
+        try:
+            yield
+        finally:
+            self._local.repo = previous
+
+    def record(self, url, status, headers):
+        endpoint = endpoint_type(url)
+        repo = getattr(self._local, "repo", None) or UNATTRIBUTED
+        headers = headers or {}
+        with self._lock:
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+            self.by_status[str(status)] = self.by_status.get(str(status), 0) + 1
+            per_repo = self.by_repo.setdefault(repo, {})
+            per_repo[endpoint] = per_repo.get(endpoint, 0) + 1
+            self._record_quota(headers)
+        metrics.incr("github.api_calls")
+        metrics.incr(f"github.requests.{endpoint}")
+        if status in (403, 429):
+            metrics.incr("github.rate_limited")
+
+    def _record_quota(self, headers):
+        if "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            remaining = int(float(headers["x-ratelimit-remaining"]))
+            limit = int(float(headers.get("x-ratelimit-limit", 0)))
+            used = int(float(headers.get("x-ratelimit-used", limit - remaining)))
+            reset = int(float(headers.get("x-ratelimit-reset", 0)))
+        except ValueError:
+            return
+        resource = headers.get("x-ratelimit-resource", "core")
+
+        q = self.quota.get(resource)
+        if q is None:
+            q = self.quota[resource] = {"limit": limit, "used": 0, "remaining_min": remaining,
+                                        "remaining_last": remaining, "reset_at": reset, "_used": None}
+        # cost = growth of X-RateLimit-Used within one window (GraphQL
+        # queries cost several points, conditional 304s cost none)
+        if q["_used"] is not None and reset == q["reset_at"]:
+            q["used"] += max(0, used - q["_used"])
+        else:
+            q["used"] += 1
+        q.update(limit=limit, remaining_last=remaining, reset_at=reset, _used=used,
+                 remaining_min=min(q["remaining_min"], remaining))
+
+        samples = self.headroom.setdefault(resource, [])
+        step = max(1, limit // HEADROOM_STEPS)
+        if not samples or abs(samples[-1][1] - remaining) >= step:
+            samples.append([round(time.perf_counter() - self._t0, 3), remaining])
+
+    # ----- reporting -----
+
+    def summary(self) -> dict:
+        with self._lock:
+            repos = {name: {"requests": sum(c.values()), "by_endpoint": dict(sorted(c.items()))}
+                     for name, c in sorted(self.by_repo.items())}
+            costs = [r["requests"] for name, r in repos.items() if name != UNATTRIBUTED]
+            return {
+                "run_id": metrics.run_id,
+                "started_at": self.started_at,
+                "elapsed_s": round(time.perf_counter() - self._t0, 3),
+                "requests": {
+                    "total": sum(self.by_endpoint.values()),
+                    "by_endpoint": dict(sorted(self.by_endpoint.items())),
+                    "by_status": dict(sorted(self.by_status.items())),
+                },
+                "quota": {res: {k: v for k, v in q.items() if not k.startswith("_")}
+                          for res, q in sorted(self.quota.items())},
+                "headroom": {res: list(s) for res, s in sorted(self.headroom.items())},
+                "cost_per_repo": {
+                    "repos": len(costs),
+                    "mean": round(sum(costs) / len(costs), 2) if costs else None,
+                    "max": max(costs) if costs else None,
+                },
+                "repos": repos,
+            }
+
+
+usage = GitHubUsage()
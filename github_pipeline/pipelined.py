@@ -0,0 +1,290 @@
+"""
+Pipelined Extraction
+--------------------
+Runs fetch → map → normalize → write as concurrent stages connected by
+bounded queues, instead of one stage after another over the whole list:
+
+    repo names ─▶ fetch      FETCH_WORKERS threads, get_repo_basic_info
+               ─▶ [queue] ─▶ map        map_taxonomy
+               ─▶ [queue] ─▶ normalize  normalize_github_model
+               ─▶ [queue] ─▶ write      one JSON array, streamed to storage.open_write
+
+Every queue holds at most QUEUE_SIZE items: a producer that gets ahead
+blocks until its consumer catches up (backpressure), so the records in
+flight are bounded by the queues rather than the corpus. The output is
+streamed too, except on MemoryBackend, which holds the whole array (see
+storage.open_write). Fetching waits on the network and
+runs in a thread pool; map and normalize are CPU-bound and get one thread
+each (the GIL would serialize more). End-to-end time approaches the
+slowest stage instead of the sum of all of them.
+
+- repo names may be any iterable, including a lazy one; it is consumed as
+  the fetch workers need work. Items that are already records (dicts, e.g.
+  from wildcards.RepoLister.expand) skip the fetch
+- records are written in completion order, not input order
+- failed fetches (None) are dropped and counted (pipeline.fetch_failed)
+- if any stage raises, the other stages stop, the output is not committed
+  and run_pipelined re-raises
+
+The report gives each stage's busy time (time spent in its own work, not
+waiting on a queue) next to the wall time, which shows which stage bounds
+the run.
+
+Usage:
+    from github_pipeline.pipelined import run_pipelined
+    report = run_pipelined(GITHUB_REPOS, get_backend("./output"), "github_ready_data.json")
+
+    python -m github_pipeline.pipelined --out ./output --repos-file repos.txt
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+from github_pipeline import codec
+from github_pipeline.metrics import metrics
+
+FETCH_WORKERS = 8
+QUEUE_SIZE = 256            # items per queue between two stages
+WRITE_CHUNK = 1 << 20       # bytes buffered before each write to the output stream
+_POLL_S = 0.1               # how often blocked stages check for a failure elsewhere
+_END = object()             # end-of-stream marker between stages
+
+
+class _Stopped(Exception):
+    """Another stage failed; unwind this one quietly."""
+
+
+class _Stage:
+    __slots__ = ("name", "records", "busy_s", "lock")
+
+    def __init__(self, name):
+        self.name = name
+        self.records = 0
+        self.busy_s = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds, records=1):
+        with self.lock:
+            self.busy_s += seconds
+            self.records += records
+
+
+class _Pipeline:
+    def __init__(self, queue_size):
+        self.stop = threading.Event()
+        self.errors = []
+        self.fetched = queue.Queue(queue_size)
+        self.mapped = queue.Queue(queue_size)
+        self.ready = queue.Queue(queue_size)
+
+    def fail(self, exc):
+        self.errors.append(exc)
+        self.stop.set()
+
+    def put(self, q, item):
+        while True:
+            if self.stop.is_set():
+                raise _Stopped
+            try:
+                return q.put(item, timeout=_POLL_S)
+            except queue.Full:
+                continue
+
+    def get(self, q):
+        while True:
+            if self.stop.is_set():
+                raise _Stopped
+            try:
+                return q.get(timeout=_POLL_S)
+            except queue.Empty:
+                continue
+
+    def thread(self, target, *args):
+        def run():
+            try:
+                target(*args)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                self.fail(e)
+
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        return t
+
+
+def _fetch_stage(pipe, names, fetch, stage, workers):
+    """``workers`` threads pull names from one shared iterator; the last one out ends the stream."""
+    names = iter(names)
+    names_lock = threading.Lock()
+    remaining = [workers]
+
+    def worker():
+        try:
+            while not pipe.stop.is_set():
+                with names_lock:
+                    name = next(names, _END)
+                if name is _END:
+                    break
+                t0 = time.perf_counter()
+                data = name if isinstance(name, dict) else fetch(name)
+                stage.add(time.perf_counter() - t0)
+                if data is None:
+                    metrics.incr("pipeline.fetch_failed")
+                    continue
+                pipe.put(pipe.fetched, data)
+        finally:
+            with names_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and not pipe.stop.is_set():
+                pipe.put(pipe.fetched, _END)
+
+    return [pipe.thread(worker) for _ in range(workers)]
+
+
+def _map_stage(pipe, stage):
+    from github_pipeline.taxonomy_mapper import map_taxonomy
+
+    while True:
+        model = pipe.get(pipe.fetched)
+        if model is _END:
+            return pipe.put(pipe.mapped, _END)
+        t0 = time.perf_counter()
+        mapped = map_taxonomy(model)
+        stage.add(time.perf_counter() - t0)
+        metrics.incr(f"map.task.{mapped['task']}")
+        pipe.put(pipe.mapped, mapped)
+
+
+def _normalize_stage(pipe, stage, ingested_at):
+    from github_pipeline.prepare_github_for_mapper import normalize_github_model
+
+    while True:
+        model = pipe.get(pipe.mapped)
+        if model is _END:
+            return pipe.put(pipe.ready, _END)
+        t0 = time.perf_counter()
+        record = normalize_github_model(model)
+        record["ingested_at"] = ingested_at
+        stage.add(time.perf_counter() - t0)
+        pipe.put(pipe.ready, record)
+
+
+def _write_stage(pipe, out, stage):
+    """Stream ``[r1,r2,...]``; the same bytes codec.dumps(list) gives, without the list."""
+    buf = bytearray(b"[")
+    while True:
+        record = pipe.get(pipe.ready)
+        t0 = time.perf_counter()
+        if record is _END:
+            buf += b"]"
+            out.write(bytes(buf))
+            stage.add(time.perf_counter() - t0, 0)
+            return
+        if stage.records:
+            buf += b","
+        buf += codec.dumps(record)
+        if len(buf) >= WRITE_CHUNK:
+            out.write(bytes(buf))
+            buf.clear()
+        stage.add(time.perf_counter() - t0)
+
+
+def run_pipelined(repo_names, store, blob: str, fetch=None,
+                  fetch_workers: int = FETCH_WORKERS, queue_size: int = QUEUE_SIZE) -> dict:
+    """
+    Fetch, map and normalize ``repo_names`` concurrently and stream the
+    ready records to ``blob`` in ``store`` as one JSON array.
+
+    ``fetch(name) -> dict | None`` defaults to github_loader.get_repo_basic_info.
+    Returns the run report (records, wall time, per-stage busy time).
+    """
+    if fetch is None:
+        from github_pipeline.github_loader import get_repo_basic_info as fetch
+
+    pipe = _Pipeline(queue_size)
+    stages = {name: _Stage(name) for name in ("fetch", "map", "normalize", "write")}
+    ingested_at = datetime.utcnow().isoformat() + "+00:00"
+
+    print(f"🚰 Pipelined run → {store.uri(blob)} "
+          f"({fetch_workers} fetch workers, queues of {queue_size})")
+    t0 = time.perf_counter()
+    with metrics.timer("pipelined") as timer:
+        threads = _fetch_stage(pipe, repo_names, fetch, stages["fetch"], fetch_workers)
+        threads.append(pipe.thread(_map_stage, pipe, stages["map"]))
+        threads.append(pipe.thread(_normalize_stage, pipe, stages["normalize"], ingested_at))
+
+        out = store.open_write(blob, content_type="application/json")
+        try:
+            _write_stage(pipe, out, stages["write"])
+        except _Stopped:
+            pass
+        except BaseException as e:
+            pipe.fail(e)
+        for t in threads:
+            t.join()
+        if pipe.errors:
+            out.abort()         # the previous blob, if any, is left as it was
+            raise pipe.errors[0]
+        out.close()
+        timer.records = stages["write"].records
+    wall_s = time.perf_counter() - t0
+
+    report = {
+        "blob": blob,
+        "records": stages["write"].records,
+        "fetch_failed": stages["fetch"].records - stages["map"].records,
+        "fetch_workers": fetch_workers,
+        "queue_size": queue_size,
+        "wall_s": round(wall_s, 4),
+        # fetch busy time is summed over its workers
+        "stages": {name: {"records": s.records, "busy_s": round(s.busy_s, 4)}
+                   for name, s in stages.items()},
+    }
+    report["stages"]["fetch"]["busy_s_per_worker"] = round(stages["fetch"].busy_s / fetch_workers, 4)
+    print(f"✅ {report['records']} records in {wall_s:.2f}s  "
+          + "  ".join(f"{name} {s['busy_s']:.2f}s" for name, s in report["stages"].items()))
+    return report
+
+
+def _main(argv=None):
+    import argparse
+
+    from github_pipeline.storage import get_backend
+
+    parser = argparse.ArgumentParser(description="Pipelined fetch → map → normalize → write")
+    parser.add_argument("--out", default="./output", help="storage location (see storage.get_backend)")
+    parser.add_argument("--blob", default="github_ready_data.json")
+    parser.add_argument("--repos-file", help="one owner/name per line (default: config.GITHUB_REPOS)")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.repos_file:
+        with open(args.repos_file, "r", encoding="utf-8") as f:
+            entries = [line.strip() for line in f if line.strip()]
+    else:
+        from config import GITHUB_REPOS as entries
+
+    from itertools import chain
+
+    from config import GITHUB_API_URL, GITHUB_TOKEN
+    from github_pipeline.wildcards import RepoLister, interleave, split_covered, split_entries
+
+    # "owner/*" entries stream listed records in between the other names;
+    # names of a wildcard owner follow the listing, which usually has them
+    names, owners = split_entries(entries)
+    independent, covered = split_covered(names, owners)
+    listed = set()
+    items = chain(interleave(RepoLister(GITHUB_TOKEN, GITHUB_API_URL).expand(owners, listed), independent),
+                  (name for name in covered if name.lower() not in listed))
+    report = run_pipelined(items, get_backend(args.out), args.blob,
+                           fetch_workers=args.workers, queue_size=args.queue_size)
+    print(codec.dumps(report, pretty=True).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,172 @@
+"""
+Query Index over the Ready Dataset
+----------------------------------
+Loads normalized ("ready") models into inverted indexes so filtered top-K
+questions ("top 100 object-detection models") are answered by intersecting
+postings instead of scanning every record.
+
+- Indexed fields: task, data_types, categories, license, library
+  (list fields post every value; keys are case-insensitive).
+- Records get doc ids in rank order: SORT / DIRECTION from taxonomy_schema,
+  falling back to `likes` when a record has no SORT value (GitHub has no
+  downloads). Every postings list is therefore already sorted by rank, and
+  a query stops after the first `limit` hits of the intersection.
+- Filters: AND across fields, OR within a field given a list of values.
+
+Usage:
+    index = QueryIndex.from_store(get_backend(bucket), READY_BLOB)
+    index.query(task="object-detection", license=["MIT", "Apache-2.0"])
+    index.top_per_task()      # {task: top MAX_PER_TASK models}
+
+    python -m github_pipeline.query_index output/ready.json --task object-detection --top 10
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+
+from github_pipeline.taxonomy_schema import DIRECTION, MAX_PER_TASK, SORT
+
+INDEXED_FIELDS = ("task", "data_types", "categories", "license", "library")
+FALLBACK_SORT = "likes"
+
+
+def _key(value) -> str:
+    return str(value).lower()
+
+
+def rank_value(record, sort: str = SORT):
+    value = record.get(sort)
+    if value is None:
+        value = record.get(FALLBACK_SORT)
+    return value or 0
+
+
+class QueryIndex:
+    """Immutable inverted index; build once per ready dataset."""
+
+    def __init__(self, records, sort: str = SORT, direction: int = DIRECTION):
+        self.sort = sort
+        self.direction = direction
+        # doc id == rank; sorted() is stable so ties keep input order
+        self.docs = sorted(records, key=lambda r: rank_value(r, sort), reverse=direction < 0)
+        self.postings = {field: {} for field in INDEXED_FIELDS}
+
+        for doc_id, record in enumerate(self.docs):
+            for field in INDEXED_FIELDS:
+                value = record.get(field)
+                values = value if isinstance(value, (list, tuple)) else (value,)
+                index = self.postings[field]
+                for v in values:
+                    if v is None:
+                        continue
+                    plist = index.get(_key(v))
+                    if plist is None:
+                        plist = index[_key(v)] = array("I")
+                    # a list may repeat a value; ids only grow, so check the tail
+                    if not plist or plist[-1] != doc_id:
+                        plist.append(doc_id)
+
+    @classmethod
+    def from_store(cls, store, blob: str, **kwargs):
+        """Build from a ready blob (list, or {"models": [...]}) in a storage backend."""
+        data = store.read_json(blob)
+        models = data.get("models", data) if isinstance(data, dict) else data
+        return cls(models, **kwargs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def values(self, field: str) -> dict:
+        """{value: record count} for one indexed field (facet counts)."""
+        return {v: len(p) for v, p in sorted(self.postings[field].items())}
+
+    def _field_postings(self, field, wanted) -> list:
+        """Postings lists matching any of ``wanted`` in ``field`` (OR group)."""
+        if field not in self.postings:
+            raise KeyError(f"{field!r} is not indexed (one of {', '.join(INDEXED_FIELDS)})")
+        index = self.postings[field]
+        wanted = wanted if isinstance(wanted, (list, tuple, set)) else (wanted,)
+        return [index[k] for k in {_key(v) for v in wanted} if k in index]
+
+    def query_ids(self, limit: int = MAX_PER_TASK, **filters) -> list:
+        """Doc ids (ranks) of the best ``limit`` records matching ``filters``."""
+        if limit is not None and limit <= 0:
+            return []
+        if not filters:
+            return list(range(len(self.docs) if limit is None else min(limit, len(self.docs))))
+
+        groups = sorted((self._field_postings(f, v) for f, v in filters.items()),
+                        key=lambda lists: sum(map(len, lists)))
+        if not groups[0]:
+            return []
+        driver, others = groups[0], groups[1:]
+        candidates = driver[0] if len(driver) == 1 else heapq.merge(*driver)
+        cursors = [[0] * len(lists) for lists in others]
+        hits = []
+        last = -1
+        # leapfrog: walk the smallest group in rank order, binary-search
+        # forward (never backward) in the others
+        for doc_id in candidates:
+            if doc_id == last:           # same doc under two values of a list field
+                continue
+            last = doc_id
+            for lists, pos in zip(others, cursors):
+                found = False
+                for j, plist in enumerate(lists):
+                    pos[j] = bisect_left(plist, doc_id, pos[j])
+                    if pos[j] < len(plist) and plist[pos[j]] == doc_id:
+                        found = True
+                        break
+                if not found:
+                    if all(p == len(l) for p, l in zip(pos, lists)):
+                        return hits      # a group is exhausted: no more matches
+                    break
+            else:
+                hits.append(doc_id)
+                if limit is not None and len(hits) >= limit:
+                    break                # postings are rank-ordered: done
+        return hits
+
+    def query(self, limit: int = MAX_PER_TASK, **filters) -> list:
+        """Best ``limit`` records (by SORT/DIRECTION) matching all ``filters``."""
+        return [self.docs[i] for i in self.query_ids(limit, **filters)]
+
+    def count(self, **filters) -> int:
+        return len(self.query_ids(None, **filters))
+
+    def top_per_task(self, limit: int = MAX_PER_TASK) -> dict:
+        """{task: best ``limit`` records} for every task in the dataset."""
+        return {task: [self.docs[i] for i in plist[:limit]]
+                for task, plist in sorted(self.postings["task"].items())}
+
+
+def _main(argv=None):
+    import argparse
+    import json
+
+    from github_pipeline.storage import get_backend
+
+    parser = argparse.ArgumentParser(description="Filtered top-K over a ready JSON file")
+    parser.add_argument("path", help="ready JSON file, or a blob name with --bucket")
+    parser.add_argument("--bucket", help="storage location (see storage.get_backend)")
+    for field in INDEXED_FIELDS:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, action="append",
+                            help="repeat for OR")
+    parser.add_argument("--top", type=int, default=MAX_PER_TASK)
+    args = parser.parse_args(argv)
+
+    if args.bucket:
+        store, blob = get_backend(args.bucket), args.path
+    else:
+        location, _, blob = args.path.rpartition("/")
+        store = get_backend(location or ".")
+    index = QueryIndex.from_store(store, blob)
+    filters = {f: getattr(args, f) for f in INDEXED_FIELDS if getattr(args, f)}
+    for record in index.query(args.top, **filters):
+        print(json.dumps({"modelId": record.get("modelId"), "likes": record.get("likes"),
+                          "task": record.get("task")}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    _main()
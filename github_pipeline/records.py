@@ -0,0 +1,251 @@
+"""
+Pipeline Records
+----------------
+Compact, typed representations of the three record shapes that move
+through the pipeline:
+
+- RawRecord:    output of github_loader.get_repo_basic_info (library / readme
+                only after the tarball enrichment, github_pipeline.enrichment)
+- MappedRecord: RawRecord + task / data_types / categories (taxonomy_mapper)
+- ReadyRecord:  Hugging Face–aligned record (prepare_github_for_merge)
+
+Each class uses __slots__ (no per-record key dict) and interns the strings
+that repeat across records (author, language, license, task, topics, ...).
+They also speak the small part of the dict protocol the stages already use
+(get / [] / []= / in), so map_taxonomy() and the normalizers work on them
+unchanged, and to_dict()/from_dict() keep the JSON layout identical.
+Keys a class has no field for are not dropped: they are kept in a small
+per-record dict (only allocated when there are any) and written back by
+to_dict(), as they were when the stages mutated the raw dicts in place.
+
+Building records costs more CPU than building dicts (the interning is the
+price of the memory saving), so the per-record normalizer in prepare
+stays a plain dict builder; see prepare_github_for_merge.normalize_model.
+"""
+
+import sys
+from datetime import datetime
+
+from github_pipeline import codec
+
+_intern = sys.intern
+
+
+def _intern_list(values):
+    return [_intern(v) if type(v) is str else v for v in (values or [])]
+
+
+class _Record:
+    # keys without a field of their own (None until there is one)
+    __slots__ = ("_extra",)
+
+    # field -> default; insertion order is the JSON key order
+    DEFAULTS = {}
+    # fields holding a repeated string / a list of repeated strings
+    INTERNED = ()
+    INTERNED_LISTS = ()
+    # fields left out of to_dict() while None, so records without them keep
+    # the JSON layout (and delta fingerprints) they had before the field existed
+    OPTIONAL = ()
+
+    def __init__(self, **fields):
+        for name, default in self.DEFAULTS.items():
+            setattr(self, name, fields.get(name, default))
+        unknown = fields.keys() - self.DEFAULTS.keys()
+        self._extra = {k: fields[k] for k in fields if k in unknown} if unknown else None
+        self._intern()
+
+    def _intern(self):
+        # list fields are always rebuilt here, so records never share lists
+        # with their input (or with the mutable defaults above)
+        for name in self.INTERNED:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, _intern(value))
+        for name in self.INTERNED_LISTS:
+            setattr(self, name, _intern_list(getattr(self, name)))
+
+    # ===== dict protocol used by the stages =====
+
+    def get(self, key, default=None):
+        if key in self.DEFAULTS:
+            return getattr(self, key)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        if key in self.DEFAULTS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.DEFAULTS:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.DEFAULTS or (self._extra is not None and key in self._extra)
+
+    def keys(self):
+        if self._extra is None:
+            return self.DEFAULTS.keys()
+        return list(self.DEFAULTS) + list(self._extra)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return (all(getattr(self, f) == getattr(other, f) for f in self.DEFAULTS)
+                and (self._extra or {}) == (other._extra or {}))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    # ===== conversion =====
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.DEFAULTS}
+        for name in self.OPTIONAL:
+            if data[name] is None:
+                del data[name]
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a record from a JSON dict; keys without a field are carried in _extra."""
+        record = cls.__new__(cls)
+        for name, default in cls.DEFAULTS.items():
+            setattr(record, name, data.get(name, default))
+        unknown = data.keys() - cls.DEFAULTS.keys()
+        # input key order, so to_dict() gives the extra keys back as they came
+        record._extra = {k: data[k] for k in data if k in unknown} if unknown else None
+        record._intern()
+        return record
+
+    def to_json(self) -> str:
+        return codec.dumps(self).decode("utf-8")
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(codec.loads(text))
+
+
+class RawRecord(_Record):
+    __slots__ = ("modelId", "author", "description", "stars", "language",
+                 "topics", "license", "url", "library", "readme", "duplicate_of")
+
+    DEFAULTS = {
+        "modelId": None,
+        "author": None,
+        "description": "",
+        "stars": 0,
+        "language": "unknown",
+        "topics": [],
+        "license": "unknown",
+        "url": "",
+        # set by the optional tarball enrichment (github_pipeline/enrichment.py)
+        "library": None,
+        "readme": None,
+        # canonical modelId of a near-duplicate (dedup "flag" mode)
+        "duplicate_of": None,
+    }
+    INTERNED = ("author", "language", "license", "library")
+    INTERNED_LISTS = ("topics",)
+    OPTIONAL = ("library", "readme", "duplicate_of")
+
+
+class MappedRecord(RawRecord):
+    __slots__ = ("task", "data_types", "categories")
+
+    DEFAULTS = {
+        **RawRecord.DEFAULTS,
+        "task": "unknown",
+        "data_types": [],
+        "categories": [],
+    }
+    INTERNED = RawRecord.INTERNED + ("task",)
+    INTERNED_LISTS = RawRecord.INTERNED_LISTS + ("data_types", "categories")
+
+
+class ReadyRecord(_Record):
+    __slots__ = ("modelId", "author", "pipeline_tag", "tags", "library", "license",
+                 "downloads", "likes", "task", "categories", "data_types", "repo_url",
+                 "lastModified", "private", "gated", "safetensors", "ingested_at",
+                 "duplicate_of")
+
+    DEFAULTS = {
+        "modelId": None,
+        "author": None,
+        "pipeline_tag": "unknown",
+        "tags": [],
+        "library": "unknown",
+        "license": "unknown",
+        "downloads": None,
+        "likes": 0,
+        "task": "unknown",
+        "categories": [],
+        "data_types": [],
+        "repo_url": "",
+        "lastModified": "unknown",
+        "private": False,
+        "gated": False,
+        "safetensors": False,
+        "ingested_at": None,
+        "duplicate_of": None,
+    }
+    INTERNED = ("author", "pipeline_tag", "library", "license", "task")
+    INTERNED_LISTS = ("tags", "categories", "data_types")
+    OPTIONAL = ("duplicate_of",)
+
+    @classmethod
+    def from_mapped(cls, model, ingested_at: str = None):
+        """
+        Normalize a mapped record (MappedRecord or dict) without an
+        intermediate dict; same field mapping as normalize_github_model.
+        """
+        record = cls.__new__(cls)
+        record._extra = None
+        get = model.get
+        task = get("task", "unknown")
+        record.modelId = get("modelId")
+        record.author = get("author")
+        record.pipeline_tag = task
+        record.tags = list(get("topics", [])) + ["source:github"]
+        record.library = get("library") or get("language", "unknown")
+        record.license = get("license", "unknown")
+        record.downloads = get("downloads", None)
+        record.likes = get("stars", 0)
+        record.task = task
+        record.categories = get("categories", [])
+        record.data_types = get("data_types", [])
+        record.repo_url = get("url", "")
+        record.lastModified = get("lastModified", "unknown")
+        record.private = get("private", False)
+        record.gated = get("gated", False)
+        record.safetensors = get("safetensors", False)
+        record.ingested_at = ingested_at or datetime.utcnow().isoformat() + "+00:00"
+        record.duplicate_of = get("duplicate_of")
+        record._intern()
+        return record
+
+
+def records_from_dicts(dicts, cls=MappedRecord) -> list:
+    return [cls.from_dict(d) for d in dicts]
+
+
+def records_to_dicts(records) -> list:
+    return [r.to_dict() if isinstance(r, _Record) else r for r in records]
+
+
+def json_default(obj):
+    """``default=`` hook for stdlib json.dumps so records serialize without a dict copy step."""
+    if isinstance(obj, _Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,246 @@
+"""
+Wildcard Repo Entries
+---------------------
+Lets GITHUB_REPOS track whole organizations or users: an entry "owner/*"
+expands to every repo the owner has, by paging
+
+    GET /orgs/{owner}/repos?per_page=100      (404 → the owner is a user:)
+    GET /users/{owner}/repos?per_page=100&type=owner
+
+The listing items have the same shape as GET /repos/{owner}/{repo}, so
+each one becomes a raw record directly (github_loader.repo_record): an
+org with N repos costs ceil(N / 100) requests instead of N.
+
+Expansion is cached: every page is kept with its ETag and sent back as
+If-None-Match next time, and GitHub answers an unchanged page with a 304
+that does not count against the rate limit. The cache is a plain dict
+(RepoLister.cache) the loaders persist as <raw>.expansion.json; after a
+complete expansion, pages that were not requested (owners dropped from
+GITHUB_REPOS, pages past a shrunk listing) are pruned from it.
+
+Records are yielded page by page as they arrive. The loaders interleave
+them with the fetches of the plain entries (interleave), and hold back
+only the plain entries of wildcard owners (split_covered), which are
+skipped if their listing already produced them.
+
+Listed repos are reported to the extraction scheduler like fetched ones
+(schedule.add, then schedule.observe with the listing's stars and
+pushed_at), so they carry a score and history in <raw>.schedule.json.
+
+Requests go through urllib and are reported to github_usage like
+PyGithub's, so they show up in the usage report.
+
+Usage:
+    lister = RepoLister(GITHUB_TOKEN, GITHUB_API_URL, cache=previous_cache)
+    for record in lister.expand(["facebookresearch/*", "ultralytics/*"]):
+        ...
+    store.write_json(expansion_blob_for(raw_blob), lister.cache)
+"""
+
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from github_pipeline import codec
+from github_pipeline.github_usage import usage
+from github_pipeline.metrics import metrics
+from github_pipeline.storage import sidecar_blob
+
+PER_PAGE = 100              # GitHub's maximum page size
+TIMEOUT_S = 30
+
+
+def is_wildcard(entry: str) -> bool:
+    return entry.endswith("/*")
+
+
+def split_entries(entries) -> tuple:
+    """(plain repo names, wildcard owners) of GITHUB_REPOS-style entries."""
+    names, owners = [], []
+    for entry in entries:
+        if is_wildcard(entry):
+            owners.append(entry[:-2])
+        else:
+            names.append(entry)
+    return names, owners
+
+
+def split_covered(names, owners) -> tuple:
+    """(names whose owner is not among ``owners``, names whose owner is), in order."""
+    wildcard_owners = {owner.lower() for owner in owners}
+    independent, covered = [], []
+    for name in names:
+        (covered if name.split("/")[0].lower() in wildcard_owners else independent).append(name)
+    return independent, covered
+
+
+def interleave(*iterables):
+    """Round-robin over ``iterables``, lazily, until all are exhausted."""
+    iterators = [iter(it) for it in iterables]
+    while iterators:
+        for it in list(iterators):
+            try:
+                yield next(it)
+            except StopIteration:
+                iterators.remove(it)
+
+
+def expansion_blob_for(blob: str) -> str:
+    """github/raw/github_raw_data.json -> github/raw/github_raw_data.expansion.json"""
+    return sidecar_blob(blob, ".expansion.json")
+
+
+def _next_link(header: str):
+    """URL of rel="next" in a Link header, or None."""
+    for part in (header or "").split(","):
+        section = part.split(";")
+        if len(section) >= 2 and section[1].strip() == 'rel="next"':
+            return section[0].strip().strip("<>")
+    return None
+
+
+class RepoLister:
+    """Pages owner repo listings into raw records, with an ETag page cache."""
+
+    def __init__(self, token: str = "", base_url: str = "https://api.github.com",
+                 cache: dict = None, per_page: int = PER_PAGE):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        # filled in place, so a caller's dict ends up holding the new cache
+        self.cache = cache if cache is not None else {}
+        self.cache.setdefault("owners", {})
+        self.cache.setdefault("pages", {})
+        self.requested = set()      # page URLs requested by this lister
+
+    def _get(self, url: str) -> tuple:
+        """-> (status, headers (lower-case keys), body bytes)."""
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": "sunnysett-pipeline"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        cached = self.cache["pages"].get(url)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        request = urllib.request.Request(self.base_url + url, headers=headers)
+        self.requested.add(url)
+        with metrics.timer("github.list"):
+            try:
+                with urllib.request.urlopen(request, timeout=TIMEOUT_S) as resp:
+                    status, raw_headers, body = resp.status, resp.headers, resp.read()
+            except urllib.error.HTTPError as e:
+                status, raw_headers, body = e.code, e.headers, e.read()
+        response_headers = {k.lower(): v for k, v in raw_headers.items()}
+        usage.record(url, status, response_headers)
+        return status, response_headers, body
+
+    def _relative(self, url: str) -> str:
+        return url[len(self.base_url):] if url.startswith(self.base_url) else url
+
+    def _pages(self, owner: str, kind: str):
+        """Yield each page; None as the only item if the owner is not a ``kind``."""
+        from github_pipeline.github_loader import repo_record
+
+        query = {"per_page": self.per_page, "sort": "full_name"}
+        if kind == "users":
+            query["type"] = "owner"
+        url = f"/{kind}/{urllib.parse.quote(owner)}/repos?{urllib.parse.urlencode(query)}"
+        first = True
+        while url:
+            status, headers, body = self._get(url)
+            if status == 304:
+                page = self.cache["pages"][url]
+                metrics.incr("github.list_pages_cached")
+            elif status == 200:
+                # parsed in full before it is cached: a page that does not
+                # parse must not leave its ETag behind (a 304 would replay it)
+                try:
+                    payloads = codec.loads(body)
+                    records = [repo_record(p) for p in payloads]
+                    pushed_at = [p.get("pushed_at") for p in payloads]
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    raise ValueError(f"GET {url}: malformed listing page ({e!r})") from e
+                next_url = _next_link(headers.get("link"))
+                page = {
+                    "etag": headers.get("etag"),
+                    "records": records,
+                    "pushed_at": pushed_at,
+                    "next": self._relative(next_url) if next_url else None,
+                }
+                self.cache["pages"][url] = page
+                metrics.incr("github.list_pages_fetched")
+            elif status == 404 and first:
+                yield None
+                return
+            else:
+                raise RuntimeError(f"GET {url}: HTTP {status}")
+            yield page
+            url, first = page["next"], False
+
+    def _listing(self, owner: str):
+        """(record, pushed_at) of every repo of ``owner``."""
+        known = self.cache["owners"].get(owner)
+        for kind in ([known] if known else ["orgs", "users"]):
+            pages = self._pages(owner, kind)
+            for page in pages:
+                if page is None:
+                    break
+                self.cache["owners"][owner] = kind
+                # pages cached before pushed_at was kept have none
+                pushed = page.get("pushed_at") or [None] * len(page["records"])
+                # copies: the stages downstream add fields to the records
+                yield from ((dict(record), at) for record, at in zip(page["records"], pushed))
+            else:
+                return
+        raise LookupError(f"{owner}: no such organization or user")
+
+    def list_owner(self, owner: str):
+        """Raw records of every repo of ``owner`` (an organization or a user)."""
+        return (record for record, _ in self._listing(owner))
+
+    def prune(self, owners) -> int:
+        """Drop cached pages this lister did not request and owners not in ``owners``; -> pages dropped."""
+        stale = [url for url in self.cache["pages"] if url not in self.requested]
+        for url in stale:
+            del self.cache["pages"][url]
+        keep = set(owners)
+        for owner in [o for o in self.cache["owners"] if o not in keep]:
+            del self.cache["owners"][owner]
+        return len(stale)
+
+    def expand(self, owners, seen=None):
+        """
+        Records of every repo of ``owners``, each repo once. ``seen``
+        (lower-cased modelIds) is filled in as records are yielded, and
+        each record is added to the extraction schedule as observed. Once
+        every owner was listed without error, the page cache is pruned.
+        """
+        from github_pipeline.scheduler import schedule
+
+        seen = set() if seen is None else seen
+        complete = True
+        for owner in owners:
+            count = 0
+            print(f"🔭 Listing {owner}/* ...")
+            try:
+                for record, pushed_at in self._listing(owner):
+                    key = record["modelId"].lower()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    count += 1
+                    schedule.add(record["modelId"])
+                    schedule.observe(record["modelId"], stars=record["stars"], pushed_at=pushed_at)
+                    yield record
+            except (LookupError, RuntimeError, OSError, ValueError) as e:
+                metrics.incr("github.errors")
+                print(f"  ❌ fail to list {owner}/*: {e}")
+                complete = False
+                continue
+            metrics.incr("github.repos_listed", count)
+            print(f"  ✅ {owner}/*: {count} repos")
+        # a failed listing keeps its old pages: they still hold valid ETags
+        if complete:
+            pruned = self.prune(owners)
+            if pruned:
+                metrics.incr("github.list_pages_pruned", pruned)
+                print(f"  🧹 Pruned {pruned} cached listing pages no longer requested")
@@ -0,0 +1,382 @@
+"""
+Work Queue
+----------
+A lease-based task queue in one SQLite file, so several processes (or
+function instances sharing a disk) can drain one repo list together
+without duplicating work or losing the repos of a worker that crashed:
+
+- enqueue:    tasks are keyed (e.g. "owner/repo"); enqueueing a key that
+              is already queued is a no-op, so every worker may enqueue the
+              full list on start
+- runs:       enqueue(..., run=...) scopes the keys to a run (e.g. the
+              date of a daily extraction): a key that finished ("done" or
+              "dead") in an earlier run is re-armed with fresh attempts,
+              while within one run it is enqueued once however many
+              workers enqueue it
+- lease:      a worker claims tasks for VISIBILITY_TIMEOUT seconds; nobody
+              else gets them during that time
+- heartbeat:  a worker still busy extends its lease (Heartbeat does this
+              from a background thread)
+- expiry:     a lease that is not completed or extended in time becomes
+              visible again, and the next lease() hands the task to another
+              worker (the worker died, or hung)
+- retries:    a failed task comes back after an exponential backoff
+              (RETRY_BACKOFF_S, doubling, capped at MAX_BACKOFF_S)
+- dead-letter: after MAX_ATTEMPTS leases (failed or expired) the task is
+              parked in state "dead" with its last error, until requeue_dead()
+
+Each lease carries a random token: heartbeat/complete/fail from a worker
+whose lease expired and was taken over return False instead of clobbering
+the new owner's state.
+
+Claims run inside BEGIN IMMEDIATE transactions and the database is in WAL
+mode, which makes lease() atomic across threads and processes on one host
+(or a network disk with working POSIX locks).
+
+Usage:
+    q = WorkQueue("output/extract_queue.db")
+    q.enqueue(GITHUB_REPOS, run="2026-01-31")
+    q.drain(fetch_and_save, workers=8)      # raise in the handler to retry
+    q.stats()                               # {"ready": 0, "leased": 0, "done": ..., "dead": ...}
+
+    python -m github_pipeline.work_queue output/extract_queue.db --dead
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from github_pipeline import codec
+from github_pipeline.metrics import metrics
+
+VISIBILITY_TIMEOUT = 120.0  # seconds a lease lasts without a heartbeat
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_S = 30.0      # first retry delay; doubles per attempt
+MAX_BACKOFF_S = 900.0
+POLL_S = 1.0                # idle wait in drain() while other workers hold leases
+STATES = ("ready", "leased", "done", "dead")
+
+Lease = namedtuple("Lease", ["key", "payload", "attempts", "token", "expires_at"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key           TEXT PRIMARY KEY,
+    payload       TEXT,
+    priority      REAL NOT NULL DEFAULT 0,
+    state         TEXT NOT NULL DEFAULT 'ready',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    available_at  REAL NOT NULL,
+    lease_token   TEXT,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    last_error    TEXT,
+    result        TEXT,
+    run           TEXT,
+    enqueued_at   REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (state, priority DESC, available_at);
+"""
+
+# a key enqueued for a new run: rows that finished in an earlier run start
+# over; rows still ready or leased keep their state and join the new run
+_REARM = """
+INSERT INTO tasks (key, payload, priority, available_at, enqueued_at, updated_at, run)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    run = excluded.run,
+    state = CASE WHEN state IN ('done', 'dead') THEN 'ready' ELSE state END,
+    attempts = CASE WHEN state IN ('done', 'dead') THEN 0 ELSE attempts END,
+    available_at = CASE WHEN state IN ('done', 'dead') THEN excluded.available_at ELSE available_at END,
+    last_error = CASE WHEN state IN ('done', 'dead') THEN NULL ELSE last_error END,
+    result = CASE WHEN state IN ('done', 'dead') THEN NULL ELSE result END,
+    payload = excluded.payload,
+    priority = excluded.priority,
+    enqueued_at = excluded.enqueued_at,
+    updated_at = excluded.updated_at
+WHERE run IS NOT excluded.run
+"""
+
+
+def _worker_id() -> str:
+    import socket
+
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class WorkQueue:
+    """SQLite-backed lease queue; one connection per thread, safe across processes."""
+
+    def __init__(self, path, visibility_timeout: float = VISIBILITY_TIMEOUT,
+                 max_attempts: int = MAX_ATTEMPTS, retry_backoff: float = RETRY_BACKOFF_S,
+                 max_backoff: float = MAX_BACKOFF_S, clock=time.time):
+        self.path = str(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._local = threading.local()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = self._db()
+        db.executescript(_SCHEMA)
+        # queues created before runs existed
+        if "run" not in {row[1] for row in db.execute("PRAGMA table_info(tasks)")}:
+            db.execute("ALTER TABLE tasks ADD COLUMN run TEXT")
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # autocommit; writes that must be atomic open their own transaction
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        return db
+
+    # ===== producer side =====
+
+    def enqueue(self, keys, payloads: dict = None, priorities: dict = None, run: str = None) -> int:
+        """
+        Add tasks by key. Without ``run`` already-queued keys are left alone;
+        with it, keys that finished in another run are re-armed (see _REARM).
+        Returns how many were new or re-armed.
+        """
+        now = self.clock()
+        payloads, priorities = payloads or {}, priorities or {}
+        rows = [(key, codec.dumps(payloads[key]).decode("utf-8") if key in payloads else None,
+                 priorities.get(key, 0), now, now, now) for key in keys]
+        db = self._transaction()
+        try:
+            before = db.total_changes
+            if run is None:
+                db.executemany(
+                    "INSERT OR IGNORE INTO tasks (key, payload, priority, available_at, enqueued_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            else:
+                db.executemany(_REARM, [row + (run,) for row in rows])
+            added = db.total_changes - before
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        metrics.incr("queue.enqueued", added)
+        return added
+
+    # ===== worker side =====
+
+    def lease(self, n: int = 1, owner: str = None):
+        """
+        Claim up to ``n`` visible tasks (ready and due, or with an expired
+        lease), highest priority first. Tasks whose expired lease used up
+        the last attempt are dead-lettered instead.
+        """
+        now = self.clock()
+        owner = owner or _worker_id()
+        db = self._transaction()
+        try:
+            expired_out = db.execute(
+                "UPDATE tasks SET state = 'dead', last_error = 'lease expired', lease_token = NULL, "
+                "updated_at = ? WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, now, self.max_attempts)).rowcount
+            rows = db.execute(
+                "SELECT key, payload, attempts, state FROM tasks "
+                "WHERE (state = 'ready' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?) "
+                "ORDER BY priority DESC, available_at, key LIMIT ?", (now, now, n)).fetchall()
+            leases = []
+            expires = now + self.visibility_timeout
+            for key, payload, attempts, state in rows:
+                token = os.urandom(8).hex()
+                db.execute(
+                    "UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_token = ?, "
+                    "lease_owner = ?, lease_expires = ?, updated_at = ? WHERE key = ?",
+                    (token, owner, expires, now, key))
+                if state == "leased":
+                    metrics.incr("queue.lease_expired")
+                leases.append(Lease(key, codec.loads(payload) if payload else None,
+                                    attempts + 1, token, expires))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if expired_out:
+            metrics.incr("queue.dead_lettered", expired_out)
+        metrics.incr("queue.leased", len(leases))
+        return leases
+
+    def _update_leased(self, lease: Lease, sql: str, params: tuple) -> bool:
+        cur = self._db().execute(
+            f"UPDATE tasks SET {sql} WHERE key = ? AND lease_token = ? AND state = 'leased'",
+            params + (lease.key, lease.token))
+        return cur.rowcount == 1
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Extend the lease by the visibility timeout; False if it was lost."""
+        now = self.clock()
+        return self._update_leased(lease, "lease_expires = ?, updated_at = ?",
+                                   (now + self.visibility_timeout, now))
+
+    def complete(self, lease: Lease, result=None) -> bool:
+        """Mark the task done; False if the lease was lost (another worker owns it now)."""
+        ok = self._update_leased(
+            lease, "state = 'done', lease_token = NULL, last_error = NULL, result = ?, updated_at = ?",
+            (None if result is None else codec.dumps(result).decode("utf-8"), self.clock()))
+        metrics.incr("queue.completed" if ok else "queue.lease_lost")
+        return ok
+
+    def fail(self, lease: Lease, error) -> str:
+        """
+        Record a failed attempt: back to "ready" after the backoff, or
+        "dead" once MAX_ATTEMPTS is reached. Returns the new state, or None
+        if the lease was lost.
+        """
+        now = self.clock()
+        if lease.attempts >= self.max_attempts:
+            state, available_at = "dead", now
+        else:
+            state = "ready"
+            available_at = now + min(self.max_backoff, self.retry_backoff * 2 ** (lease.attempts - 1))
+        ok = self._update_leased(
+            lease, "state = ?, available_at = ?, lease_token = NULL, last_error = ?, updated_at = ?",
+            (state, available_at, str(error)[:2000], now))
+        if not ok:
+            metrics.incr("queue.lease_lost")
+            return None
+        metrics.incr("queue.dead_lettered" if state == "dead" else "queue.retried")
+        return state
+
+    def drain(self, handler, workers: int = 1, owner: str = None) -> dict:
+        """
+        Lease and run tasks with ``handler(lease) -> result`` on ``workers``
+        threads until no task is ready or leased anywhere. A handler that
+        raises fails the task (retry or dead-letter). Leases are kept
+        alive by a Heartbeat while the handler runs.
+        """
+        counts = {"completed": 0, "retried": 0, "dead": 0, "lost": 0}
+        lock = threading.Lock()
+
+        def count(name):
+            with lock:
+                counts[name] += 1
+
+        def work():
+            while True:
+                leases = self.lease(1, owner)
+                if not leases:
+                    if not self.pending():
+                        return
+                    time.sleep(POLL_S)      # retries backing off, or leases held elsewhere
+                    continue
+                lease = leases[0]
+                with Heartbeat(self, lease) as beat:
+                    try:
+                        result = handler(lease)
+                    except Exception as e:
+                        state = self.fail(lease, e)
+                        count({"ready": "retried", "dead": "dead", None: "lost"}[state])
+                        continue
+                if beat.lost or not self.complete(lease, result):
+                    count("lost")
+                else:
+                    count("completed")
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(max(1, workers))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return counts
+
+    # ===== inspection =====
+
+    def pending(self) -> int:
+        """Tasks that still need work: ready (due or backing off) or leased."""
+        return self._db().execute(
+            "SELECT COUNT(*) FROM tasks WHERE state IN ('ready', 'leased')").fetchone()[0]
+
+    def stats(self) -> dict:
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self._db().execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+        return counts
+
+    def dead_letters(self) -> list:
+        rows = self._db().execute(
+            "SELECT key, attempts, last_error, updated_at FROM tasks WHERE state = 'dead' ORDER BY key")
+        return [{"key": k, "attempts": a, "last_error": e, "dead_since": t} for k, a, e, t in rows]
+
+    def requeue_dead(self, keys=None) -> int:
+        """Give dead-lettered tasks (all, or ``keys``) a fresh set of attempts."""
+        now = self.clock()
+        sql = "UPDATE tasks SET state = 'ready', attempts = 0, available_at = ?, updated_at = ? WHERE state = 'dead'"
+        if keys is None:
+            return self._db().execute(sql, (now, now)).rowcount
+        db = self._transaction()
+        n = sum(db.execute(sql + " AND key = ?", (now, now, key)).rowcount for key in keys)
+        db.execute("COMMIT")
+        return n
+
+    def results(self) -> dict:
+        """{key: result} of completed tasks that returned one."""
+        rows = self._db().execute("SELECT key, result FROM tasks WHERE state = 'done' AND result IS NOT NULL")
+        return {key: codec.loads(result) for key, result in rows}
+
+
+class Heartbeat:
+    """
+    Keeps a lease alive from a background thread, extending it every third
+    of the visibility timeout; ``.lost`` is set if an extension fails.
+    """
+
+    def __init__(self, queue: WorkQueue, lease: Lease, interval: float = None):
+        self.queue = queue
+        self.lease = lease
+        self.interval = interval or queue.visibility_timeout / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.queue.heartbeat(self.lease):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def _main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or repair a work queue database")
+    parser.add_argument("path", help="queue database (SQLite file)")
+    parser.add_argument("--dead", action="store_true", help="list dead-lettered tasks")
+    parser.add_argument("--requeue-dead", action="store_true", help="retry every dead-lettered task")
+    args = parser.parse_args(argv)
+
+    q = WorkQueue(args.path)
+    if args.requeue_dead:
+        print(f"🔁 Requeued {q.requeue_dead()} dead-lettered tasks")
+    if args.dead:
+        for row in q.dead_letters():
+            print(codec.dumps(row).decode("utf-8"))
+    print(codec.dumps(q.stats()).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    _main()
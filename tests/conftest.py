@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# the project root (config, github_pipeline) and benchmarks/ (fake_github,
+# synthetic_corpus), as the benchmark scripts set them up
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "benchmarks")]
@@ -0,0 +1,85 @@
+"""
+get_repo_basic_info must cost exactly one GET /repos/{owner}/{repo} per
+repo (no topics call, no lazy completion of owner or license), in the root
+loader and in the copies deployed by raw_extract_github and
+github_loader_v3; and a v3 run in which every fetch fails still writes
+its (empty) merge. Runs against the fake GitHub API, no network.
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+from collections import Counter
+
+import pytest
+
+import config
+from conftest import PROJECT_ROOT
+from fake_github import FakeGitHub
+from synthetic_corpus import generate_raw_records
+
+LOADERS = {
+    "root": PROJECT_ROOT / "github_pipeline" / "github_loader.py",
+    "raw_extract_github": PROJECT_ROOT / "cloud_functions" / "raw_extract_github" / "github_pipeline" / "github_loader.py",
+    "github_loader_v3": PROJECT_ROOT / "cloud_functions" / "github_loader_v3" / "github_loader.py",
+}
+REPOS = 12
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return list(generate_raw_records(REPOS, seed=7))
+
+
+@pytest.fixture
+def fake(corpus, monkeypatch):
+    with FakeGitHub(corpus) as fake:
+        # the loaders copy these from config at import time
+        monkeypatch.setattr(config, "GITHUB_API_URL", fake.url)
+        monkeypatch.setattr(config, "GITHUB_TOKEN", "test")
+        monkeypatch.setattr(config, "MOCK_MODE", False)
+        yield fake
+
+
+def load_loader(label):
+    """A fresh module from one loader file, reading the patched config."""
+    spec = importlib.util.spec_from_file_location(f"_loader_{label}", LOADERS[label])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("label", sorted(LOADERS))
+def test_one_request_per_repo(label, fake, corpus):
+    loader = load_loader(label)
+    names = [r["modelId"] for r in corpus]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = [loader.get_repo_basic_info(name) for name in names]
+
+    assert fake.requests == Counter(repo=len(names))
+    assert fake.paths == Counter({f"/repos/{name}": 1 for name in names})
+    for record, expected in zip(records, corpus):
+        assert record["modelId"] == expected["modelId"]
+        assert record["stars"] == expected["stars"]
+        assert record["topics"] == expected["topics"]
+
+
+def test_v3_run_with_every_fetch_failing_writes_empty_merge(fake, tmp_path, monkeypatch):
+    loader = load_loader("github_loader_v3")
+    output = tmp_path / "output"            # not created yet, as on a fresh instance
+    merged = output / "github_raw_v3_data.json"
+    monkeypatch.setattr(loader, "OUTPUT_DIR", output / "github_raw_v3")
+    monkeypatch.setattr(loader, "MERGED_FILE", merged)
+    monkeypatch.setattr(loader, "SCHEDULE_FILE", output / "github_raw_v3_data.schedule.json")
+    monkeypatch.setattr(loader, "EXPANSION_FILE", output / "github_raw_v3_data.expansion.json")
+    monkeypatch.setattr(loader, "GITHUB_REPOS", ["nobody/missing-1", "nobody/missing-2"])
+    monkeypatch.setattr(loader, "WORK_QUEUE", "")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_github_models(max_workers=2)
+
+    assert fake.requests == Counter(repo=2)
+    assert json.loads(merged.read_bytes()) == []
+    assert (output / "github_raw_v3_data.schedule.json").exists()
@@ -0,0 +1,89 @@
+"""
+RecordStore lookups against the source list: every modelId returns its
+record (first of duplicates), unknown ids return the default, and author
+prefix scans return exactly the records a linear filter finds, in
+(author, modelId) order; from bytes, a mapped local file and a remote blob.
+"""
+
+import pytest
+
+from github_pipeline.record_store import RecordStore, build_record_store, open_record_store
+from github_pipeline.storage import LocalBackend, MemoryBackend
+from synthetic_corpus import generate_raw_records
+
+
+@pytest.fixture(scope="module")
+def source():
+    records = list(generate_raw_records(300, seed=9))
+    records += [
+        {"modelId": "zürich-nlp/über-model", "author": "zürich-nlp", "stars": 1},
+        {"modelId": "orphan/no-author", "stars": 2},
+        {"modelId": "ab/c", "author": "ab", "stars": 3},
+        {"modelId": "abc/d", "author": "abc", "stars": 4},
+    ]
+    # a duplicate modelId: the first record wins
+    records.append({**records[0], "stars": -1})
+    return records
+
+
+@pytest.fixture(scope="module")
+def unique(source):
+    out = {}
+    for record in source:
+        out.setdefault(record["modelId"], record)
+    return out
+
+
+@pytest.fixture(scope="module", params=["bytes", "local", "memory"])
+def kv(request, source, tmp_path_factory):
+    data = build_record_store(source, run="test")
+    if request.param == "bytes":
+        return RecordStore(data)
+    store = LocalBackend(tmp_path_factory.mktemp("kv")) if request.param == "local" else MemoryBackend()
+    store.write_bytes("ready/github_ready_data.kv", data)
+    return open_record_store(store, "ready/github_ready_data.kv")
+
+
+def expected_scan(unique, prefix):
+    rows = [r for r in unique.values() if (r.get("author") or "").startswith(prefix)]
+    return sorted(rows, key=lambda r: (r.get("author") or "", r["modelId"]))
+
+
+def test_header(kv, unique):
+    assert len(kv) == len(unique)
+    assert kv.header["duplicates_dropped"] == 1
+    assert kv.meta == {"run": "test"}
+
+
+def test_every_model_id_returns_its_record(kv, unique):
+    for model_id, record in unique.items():
+        assert model_id in kv
+        assert kv.get(model_id) == record
+
+
+@pytest.mark.parametrize("model_id", ["", "nobody/nothing", "AB/C", "ab/c ", "zürich-nlp/uber-model"])
+def test_unknown_model_ids(kv, model_id):
+    assert model_id not in kv
+    assert kv.get(model_id) is None
+    assert kv.get(model_id, "missing") == "missing"
+
+
+def test_author_scans_match_linear_filter(kv, unique):
+    authors = {r.get("author") or "" for r in unique.values()}
+    prefixes = {""} | {"zz-none", "ü", "zürich", "ab", "abc", "abcd"}
+    prefixes |= {a[:n] for a in authors for n in (1, 3, len(a))}
+    for prefix in sorted(prefixes):
+        assert list(kv.scan_author(prefix)) == expected_scan(unique, prefix), prefix
+
+
+def test_scan_limit_and_iteration_order(kv, unique):
+    assert list(kv.scan_author("", limit=5)) == expected_scan(unique, "")[:5]
+    assert list(kv.scan_author("ab", limit=0)) == []
+    assert list(kv) == expected_scan(unique, "")
+
+
+def test_empty_store():
+    kv = RecordStore(build_record_store([]))
+    assert len(kv) == 0
+    assert kv.get("a/b") is None
+    assert list(kv.scan_author("")) == []
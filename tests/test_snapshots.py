@@ -0,0 +1,104 @@
+"""
+SnapshotStore on a memory backend: commit -> load returns each run's
+records as committed, diff agrees with delta.compute_delta, only new
+content is stored, and a record that is removed and later comes back is
+restored in full.
+"""
+
+import pytest
+
+from github_pipeline.delta import compute_delta, content_hash
+from github_pipeline.snapshots import SnapshotStore
+from github_pipeline.storage import MemoryBackend
+from synthetic_corpus import generate_raw_records
+
+
+def run(records, day):
+    """A run's records: same content, the run's own ingested_at."""
+    return [{**r, "ingested_at": f"2026-01-{day:02d}T00:00:00+00:00"} for r in records]
+
+
+@pytest.fixture
+def snaps():
+    return SnapshotStore(MemoryBackend(), "github/snapshots")
+
+
+@pytest.fixture(scope="module")
+def base():
+    return list(generate_raw_records(40, seed=3))
+
+
+def changed(records, name, **fields):
+    return [{**r, **fields} if r["modelId"] == name else r for r in records]
+
+
+def test_commit_load_round_trip(snaps, base):
+    first = run(base, 1)
+    summary = snaps.commit("ready", first, snapshot_id="s1")
+    assert (summary["count"], summary["new_records"]) == (40, 40)
+
+    loaded = snaps.load("ready")
+    assert loaded == first
+    assert [list(r) for r in loaded] == [list(r) for r in first]     # field order kept
+
+    # same content on the next day: nothing new is stored
+    second = run(base, 2)
+    summary = snaps.commit("ready", second, snapshot_id="s2")
+    assert (summary["new_records"], summary["segment_bytes"]) == (0, 0)
+    assert snaps.load("ready") == second
+    assert snaps.load("ready", "s1") == first
+    assert snaps.snapshots("ready") == ["s1", "s2"]
+
+
+def test_diff_matches_compute_delta(snaps, base):
+    gone, edited = base[5]["modelId"], base[9]["modelId"]
+    first = run(base, 1)
+    extra = {**base[0], "modelId": "someone/new-repo", "stars": 3}
+    second = run(changed([r for r in base if r["modelId"] != gone], edited, stars=10 ** 6) + [extra], 2)
+    snaps.commit("ready", first, snapshot_id="s1")
+    assert snaps.commit("ready", second, snapshot_id="s2")["new_records"] == 2
+
+    diff = snaps.diff("ready", "s1", "s2")
+    expected, _ = compute_delta(second, {r["modelId"]: content_hash(r) for r in first})
+    assert (diff["base"], diff["snapshot"]) == ("s1", "s2")
+    assert diff["inserts"] == expected["inserts"]
+    assert diff["updates"] == expected["updates"]
+    assert diff["deletes"] == expected["deletes"] == [gone]
+    assert diff["counts"] == {k: v for k, v in expected["counts"].items() if k != "duplicate_ids"}
+    assert snaps.diff("ready", "s2")["counts"] == {"inserts": 0, "updates": 0, "deletes": 0, "unchanged": 40}
+
+
+def test_record_that_comes_back(snaps, base):
+    name = base[7]["modelId"]
+    without = [r for r in base if r["modelId"] != name]
+    snaps.commit("ready", run(base, 1), snapshot_id="s1")
+    snaps.commit("ready", run(without, 2), snapshot_id="s2")
+    # back unchanged: stored again (the latest snapshot does not have it)
+    summary = snaps.commit("ready", run(base, 3), snapshot_id="s3")
+    assert summary["new_records"] == 1
+
+    assert snaps.load("ready", "s2") == run(without, 2)
+    assert snaps.load("ready", "s3") == run(base, 3)
+    assert snaps.load("ready", "s1") == run(base, 1)
+
+    back = snaps.diff("ready", "s2", "s3")
+    assert [r["modelId"] for r in back["inserts"]] == [name]
+    assert back["inserts"][0] == run(base, 3)[7]
+    assert (back["updates"], back["deletes"]) == ([], [])
+    assert snaps.diff("ready", "s1", "s3")["counts"] == {"inserts": 0, "updates": 0, "deletes": 0, "unchanged": 40}
+
+    # and returning with other content, it is an update against its last version
+    snaps.commit("ready", run(changed(base, name, description="rewritten"), 4), snapshot_id="s4")
+    update = snaps.diff("ready", "s3", "s4")
+    assert [r["modelId"] for r in update["updates"]] == [name]
+    assert update["updates"][0]["description"] == "rewritten"
+
+
+def test_snapshot_ids_must_be_new_and_ordered(snaps, base):
+    snaps.commit("ready", run(base, 1), snapshot_id="s2")
+    with pytest.raises(ValueError, match="already exists"):
+        snaps.commit("ready", run(base, 1), snapshot_id="s2")
+    with pytest.raises(ValueError, match="sorts before"):
+        snaps.commit("ready", run(base, 1), snapshot_id="s1")
+    with pytest.raises(FileNotFoundError):
+        snaps.load("mapped")
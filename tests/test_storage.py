@@ -0,0 +1,172 @@
+"""
+Streaming writes on every backend: an aborted or failed write leaves the
+previous object in place, and on GCS the temp object's cleanup never masks
+the error that failed the write. GCS runs against an in-memory fake bucket.
+"""
+
+import io
+
+import pytest
+from google.api_core import exceptions
+
+from github_pipeline import storage
+
+
+class FakeWriter(io.BytesIO):
+    """blob.open("wb"): closing it publishes the object, as BlobWriter does."""
+
+    def __init__(self, blob):
+        super().__init__()
+        self._blob = blob
+
+    def close(self):
+        if not self.closed:
+            if self._blob.bucket.fail_upload:
+                super().close()
+                raise ConnectionError("upload interrupted")
+            self._blob.bucket.put(self._blob.name, self.getvalue())
+        super().close()
+
+
+class FakeBlob:
+    def __init__(self, bucket, name, generation=None):
+        self.bucket = bucket
+        self.name = name
+        self.generation = generation
+        self.size = len(bucket.objects.get(name, (b"", 0))[0])
+        self.md5_hash = None
+
+    def open(self, mode, content_type=None):
+        assert mode == "wb"
+        return FakeWriter(self)
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):
+        self.bucket.check(self.name, if_generation_match)
+        self.generation = self.bucket.put(self.name, data)
+
+    def download_as_bytes(self, start=None, end=None):
+        if self.name not in self.bucket.objects:
+            raise exceptions.NotFound(self.name)
+        data = self.bucket.objects[self.name][0]
+        return data[start or 0:None if end is None else end + 1]
+
+    def delete(self):
+        if self.bucket.objects.pop(self.name, None) is None:
+            raise exceptions.NotFound(self.name)
+
+
+class FakeBucket:
+    def __init__(self):
+        self.objects = {}           # name -> (data, generation)
+        self.generation = 0
+        self.fail_upload = False
+        self.fail_copy = False
+
+    def put(self, name, data):
+        self.generation += 1
+        self.objects[name] = (bytes(data), self.generation)
+        return self.generation
+
+    def check(self, name, if_generation_match):
+        current = self.objects.get(name, (None, 0))[1]
+        if if_generation_match is not None and current != if_generation_match:
+            raise exceptions.PreconditionFailed(f"{name}: generation {current}")
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        if name not in self.objects:
+            return None
+        return FakeBlob(self, name, self.objects[name][1])
+
+    def list_blobs(self, prefix=""):
+        return [FakeBlob(self, name) for name in self.objects if name.startswith(prefix)]
+
+    def copy_blob(self, blob, destination_bucket, new_name, if_generation_match=None):
+        if self.fail_copy:
+            # the temp object is already gone when the copy fails, e.g. a
+            # lifecycle rule or a concurrent cleanup removed it
+            self.objects.pop(blob.name, None)
+            raise exceptions.ServiceUnavailable("copy failed")
+        self.check(new_name, if_generation_match)
+        destination_bucket.put(new_name, self.objects[blob.name][0])
+
+
+class FakeClient:
+    def __init__(self, bucket):
+        self._bucket = bucket
+
+    def bucket(self, name):
+        return self._bucket
+
+
+@pytest.fixture(params=["gcs", "local", "memory"])
+def backend(request, tmp_path):
+    if request.param == "gcs":
+        return storage.GCSBackend("test-bucket", client=FakeClient(FakeBucket()))
+    if request.param == "local":
+        return storage.LocalBackend(tmp_path / "store")
+    return storage.MemoryBackend()
+
+
+@pytest.fixture
+def gcs():
+    return storage.GCSBackend("test-bucket", client=FakeClient(FakeBucket()))
+
+
+def test_streamed_write_replaces_the_object(backend):
+    backend.write_bytes("dir/blob.bin", b"old")
+    with backend.open_write("dir/blob.bin") as f:
+        f.write(b"new ")
+        f.write(b"content")
+    assert backend.read_bytes("dir/blob.bin") == b"new content"
+    assert backend.list("dir/") == ["dir/blob.bin"]
+
+
+def test_aborted_write_keeps_the_previous_object(backend):
+    backend.write_bytes("dir/blob.bin", b"old")
+    f = backend.open_write("dir/blob.bin")
+    f.write(b"half of the new con")
+    f.abort()
+    f.close()                       # closing after abort commits nothing
+    assert backend.read_bytes("dir/blob.bin") == b"old"
+    assert backend.list("dir/") == ["dir/blob.bin"]
+
+
+def test_failed_precondition_keeps_the_previous_object(backend):
+    info = backend.write_bytes("dir/blob.bin", b"old")
+    backend.write_bytes("dir/blob.bin", b"newer")
+    f = backend.open_write("dir/blob.bin", if_generation_match=info.generation)
+    f.write(b"stale")
+    with pytest.raises(storage.PreconditionFailed):
+        f.close()
+    assert backend.read_bytes("dir/blob.bin") == b"newer"
+    assert backend.list("dir/") == ["dir/blob.bin"]
+
+
+def test_gcs_copy_error_is_not_masked_by_missing_temp(gcs):
+    gcs.write_bytes("blob.bin", b"old")
+    gcs.bucket.fail_copy = True
+    f = gcs.open_write("blob.bin")
+    f.write(b"new")
+    with pytest.raises(exceptions.ServiceUnavailable):
+        f.close()
+    assert gcs.read_bytes("blob.bin") == b"old"
+    assert gcs.list() == ["blob.bin"]
+
+
+def test_gcs_upload_error_is_not_masked_by_missing_temp(gcs):
+    gcs.write_bytes("blob.bin", b"old")
+    gcs.bucket.fail_upload = True
+    f = gcs.open_write("blob.bin")
+    f.write(b"new")
+    with pytest.raises(ConnectionError):
+        f.close()
+
+    f = gcs.open_write("blob.bin")
+    f.write(b"new")
+    with pytest.raises(ConnectionError):
+        f.abort()
+    assert gcs.read_bytes("blob.bin") == b"old"
+    assert gcs.list() == ["blob.bin"]
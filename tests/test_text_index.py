@@ -0,0 +1,99 @@
+"""
+TextIndex top-k (MaxScore, block skipping, term-subset pass) against an
+exhaustive BM25 scorer written from the definition: the same scores as
+scoring every document, and impact sums that stay within rounding of the
+exact BM25 score.
+"""
+
+import math
+from collections import Counter
+
+import pytest
+
+from github_pipeline.text_index import B, K1, TextIndex, TextIndexBuilder, record_tokens, tokenize
+from synthetic_corpus import generate_raw_records
+
+QUERIES = [
+    "pytorch",
+    "translation model",
+    "fast detector retail",
+    "lightweight segmentation for drones",
+    "gpt satellite diffusion bert mobile",
+    "robust multilingual translation model for manufacturing in jax",
+    # more than SUBSET_TERMS terms: MaxScore only
+    "fast robust lightweight detector segmentation translation diffusion bert gpt mobile",
+    "no-such-term",
+]
+
+
+class BruteForce:
+    """Exact BM25 per (doc, term), and the one-byte impacts the index stores."""
+
+    def __init__(self, records):
+        docs = [Counter(record_tokens(r)) for r in records]
+        lengths = [sum(tf.values()) for tf in docs]
+        n = len(docs)
+        avgdl = sum(lengths) / n
+        df = Counter(term for tf in docs for term in tf)
+        self.exact = []
+        for tf, dl in zip(docs, lengths):
+            norm = K1 * (1 - B + B * dl / avgdl)
+            self.exact.append({
+                term: math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5)) * f * (K1 + 1) / (f + norm)
+                for term, f in tf.items()
+            })
+        self.scale = max(s for scores in self.exact for s in scores.values())
+
+    def impact(self, s):
+        return max(1, min(255, round(s * 255 / self.scale)))
+
+    def scores(self, query):
+        terms = list(dict.fromkeys(tokenize(query)))
+        out = {}
+        for doc, scores in enumerate(self.exact):
+            matched = [scores[t] for t in terms if t in scores]
+            if matched:
+                out[doc] = (sum(self.impact(s) for s in matched), sum(matched), len(matched))
+        return out
+
+
+@pytest.fixture(scope="module", params=[400, 3000], ids=["sparse", "dense"])
+def corpus(request):
+    # 3000 docs is past DENSE_MIN_DOCS: common terms get bitmaps
+    records = list(generate_raw_records(request.param, seed=5))
+    builder = TextIndexBuilder()
+    for record in records:
+        builder.add(record)
+    return TextIndex(builder.to_bytes()), BruteForce(records)
+
+
+@pytest.mark.parametrize("k", [1, 10, 100])
+@pytest.mark.parametrize("query", QUERIES)
+def test_top_k_matches_exhaustive_scoring(corpus, query, k):
+    index, brute = corpus
+    expected = brute.scores(query)
+    ranked = sorted(expected, key=lambda doc: (-expected[doc][0], doc))
+
+    got = index.search_ids(query, k)
+
+    assert [score for _, score in got] == [expected[doc][0] for doc in ranked[:k]]
+    assert len({doc for doc, _ in got}) == len(got)
+    for doc, score in got:
+        assert expected[doc][0] == score
+    # ties at the k-th score may be broken either way; everything above it must be there
+    if got:
+        above = {doc for doc in ranked[:k] if expected[doc][0] > got[-1][1]}
+        assert above <= {doc for doc, _ in got}
+
+
+def test_scores_approximate_exact_bm25(corpus):
+    index, brute = corpus
+    assert index.scale == pytest.approx(brute.scale / 255)
+    for query in QUERIES:
+        expected = brute.scores(query)
+        for key_doc, (model_id, score) in zip(index.search_ids(query, 20), index.search(query, 20)):
+            doc = key_doc[0]
+            _, exact, matched = expected[doc]
+            assert model_id == index.key(doc)
+            # each term's impact is rounded to the nearest 1/255 of the scale
+            assert abs(score - exact) <= matched * index.scale / 2 + 1e-4
@@ -0,0 +1,65 @@
+"""
+RepoLister.expand with canned listing responses: a page that does not
+parse fails only its owner's listing (logged with the pattern), is not
+cached with its ETag, and keeps the page cache from being pruned.
+"""
+
+import contextlib
+import io
+import json
+
+from github_pipeline.wildcards import RepoLister
+
+
+def listing(owner, names):
+    return json.dumps([{"full_name": f"{owner}/{name}", "owner": {"login": owner},
+                        "stargazers_count": 1, "pushed_at": "2026-01-01T00:00:00Z"}
+                       for name in names]).encode("utf-8")
+
+
+class CannedLister(RepoLister):
+    def __init__(self, responses, cache=None):
+        super().__init__(cache=cache)
+        self.responses = responses      # {url prefix: (status, body)}
+
+    def _get(self, url):
+        self.requested.add(url)
+        for prefix, (status, body) in self.responses.items():
+            if url.startswith(prefix):
+                return status, {"etag": f'"{prefix}"'}, body
+        return 404, {}, b""
+
+
+def expand(lister, owners):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        records = list(lister.expand(owners))
+    return records, out.getvalue()
+
+
+def test_malformed_page_fails_its_owner_only():
+    stale_url = "/orgs/gone/repos?per_page=100&sort=full_name"
+    lister = CannedLister({
+        "/orgs/good/": (200, listing("good", ["a", "b"])),
+        "/orgs/broken/": (200, b'{"message": "truncated'),
+        "/orgs/odd/": (200, b'{"message": "not a list"}'),
+    }, cache={"pages": {stale_url: {"etag": '"old"', "records": [], "next": None}}})
+
+    records, log = expand(lister, ["broken", "odd", "good"])
+
+    assert [r["modelId"] for r in records] == ["good/a", "good/b"]
+    assert "fail to list broken/*" in log
+    assert "fail to list odd/*" in log
+    assert all("good" in url or url == stale_url for url in lister.cache["pages"])
+    assert lister.cache["owners"] == {"good": "orgs"}
+
+
+def test_complete_expansion_prunes_stale_pages():
+    stale_url = "/orgs/gone/repos?per_page=100&sort=full_name"
+    lister = CannedLister({"/orgs/good/": (200, listing("good", ["a"]))},
+                          cache={"pages": {stale_url: {"etag": '"old"', "records": [], "next": None}}})
+
+    records, _ = expand(lister, ["good"])
+
+    assert [r["modelId"] for r in records] == ["good/a"]
+    assert stale_url not in lister.cache["pages"]
@@ -0,0 +1,175 @@
+"""
+WorkQueue on a temp SQLite file with a fake clock: leases are exclusive and
+expire, stale lease tokens cannot complete or fail a task, failures back
+off exponentially and dead-letter after max_attempts, and keys enqueued
+for a new run are re-armed once they finished in an earlier one.
+"""
+
+import pytest
+
+from github_pipeline.work_queue import WorkQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return WorkQueue(tmp_path / "queue.sqlite", visibility_timeout=60, max_attempts=3,
+                     retry_backoff=10, max_backoff=25, clock=clock)
+
+
+def test_enqueue_is_idempotent_and_leases_by_priority(queue):
+    assert queue.enqueue(["a/1", "a/2", "a/3"], priorities={"a/3": 5, "a/2": 1}) == 3
+    assert queue.enqueue(["a/1", "a/2"]) == 0
+
+    leases = queue.lease(2, "w1")
+    assert [lease.key for lease in leases] == ["a/3", "a/2"]
+    assert [lease.key for lease in queue.lease(5, "w2")] == ["a/1"]
+    assert queue.lease(5, "w3") == []
+    assert queue.stats()["leased"] == 3
+
+
+def test_expired_lease_is_taken_over_and_old_token_is_stale(queue, clock):
+    queue.enqueue(["a/1"])
+    first, = queue.lease(1, "w1")
+    clock.now += 59
+    assert queue.lease(1, "w2") == []
+
+    clock.now += 1
+    second, = queue.lease(1, "w2")
+    assert second.attempts == 2
+    assert second.token != first.token
+
+    assert queue.heartbeat(first) is False
+    assert queue.complete(first, "stale") is False
+    assert queue.fail(first, "stale") is None
+    assert queue.complete(second, {"ok": True}) is True
+    assert queue.results() == {"a/1": {"ok": True}}
+
+
+def test_heartbeat_extends_the_lease(queue, clock):
+    queue.enqueue(["a/1"])
+    lease, = queue.lease(1, "w1")
+    clock.now += 50
+    assert queue.heartbeat(lease) is True
+    clock.now += 50
+    assert queue.lease(1, "w2") == []
+
+
+def test_failures_back_off_then_dead_letter(queue, clock):
+    queue.enqueue(["a/1"])
+
+    lease, = queue.lease(1)
+    assert queue.fail(lease, "boom 1") == "ready"
+    clock.now += 9
+    assert queue.lease(1) == []             # backoff 10s
+    clock.now += 1
+    lease, = queue.lease(1)
+    assert lease.attempts == 2
+
+    assert queue.fail(lease, "boom 2") == "ready"
+    clock.now += 19
+    assert queue.lease(1) == []             # backoff 20s
+    clock.now += 1
+    lease, = queue.lease(1)
+    assert lease.attempts == 3
+
+    assert queue.fail(lease, "boom 3") == "dead"
+    clock.now += 1000
+    assert queue.lease(1) == []
+    assert queue.pending() == 0
+    assert [(d["key"], d["attempts"], d["last_error"]) for d in queue.dead_letters()] == [("a/1", 3, "boom 3")]
+
+    assert queue.requeue_dead() == 1
+    assert queue.lease(1)[0].attempts == 1
+
+
+def test_backoff_is_capped(queue, clock):
+    queue.max_attempts = 10
+    queue.enqueue(["a/1"])
+    for _ in range(3):
+        lease, = queue.lease(1)
+        queue.fail(lease, "boom")
+        clock.now += 25                     # 10, 20, then capped at 25 (not 40)
+    assert queue.lease(1)[0].attempts == 4
+
+
+def test_expired_last_attempt_is_dead_lettered(queue, clock):
+    queue.enqueue(["a/1"])
+    for _ in range(3):
+        lease, = queue.lease(1)
+        clock.now += 60
+    assert queue.lease(1) == []
+    assert queue.dead_letters()[0]["last_error"] == "lease expired"
+    assert queue.complete(lease) is False
+
+
+def test_new_run_rearms_finished_keys(queue, clock):
+    assert queue.enqueue(["a/done", "a/dead", "a/busy"], run="day-1") == 3
+    assert queue.enqueue(["a/done", "a/dead", "a/busy"], run="day-1") == 0
+
+    leases = {lease.key: lease for lease in queue.lease(3)}
+    queue.complete(leases["a/done"], "v1")
+    queue.max_attempts = 1
+    queue.fail(leases["a/dead"], "boom")
+    queue.max_attempts = 3
+    assert queue.stats() == {"ready": 0, "leased": 1, "done": 1, "dead": 1}
+
+    clock.now += 1
+    assert queue.enqueue(["a/done", "a/dead", "a/busy", "a/new"], run="day-2") == 4
+    assert queue.enqueue(["a/done", "a/dead", "a/busy", "a/new"], run="day-2") == 0
+    assert queue.stats() == {"ready": 3, "leased": 1, "done": 0, "dead": 0}
+    assert queue.results() == {}
+
+    # the in-flight lease is untouched and can still finish
+    assert queue.complete(leases["a/busy"]) is True
+    rearmed = {lease.key: lease.attempts for lease in queue.lease(5)}
+    assert rearmed == {"a/done": 1, "a/dead": 1, "a/new": 1}
+
+
+def test_queue_without_run_column_is_migrated(tmp_path, clock):
+    import sqlite3
+
+    path = tmp_path / "old.sqlite"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE tasks (key TEXT PRIMARY KEY, payload TEXT, priority REAL NOT NULL DEFAULT 0, "
+               "state TEXT NOT NULL DEFAULT 'ready', attempts INTEGER NOT NULL DEFAULT 0, "
+               "available_at REAL NOT NULL, lease_token TEXT, lease_owner TEXT, lease_expires REAL, "
+               "last_error TEXT, result TEXT, enqueued_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    db.execute("INSERT INTO tasks (key, state, available_at, enqueued_at, updated_at) "
+               "VALUES ('a/1', 'done', 0, 0, 0)")
+    db.commit()
+    db.close()
+
+    queue = WorkQueue(path, clock=clock)
+    assert queue.enqueue(["a/1"], run="day-1") == 1
+    assert [lease.key for lease in queue.lease(1)] == ["a/1"]
+
+
+def test_drain_runs_every_task(queue):
+    queue.enqueue([f"a/{i}" for i in range(20)])
+    failed_once = set()
+
+    def handler(lease):
+        if lease.key == "a/7":
+            raise RuntimeError("always")
+        if lease.key == "a/3" and lease.key not in failed_once:
+            failed_once.add(lease.key)
+            raise RuntimeError("once")
+        return lease.key
+
+    queue.retry_backoff = 0
+    counts = queue.drain(handler, workers=4)
+    assert counts == {"completed": 19, "retried": 3, "dead": 1, "lost": 0}
+    assert set(queue.results()) == {f"a/{i}" for i in range(20)} - {"a/7"}